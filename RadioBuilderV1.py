@@ -6,10 +6,10 @@
 # NOW WITH PYVIPS FOR SVG SUPPORT (replaces CairoSVG)
 # ============================================================
 
+import os
 import sys
-import subprocess
+import importlib
 import importlib.util
-import platform
 
 # ============================================================
 # AUTO PACKAGE MANAGEMENT
@@ -17,7 +17,6 @@ import platform
 
 REQUIRED_PACKAGES = {
     "requests": "requests",
-    "bs4": "beautifulsoup4",
     "PIL": "pillow"
 }
 
@@ -28,6 +27,7 @@ OPTIONAL_PACKAGES = {
 
 def get_os_name():
     """Detect operating system."""
+    import platform
     system = platform.system().lower()
     if system == "windows":
         return "windows"
@@ -40,6 +40,7 @@ def get_os_name():
 
 def ensure_packages(packages, optional=False):
     """Install missing packages automatically."""
+    import subprocess
     for module, package in packages.items():
         if importlib.util.find_spec(module) is None:
             print(f"[BOOTSTRAP] Package '{package}' missing → installing...")
@@ -69,29 +70,46 @@ def prompt_yes_no(message, default_yes=True):
         print("  → Please enter 'y' or 'n'")
 
 
-def check_pyvips():
-    """Check PyVips availability and prompt user if not available."""
-    global SVG_ENABLED, pyvips
-    SVG_ENABLED = False
-    pyvips = None
+def confirm_without_svg(interactive):
+    """Ask whether to continue without SVG support; headless runs always continue."""
+    if not interactive:
+        print("  → No terminal: proceeding without SVG support...\n")
+        return True
+    return prompt_yes_no("\n  Do you wish to proceed without SVG support?", default_yes=True)
+
 
-    try:
-        import pyvips as _pyvips
-        pyvips = _pyvips
-        # Test if vips can actually load SVG
-        test_svg = b'<svg xmlns="http://www.w3.org/2000/svg" width="10" height="10"></svg>'
-        _pyvips.Image.new_from_buffer(test_svg, "")
-        SVG_ENABLED = True
+def check_pyvips(interactive=True):
+    """Check PyVips availability and prompt user if not available (never when not interactive)."""
+    enabled, error = detect_svg_support()
+    if enabled:
         print("[BOOTSTRAP] PyVips available → SVG conversion enabled ✓")
-        print(f"[BOOTSTRAP] libvips version: {_pyvips.version(0)}.{_pyvips.version(1)}.{_pyvips.version(2)}")
+        print(f"[BOOTSTRAP] libvips version: {pyvips.version(0)}.{pyvips.version(1)}.{pyvips.version(2)}")
         return True
 
-    except OSError as e:
+    if isinstance(error, ImportError):
+        print("\n" + "=" * 65)
+        print("  ⚠  WARNING: PyVips module not installed!")
+        print("=" * 65)
+        print("\n  The pyvips Python package is not available.")
+        print("  This is needed to convert SVG logos to JPG format.\n")
+        print("  Impact if you proceed without SVG support:")
+        print("  • Stations with SVG logos will have NO logo image")
+        print("  • PNG, JPG, WEBP logos will still work normally")
+        print("=" * 65)
+
+        if confirm_without_svg(interactive):
+            print("  → Proceeding without SVG support...\n")
+            return True
+        else:
+            print("  → Exiting. Install with: pip install pyvips")
+            sys.exit(0)
+
+    elif isinstance(error, OSError):
         os_name = get_os_name()
         print("\n" + "=" * 65)
         print("  ⚠  WARNING: PyVips requires native libvips library!")
         print("=" * 65)
-        print(f"\n  Error: {e}\n")
+        print(f"\n  Error: {error}\n")
 
         print("  Installation instructions:")
         if os_name == "windows":
@@ -131,42 +149,24 @@ def check_pyvips():
         print("  • You can re-run the scraper later after installing libvips")
         print("=" * 65)
 
-        if prompt_yes_no("\n  Do you wish to proceed without SVG support?", default_yes=True):
+        if confirm_without_svg(interactive):
             print("  → Proceeding without SVG support...\n")
             return True
         else:
             print("  → Exiting. Please install libvips and try again.")
             sys.exit(0)
 
-    except ImportError:
-        print("\n" + "=" * 65)
-        print("  ⚠  WARNING: PyVips module not installed!")
-        print("=" * 65)
-        print("\n  The pyvips Python package is not available.")
-        print("  This is needed to convert SVG logos to JPG format.\n")
-        print("  Impact if you proceed without SVG support:")
-        print("  • Stations with SVG logos will have NO logo image")
-        print("  • PNG, JPG, WEBP logos will still work normally")
-        print("=" * 65)
-
-        if prompt_yes_no("\n  Do you wish to proceed without SVG support?", default_yes=True):
-            print("  → Proceeding without SVG support...\n")
-            return True
-        else:
-            print("  → Exiting. Install with: pip install pyvips")
-            sys.exit(0)
-
-    except Exception as e:
+    else:
         print("\n" + "=" * 65)
         print("  ⚠  WARNING: PyVips failed to initialize!")
         print("=" * 65)
-        print(f"\n  Error: {e}\n")
+        print(f"\n  Error: {error}\n")
         print("  Impact if you proceed without SVG support:")
         print("  • Stations with SVG logos will have NO logo image")
         print("  • PNG, JPG, WEBP logos will still work normally")
         print("=" * 65)
 
-        if prompt_yes_no("\n  Do you wish to proceed without SVG support?", default_yes=True):
+        if confirm_without_svg(interactive):
             print("  → Proceeding without SVG support...\n")
             return True
         else:
@@ -174,48 +174,111 @@ def check_pyvips():
             sys.exit(0)
 
 
-# ============================================================
-# BOOTSTRAP SEQUENCE
-# ============================================================
-
-print("\n" + "=" * 65)
-print("  RADIO STREAM SCRAPER v29 - Bootstrap")
-print("  (Now using PyVips for SVG support)")
-print("=" * 65)
-
-ensure_packages(REQUIRED_PACKAGES)
-ensure_packages(OPTIONAL_PACKAGES, optional=True)
+def ensure_required_packages():
+    """Install missing REQUIRED_PACKAGES (script start only; no pip checks when all are present)."""
+    missing = {module: package for module, package in REQUIRED_PACKAGES.items()
+               if importlib.util.find_spec(module) is None}
+    if missing:
+        ensure_packages(missing)
 
-# Check PyVips/SVG support with user confirmation
-SVG_ENABLED = False
-pyvips = None
-check_pyvips()
 
-print(f"[BOOTSTRAP] Detected OS: {get_os_name()}")
-print(f"[BOOTSTRAP] SVG support: {'ENABLED ✓' if SVG_ENABLED else 'DISABLED ✗'}")
-print("=" * 65 + "\n")
+def import_required(name):
+    """Import a module of a REQUIRED_PACKAGES package, with an install hint if it is missing."""
+    try:
+        return importlib.import_module(name)
+    except ImportError as e:
+        package = REQUIRED_PACKAGES.get(name.split(".")[0], name)
+        raise ImportError(f"Package '{package}' is required: pip install {package}") from e
 
 # ============================================================
-# IMPORTS (after bootstrap)
+# IMPORTS
 # ============================================================
 
-import os
+# requests/urllib3, PIL, sqlite3, zipfile, multiprocessing and argparse are
+# imported on first use, so importing this module stays cheap
 import re
 import csv
 import json
+import math
+import atexit
 import time
 import logging
+import shutil
+import hashlib
 import traceback
-import zipfile
-import webbrowser
+import copy
+import struct
+import zlib
+import warnings
 import threading
-import requests
+import weakref
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures import TimeoutError as FuturesTimeout
+from collections import deque
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
 from datetime import datetime, timezone
 from io import BytesIO
-from urllib.parse import urljoin
-from bs4 import BeautifulSoup
-from PIL import Image
+from urllib.parse import urljoin, urlparse, urlsplit
+
+# ============================================================
+# BOOTSTRAP SEQUENCE
+# ============================================================
+
+# SVG support: detected once, when the first SVG logo needs it (or by bootstrap())
+SVG_ENABLED = False
+pyvips = None
+_svg_checked = False
+_svg_error = None
+_svg_lock = threading.Lock()
+
+
+def detect_svg_support():
+    """Import pyvips and render a test SVG, once per process; returns (enabled, error)."""
+    global SVG_ENABLED, pyvips, _svg_checked, _svg_error
+    with _svg_lock:
+        if not _svg_checked:
+            try:
+                import pyvips as _pyvips
+                # Test if vips can actually load SVG
+                test_svg = b'<svg xmlns="http://www.w3.org/2000/svg" width="10" height="10"></svg>'
+                _pyvips.Image.new_from_buffer(test_svg, "")
+                pyvips, SVG_ENABLED, _svg_error = _pyvips, True, None
+            except Exception as e:
+                pyvips, SVG_ENABLED, _svg_error = None, False, e
+                logger.warning(f"SVG support unavailable, SVG logos are skipped: {e}")
+            _svg_checked = True
+        return SVG_ENABLED, _svg_error
+
+
+def svg_enabled():
+    """True if SVG logos can be rendered (detects pyvips on first call)."""
+    return SVG_ENABLED if _svg_checked else detect_svg_support()[0]
+
+
+def svg_status():
+    """Human-readable SVG support without triggering detection."""
+    if not _svg_checked:
+        return "not checked (no SVG logos)"
+    return "enabled (pyvips)" if SVG_ENABLED else "disabled"
+
+
+def bootstrap(interactive=True):
+    """Interactive startup: optional packages, SVG check with confirmation, banner."""
+    print("\n" + "=" * 65)
+    print("  RADIO STREAM SCRAPER v29 - Bootstrap")
+    print("  (Now using PyVips for SVG support)")
+    print("=" * 65)
+
+    ensure_packages(OPTIONAL_PACKAGES, optional=True)
+
+    # Check PyVips/SVG support with user confirmation (no prompt without a terminal, e.g. cron)
+    check_pyvips(interactive=interactive)
+
+    print(f"[BOOTSTRAP] Detected OS: {get_os_name()}")
+    print(f"[BOOTSTRAP] SVG support: {'ENABLED ✓' if SVG_ENABLED else 'DISABLED ✗'}")
+    print("=" * 65 + "\n")
+
 
 # ============================================================
 # CONFIG - MATCHES MOODE radio.php STRUCTURE
@@ -229,6 +292,24 @@ API_SERVERS = [
     "https://at1.api.radio-browser.info",
 ]
 API_ENDPOINT = "/json/stations/search"
+API_PAGE_SIZE = 250        # stations per offset/limit page
+TOP_STATIONS_LIMIT = 500   # menu option "All stations" builds the top N by popularity
+
+# Station source: live API searches or a local mirror of the whole catalogue
+CATALOGUE_SOURCE = "api"              # "api" = /json/stations/search per query, "mirror" = local SQLite mirror
+CATALOGUE_ENDPOINT = "/json/stations"
+CATALOGUE_CHANGED_ENDPOINT = "/json/stations/changed"
+CATALOGUE_PAGE_SIZE = 10000           # stations per request while syncing the mirror
+CATALOGUE_DELTA_AFTER = 3600          # seconds before the mirror fetches the changes since its last sync
+CATALOGUE_FULL_AFTER = 7 * 24 * 3600  # seconds before a full resync (the only way deletions arrive)
+CATALOGUE_FIXTURE = None              # JSON dump of /json/stations to mirror instead of the API (tests, offline)
+
+# API mirror selection
+MIRROR_DISCOVERY = "srv"        # "srv" = DNS SRV lookup if dnspython is installed, "static" = API_SERVERS only
+MIRROR_SRV_RECORD = "_api._tcp.radio-browser.info"
+MIRROR_PROBE_TIMEOUT = 3        # seconds per concurrent mirror latency probe
+MIRROR_RANKING_TTL = 6 * 3600   # seconds a cached mirror ranking stays valid
+MIRROR_HEDGE_AFTER = 2.0        # seconds before a slow request is also sent to the next mirror
 
 # Radio Browser website for reference
 RADIO_BROWSER_URL = "https://www.radio-browser.info/"
@@ -271,29 +352,102 @@ RADIO_DIR = BASE_DIR / "RADIO"
 LOGO_DIR = BASE_DIR / "radio-logos"
 THUMB_DIR = LOGO_DIR / "thumbs"
 
+# Local caches (not part of the moOde backup)
+LOGO_CACHE_DIR = BASE_DIR / ".logo_cache"
+BUILD_STATE_OUT = BASE_DIR / "build_state.json"
+MIRROR_CACHE_OUT = BASE_DIR / "mirror_ranking.json"
+STATION_INDEX_OUT = BASE_DIR / "station_index.sqlite"   # stations of station_data.json, for merges
+CATALOGUE_OUT = BASE_DIR / "catalogue.sqlite"            # mirror of the Radio Browser catalogue
+
 # Output files
 JSON_OUT = BASE_DIR / "station_data.json"
 ZIP_OUT = BASE_DIR / "moode_radio_backup.zip"
 CSV_OUT = BASE_DIR / "radiostreams.csv"
 LOG_FILE = BASE_DIR / "scraper.log"
 SUMMARY_OUT = BASE_DIR / "run_summary.json"
+PROFILE_OUT = BASE_DIR / "profile.folded"             # --profile: collapsed stacks for flamegraph tools
+PROFILE_PHASES_OUT = BASE_DIR / "profile_phases.json"  # --profile: hottest functions per phase
 ERROR_OUT = BASE_DIR / "error_report.json"
+EVENT_LOG_OUT = BASE_DIR / "events.jsonl"   # errors/warnings/timeouts as they happen; error_report.json is derived
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 }
 AUDIO_EXTENSIONS = (".mp3", ".aac", ".aacp", ".ogg", ".m3u8", ".flac", ".opus")
+STREAM_CONTENT_TYPES = {   # stream Content-Type → moOde format
+    "audio/mpeg": "MP3", "audio/mp3": "MP3", "audio/aac": "AAC", "audio/x-aac": "AAC",
+    "audio/aacp": "AAC+", "audio/ogg": "OGG", "application/ogg": "OGG", "audio/flac": "FLAC",
+    "audio/opus": "OPUS", "application/vnd.apple.mpegurl": "HLS", "application/x-mpegurl": "HLS",
+    "audio/x-mpegurl": "HLS",
+}
 
 # Timeout settings
 REQUEST_TIMEOUT = 15
 STATION_TIMEOUT = 60
 LOGO_TIMEOUT = 30
-REQUEST_DELAY = 0.3
-
-# Logo sizes per moOde specs
-LOGO_SIZE = (335, 335)
-THUMB_SIZE = (80, 80)
-THUMB_SM_SIZE = (80, 80)
+REQUEST_DELAY = 0.3   # minimum delay between requests to the same host
+
+# Concurrency settings
+STATION_WORKERS = 8   # parallel station workers (1 = sequential)
+
+# Stream probing (optional stage before .pls files are written)
+STREAM_PROBE = False              # open every stream briefly to check it and read its ICY headers
+STREAM_PROBE_CONCURRENCY = 64     # probes in flight
+STREAM_PROBE_PER_HOST = 8         # probes in flight per streaming host
+STREAM_PROBE_TIMEOUT = 8          # seconds per station, all candidate URLs and redirects included
+STREAM_PROBE_MAX_REDIRECTS = 5
+STREAM_PROBE_DROP_DEAD = True     # leave stations whose stream does not answer out of the build
+
+# Logo rendering (decode/resize/encode)
+RENDER_PROCESSES = None    # render worker processes: None = one per CPU core, 0 = render in-process
+
+# Logo download engine
+LOGO_ENGINE = "async"      # "async" = pooled asyncio engine, "thread" = per-station download
+LOGO_MAX_IN_FLIGHT = 32    # overall concurrent logo downloads
+LOGO_PER_HOST = 4          # concurrent logo downloads per host
+
+# Logo cache (favicon URL → content hash → rendered JPGs)
+LOGO_CACHE_ENABLED = True
+LOGO_CACHE_MAX_BYTES = 256 * 1024 * 1024   # LRU eviction above this size
+LOGO_CACHE_FRESH_SECONDS = 24 * 3600       # no revalidation for entries checked within this window
+
+# HTTP session (shared by API and logo requests)
+HTTP_POOL_CONNECTIONS = 64   # hosts with a kept-alive connection pool
+HTTP_POOL_MAXSIZE = 8        # kept-alive connections per host
+HTTP_CONNECT_RETRIES = 2     # retries on connection errors (read timeouts are never retried)
+HTTP_BACKOFF_FACTOR = 0.5    # backoff between connection retries: 0.5s, 1s, 2s, ...
+
+# Event log (errors, warnings, timeouts)
+EVENT_FLUSH_INTERVAL = 0.5   # seconds between writes of buffered events
+EVENT_FLUSH_EVENTS = 512     # write early once this many events are buffered
+EVENT_BUFFER_MAX = 65536     # producers wait for the writer beyond this many buffered events
+
+# Profiling (--profile)
+PROFILE_INTERVAL = 0.005   # seconds between stack samples
+PROFILE_TOP = 25           # functions listed per phase in profile_phases.json
+
+# Live metrics for unattended builds (Prometheus text format)
+METRICS_PORT = None              # serve /metrics on this port while a build runs (None = off)
+METRICS_ADDRESS = "127.0.0.1"    # interface of the metrics endpoint
+METRICS_TEXTFILE = None          # path for node_exporter's textfile collector (None = off)
+METRICS_TEXTFILE_INTERVAL = 15   # seconds between textfile updates
+
+# Backup ZIP
+ZIP_STREAMING = True       # append station files to the ZIP while stations are processed
+ZIP_TEXT_COMPRESSLEVEL = 9 # deflate level of .pls/.json entries (JPEGs are stored)
+ZIP_UPDATE = True          # update an existing backup in place instead of rewriting it
+ZIP_COMPACT_RATIO = 0.25   # rewrite the backup once unreferenced space exceeds this share
+ZIP_VERIFY_MODE = "quick"  # "quick" = central directory + layout, "full" = also CRC of every entry
+ZIP_VERIFY_WORKERS = None  # parallel CRC chunks in full mode: None = one per CPU core
+
+# Logo renditions per moOde specs: (kind, size, JPEG quality), "logo" first.
+# "logo" is written to radio-logos/{name}.jpg, "thumb<suffix>" to
+# radio-logos/thumbs/{name}<suffix>.jpg and any other kind to thumbs/{name}_{kind}.jpg
+LOGO_RENDITIONS = [
+    ("logo", (335, 335), 92),
+    ("thumb", (80, 80), 85),
+    ("thumb_sm", (80, 80), 85),
+]
 
 # Database fields matching cfg_radio table structure
 FIELDS = [
@@ -302,56 +456,809 @@ FIELDS = [
     "home_page", "monitor"
 ]
 
-# Create directories
-RADIO_DIR.mkdir(parents=True, exist_ok=True)
-LOGO_DIR.mkdir(parents=True, exist_ok=True)
-THUMB_DIR.mkdir(parents=True, exist_ok=True)
+# Settings a RadioBuilder can override per build: config key → CONFIG constant
+BUILD_SETTINGS = {
+    "station_workers": "STATION_WORKERS",
+    "logo_engine": "LOGO_ENGINE",
+    "page_size": "API_PAGE_SIZE",
+    "catalogue_source": "CATALOGUE_SOURCE",
+    "stream_probe": "STREAM_PROBE",
+    "render_processes": "RENDER_PROCESSES",
+    "logo_cache": "LOGO_CACHE_ENABLED",
+    "zip_streaming": "ZIP_STREAMING",
+    "zip_update": "ZIP_UPDATE",
+    "zip_verify_mode": "ZIP_VERIFY_MODE",
+}
+
+
+def ensure_output_dirs():
+    """Create the moOde output directories of the active build."""
+    builder = current_builder()
+    for directory in (builder.radio_dir, builder.logo_dir, builder.thumb_dir):
+        directory.mkdir(parents=True, exist_ok=True)
+
 
 # ============================================================
 # LOGGER
 # ============================================================
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s | %(levelname)s | %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_FILE, encoding="utf-8"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger("radio-scraper")
 
 
+def setup_logging(level=logging.INFO):
+    """Log to the console and LOG_FILE; called by the entry points, not on import."""
+    logging.basicConfig(
+        level=level,
+        format="%(asctime)s | %(levelname)s | %(message)s",
+        handlers=[
+            logging.FileHandler(LOG_FILE, encoding="utf-8"),
+            logging.StreamHandler()
+        ]
+    )
+
+
 # ============================================================
-# TIMEOUT HELPER - NO RETRY ON TIMEOUT
+# TASK SCHEDULER - DEADLINES & COOPERATIVE CANCELLATION
 # ============================================================
 
-def run_with_timeout(func, args=(), kwargs=None, timeout=STATION_TIMEOUT):
-    """Run a function with a timeout. NO RETRY on timeout."""
-    if kwargs is None:
-        kwargs = {}
+class DeadlineExceeded(Exception):
+    """Raised at a checkpoint once the running phase's deadline has passed."""
+
+
+class Deadline:
+    """Point in time after which a task phase must stop; never outlives its parent."""
+
+    def __init__(self, seconds, phase="task", parent=None, cancel_event=None):
+        self.phase = phase
+        self.seconds = seconds
+        self.expires = time.monotonic() + seconds
+        self.cancel_event = cancel_event
+        if parent is not None:
+            self.expires = min(self.expires, parent.expires)
+            self.cancel_event = parent.cancel_event
+
+    def remaining(self):
+        return self.expires - time.monotonic()
+
+    def expired(self):
+        cancelled = self.cancel_event is not None and self.cancel_event.is_set()
+        return cancelled or self.remaining() <= 0
+
+    def check(self):
+        if self.expired():
+            raise DeadlineExceeded(f"{self.phase} deadline exceeded")
+
+
+_task_context = threading.local()
+
+
+def current_deadline():
+    """Deadline of the phase running in this thread, or None."""
+    return getattr(_task_context, "deadline", None)
+
+
+@contextmanager
+def deadline_scope(seconds, phase, deadline=None):
+    """Run the enclosed block under a (nested) phase deadline."""
+    parent = current_deadline()
+    if deadline is None:
+        deadline = Deadline(seconds, phase, parent, getattr(_task_context, "cancel_event", None))
+    _task_context.deadline = deadline
+    try:
+        yield deadline
+    finally:
+        _task_context.deadline = parent
+
+
+def checkpoint():
+    """Stop the current task if its deadline passed or it was cancelled."""
+    deadline = current_deadline()
+    if deadline is not None:
+        deadline.check()
 
-    result_container = {"result": None, "error": None, "completed": False}
 
-    def target():
+def http_timeout(default=REQUEST_TIMEOUT):
+    """Per-request timeout, shrunk to what is left of the current deadline."""
+    deadline = current_deadline()
+    if deadline is None:
+        return default
+    deadline.check()
+    return min(default, deadline.remaining())
+
+
+def run_with_deadline(func, args=(), kwargs=None, timeout=STATION_TIMEOUT, phase="task", deadline=None):
+    """Run a function in the calling thread under a phase deadline. NO RETRY on timeout.
+
+    Returns (success, result). Work stops at its next checkpoint or network
+    operation once the deadline passes; nothing is left running afterwards.
+    """
+    with deadline_scope(timeout, phase, deadline) as scope:
         try:
-            result_container["result"] = func(*args, **kwargs)
-            result_container["completed"] = True
+            return True, func(*args, **(kwargs or {}))
+        except DeadlineExceeded:
+            return False, f"TIMEOUT after {timeout}s - skipped (no retry)"
         except Exception as e:
-            result_container["error"] = e
-            result_container["completed"] = True
+            if scope.expired():
+                return False, f"TIMEOUT after {timeout}s - skipped (no retry)"
+            return False, str(e)
+
+
+class TaskScheduler:
+    """Bounded worker pool with cooperative cancellation.
+
+    At most `max_workers` threads ever run tasks. cancel() sets an event that
+    every deadline created inside the workers observes, so running tasks stop
+    at their next checkpoint and queued tasks are dropped.
+    """
+
+    def __init__(self, max_workers, name="task"):
+        self.max_workers = max_workers
+        self.cancel_event = threading.Event()
+        self._pool = builder_pool(max_workers, name)
+
+    def submit(self, func, *args):
+        return self._pool.submit(self._run, func, args)
+
+    def _run(self, func, args):
+        if self.cancel_event.is_set():
+            raise DeadlineExceeded("scheduler cancelled")
+        _task_context.cancel_event = self.cancel_event
+        try:
+            return func(*args)
+        finally:
+            _task_context.cancel_event = None
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def shutdown(self, cancel=False):
+        if cancel:
+            self.cancel()
+        self._pool.shutdown(wait=True, cancel_futures=cancel)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown(cancel=exc_type is not None)
+
+
+# ============================================================
+# BUILD CONTEXT - ACTIVE BUILDER PER THREAD
+# ============================================================
+
+_default_builder = None
+_default_builder_lock = threading.Lock()
+
+
+def default_builder():
+    """The build next to this script, as used by the menu and batch mode."""
+    global _default_builder
+    with _default_builder_lock:
+        if _default_builder is None:
+            _default_builder = RadioBuilder()
+        return _default_builder
+
+
+def current_builder():
+    """RadioBuilder whose tree and backends this thread works with."""
+    return getattr(_task_context, "builder", None) or default_builder()
+
+
+def set_thread_builder(builder):
+    """Make `builder` the active builder of this thread (pool initializer)."""
+    _task_context.builder = builder
+
+
+def builder_pool(max_workers, name):
+    """Thread pool whose workers run under the calling thread's builder."""
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name,
+                              initializer=set_thread_builder, initargs=(current_builder(),))
+
+
+# ============================================================
+# PER-HOST POLITENESS
+# ============================================================
+
+class HostThrottle:
+    """Enforces a minimum delay between requests to the same host (thread-safe)."""
 
-    thread = threading.Thread(target=target, daemon=True)
-    thread.start()
-    thread.join(timeout=timeout)
+    def __init__(self, delay=REQUEST_DELAY):
+        self.delay = delay
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, url):
+        """Reserve the next slot for the host of `url`; returns seconds to wait."""
+        if self.delay <= 0:
+            return 0.0
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + self.delay
+        return max(0.0, slot - now)
+
+    def wait(self, url):
+        """Block until the host of `url` may be contacted again (within the current deadline)."""
+        remaining = self.reserve(url)
+        if remaining > 0:
+            deadline = current_deadline()
+            if deadline is not None:
+                remaining = min(remaining, max(0.0, deadline.remaining()))
+            time.sleep(remaining)
+            checkpoint()
+
+
+host_throttle = HostThrottle()
+
+
+# ============================================================
+# HTTP SESSION - POOLED CONNECTIONS
+# ============================================================
+
+_pooled_adapter_class = None
+
+
+def pooled_adapter_class():
+    """HTTPAdapter whose PoolManager keeps request/connection counts (defined on first use)."""
+    global _pooled_adapter_class
+    if _pooled_adapter_class is not None:
+        return _pooled_adapter_class
+    from requests.adapters import HTTPAdapter
+    from urllib3 import PoolManager
+
+    class CountingPoolManager(PoolManager):
+        """PoolManager that keeps request/connection counts, including evicted pools."""
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self._live_pools = weakref.WeakSet()
+            self._retired = {"requests": 0, "connections": 0}
+            dispose = self.pools.dispose_func
+
+            def retire(pool):
+                self._retired["requests"] += pool.num_requests
+                self._retired["connections"] += pool.num_connections
+                self._live_pools.discard(pool)
+                if dispose:
+                    dispose(pool)
+
+            self.pools.dispose_func = retire
+
+        def _new_pool(self, *args, **kwargs):
+            pool = super()._new_pool(*args, **kwargs)
+            self._live_pools.add(pool)
+            return pool
+
+        def connection_stats(self):
+            """Total requests sent and connections opened by this manager."""
+            live = list(self._live_pools)
+            return (self._retired["requests"] + sum(p.num_requests for p in live),
+                    self._retired["connections"] + sum(p.num_connections for p in live))
+
+    class PooledHTTPAdapter(HTTPAdapter):
+        """HTTPAdapter backed by a CountingPoolManager."""
+
+        def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+            self._pool_connections = connections
+            self._pool_maxsize = maxsize
+            self._pool_block = block
+            self.poolmanager = CountingPoolManager(
+                num_pools=connections, maxsize=maxsize, block=block, **pool_kwargs
+            )
+
+    _pooled_adapter_class = PooledHTTPAdapter
+    return PooledHTTPAdapter
+
+
+def create_http_session(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE,
+                        connect_retries=HTTP_CONNECT_RETRIES, backoff_factor=HTTP_BACKOFF_FACTOR):
+    """Create a keep-alive session with pooled adapters and connection-error retries."""
+    requests = import_required("requests")
+    from urllib3.util.retry import Retry
+    retry = Retry(
+        total=None, connect=connect_retries, read=0, status=0, other=0,
+        backoff_factor=backoff_factor, raise_on_status=False
+    )
+    adapter = pooled_adapter_class()(
+        pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry
+    )
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+def get_http_session():
+    """Return the active builder's HTTP session, else the shared one (created on first use)."""
+    global _http_session
+    session = current_builder().session
+    if session is not None:
+        return session
+    with _http_session_lock:
+        if _http_session is None:
+            _http_session = create_http_session()
+        return _http_session
+
+
+def http_connection_stats(session=None):
+    """Requests sent, connections opened and connections reused by a session."""
+    session = session or current_builder().session or _http_session
+    total_requests = opened = 0
+    if session is not None:
+        adapters = {id(a): a for a in session.adapters.values()}.values()
+        for adapter in adapters:
+            if _pooled_adapter_class is not None and isinstance(adapter, _pooled_adapter_class):
+                sent, created = adapter.poolmanager.connection_stats()
+                total_requests += sent
+                opened += created
+    return {
+        "requests": total_requests,
+        "connections_opened": opened,
+        "connections_reused": max(0, total_requests - opened)
+    }
+
+
+# ============================================================
+# RUN METRICS - PHASE TIMINGS & THROUGHPUT
+# ============================================================
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram: constant memory, percentiles within ~5%.
+
+    Bucket i holds durations up to FLOOR * GROWTH**i seconds, so a build of
+    any size keeps a few hundred counters per histogram at most.
+    """
+
+    FLOOR = 0.0001   # seconds; everything faster lands in bucket 0
+    GROWTH = 1.1
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        bucket = 0 if seconds <= self.FLOOR else math.ceil(math.log(seconds / self.FLOOR, self.GROWTH))
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q):
+        """Upper bound of the q-th percentile (0-100) in seconds, capped at the maximum."""
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * q / 100)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(self.FLOOR * self.GROWTH ** bucket, self.max)
+        return self.max
+
+    def summary(self):
+        """Count, total and p50/p95/p99/max in milliseconds."""
+        return {
+            "count": self.count,
+            "total_seconds": round(self.total, 3),
+            "mean_ms": round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50) * 1000, 2),
+            "p95_ms": round(self.percentile(95) * 1000, 2),
+            "p99_ms": round(self.percentile(99) * 1000, 2),
+            "max_ms": round(self.max * 1000, 2),
+        }
+
+
+class PhaseTimings:
+    """Per-run latency histograms per phase and per host, bytes transferred and throughput.
+
+    Phases: api_fetch, stream_probe, logo_download, logo_render (with
+    logo_decode/logo_resize/logo_encode inside it), logo_write, pls_write,
+    station_process, zip_add, zip_finalize and zip_verify.
+    """
+
+    RECENT_STATIONS = 200   # window of the current-throughput estimate
+
+    def __init__(self):
+        self.phases = {}
+        self.hosts = {}
+        self.bytes = {}
+        self.in_flight = {}
+        self.queues = {}
+        self.stations = 0
+        self.last_progress = None
+        self._recent = deque(maxlen=self.RECENT_STATIONS)
+        self._lock = threading.Lock()
 
-    if not result_container["completed"]:
-        return False, f"TIMEOUT after {timeout}s - skipped (no retry)"
+    def started(self, phase):
+        """Count an operation of `phase` as in flight until observe() records it."""
+        with self._lock:
+            self.in_flight[phase] = self.in_flight.get(phase, 0) + 1
+
+    def adjust_queue(self, queue, delta):
+        """Change the depth of a work queue (thread-safe)."""
+        with self._lock:
+            self.queues[queue] = self.queues.get(queue, 0) + delta
+
+    def observe(self, phase, seconds, host=None, nbytes=0, started=False):
+        """Record one timed operation (thread-safe); `started` if it was counted by started()."""
+        with self._lock:
+            if started:
+                self.in_flight[phase] -= 1
+            self.phases.setdefault(phase, LatencyHistogram()).add(seconds)
+            if host:
+                self.hosts.setdefault(host, LatencyHistogram()).add(seconds)
+            if nbytes:
+                self.bytes[phase] = self.bytes.get(phase, 0) + nbytes
+
+    def station_done(self):
+        """Count a finished station for the throughput figures."""
+        with self._lock:
+            self.stations += 1
+            self.last_progress = time.time()
+            self._recent.append(time.monotonic())
+
+    def recent_rate(self):
+        """Stations per second over the last RECENT_STATIONS stations (0.0 until two are done)."""
+        with self._lock:
+            if len(self._recent) < 2 or self._recent[-1] == self._recent[0]:
+                return 0.0
+            return (len(self._recent) - 1) / (self._recent[-1] - self._recent[0])
+
+    def snapshot(self):
+        """Consistent copy of the live figures: per-phase (p50, p95, p99, total, count) and gauges."""
+        with self._lock:
+            return {
+                "phases": {phase: (hist.percentile(50), hist.percentile(95), hist.percentile(99),
+                                   hist.total, hist.count)
+                           for phase, hist in sorted(self.phases.items())},
+                "in_flight": dict(sorted(self.in_flight.items())),
+                "queues": dict(sorted(self.queues.items())),
+                "bytes": dict(sorted(self.bytes.items())),
+                "stations": self.stations,
+                "last_progress": self.last_progress,
+            }
+
+    def summary(self, runtime, top_hosts=20):
+        """run_summary.json section; hosts are the `top_hosts` with the most time spent."""
+        with self._lock:
+            hosts = sorted(self.hosts.items(), key=lambda item: item[1].total, reverse=True)
+            return {
+                "stations_per_second": round(self.stations / runtime, 2) if runtime > 0 else 0.0,
+                "bytes_transferred": {"total": sum(self.bytes.values()), **self.bytes},
+                "phases": {phase: hist.summary() for phase, hist in sorted(self.phases.items())},
+                "hosts": {host: hist.summary() for host, hist in hosts[:top_hosts]},
+                "hosts_total": len(hosts),
+            }
+
+
+@contextmanager
+def timed_phase(phase, host=None):
+    """Time the enclosed block, or the decorated function, into the active build's PhaseTimings.
+
+    The block counts as in flight while it runs. It may store the bytes it
+    transferred in the yielded dict under "bytes". A no-op while the build
+    has no Watchdog.
+    """
+    sample = {}
+    timings = current_builder().timings
+    profiler = _profiler
+    if timings is None and profiler is None:
+        yield sample
+        return
+    if profiler is not None:
+        profiler.enter(phase)
+    if timings is not None:
+        timings.started(phase)
+    start = time.perf_counter()
+    try:
+        yield sample
+    finally:
+        if timings is not None:
+            timings.observe(phase, time.perf_counter() - start, host, sample.get("bytes", 0), started=True)
+        if profiler is not None:
+            profiler.leave()
+
+
+def record_phase(phase, seconds, host=None, nbytes=0):
+    """Record a duration measured elsewhere (e.g. in a render worker process)."""
+    timings = current_builder().timings
+    if timings is not None:
+        timings.observe(phase, seconds, host, nbytes)
+
+
+def adjust_queue(queue, delta):
+    """Change a work queue depth of the active build (no-op without a Watchdog)."""
+    timings = current_builder().timings
+    if timings is not None:
+        timings.adjust_queue(queue, delta)
 
-    if result_container["error"]:
-        return False, str(result_container["error"])
 
-    return True, result_container["result"]
+# ============================================================
+# PROFILER - SAMPLED STACKS PER PHASE
+# ============================================================
+
+_profiler = None
+
+
+class StackProfiler:
+    """Wall-clock sampling profiler that attributes stacks to pipeline phases.
+
+    A background thread samples, every `interval` seconds, the thread that
+    started the profiler and every thread inside a timed_phase(). Each
+    stack is rooted at its phases (outermost first, "main" for the starting
+    thread outside any phase). stop() writes them as collapsed stacks
+    (flamegraph.pl / speedscope format) to `folded_path` and the hottest
+    functions per innermost phase to `phases_path`. Renders on the process
+    pool show up as the logo_render wait; set RENDER_PROCESSES = 0 to
+    sample Pillow/pyvips themselves. While no profiler runs, timed_phase()
+    costs a single global lookup.
+    """
+
+    def __init__(self, folded_path=None, phases_path=None, interval=PROFILE_INTERVAL):
+        builder = current_builder()
+        self.folded_path = Path(folded_path or builder.profile_out)
+        self.phases_path = Path(phases_path or builder.profile_phases_out)
+        self.interval = interval
+        self.stacks = {}
+        self.samples = 0
+        self._phases = {}
+        self._main = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def enter(self, phase):
+        """Mark the calling thread as working on `phase` (nested phases stack)."""
+        self._phases.setdefault(threading.get_ident(), []).append(phase)
+
+    def leave(self):
+        stack = self._phases.get(threading.get_ident())
+        if stack:
+            stack.pop()
+
+    @staticmethod
+    def _frame_label(frame):
+        code = frame.f_code
+        return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+    def _sample(self):
+        own = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            phases = tuple(self._phases.get(ident) or ())
+            if ident == own or not (phases or ident == self._main):
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(self._frame_label(frame))
+                frame = frame.f_back
+            key = (phases or ("main",), tuple(reversed(labels)))
+            self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        """Start sampling; returns self."""
+        global _profiler
+        self._main = threading.get_ident()
+        _profiler = self
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+        logger.info(f"Profiling every {self.interval * 1000:.0f} ms → {self.folded_path}")
+        return self
+
+    def stop(self):
+        """Stop sampling and write the profiles."""
+        global _profiler
+        _profiler = None
+        self._stop.set()
+        self._thread.join()
+        self.write()
+
+    def phase_report(self, top=PROFILE_TOP):
+        """{phase: samples, seconds and the `top` functions by self and total samples}."""
+        phases = {}
+        for (phase_stack, frames), count in self.stacks.items():
+            entry = phases.setdefault(phase_stack[-1], {"samples": 0, "self": {}, "total": {}})
+            entry["samples"] += count
+            if frames:
+                entry["self"][frames[-1]] = entry["self"].get(frames[-1], 0) + count
+            for label in set(frames):
+                entry["total"][label] = entry["total"].get(label, 0) + count
+
+        def ranked(counts):
+            return [{"function": label, "samples": n}
+                    for label, n in sorted(counts.items(), key=lambda item: item[1], reverse=True)[:top]]
+
+        return {phase: {"samples": entry["samples"],
+                        "seconds": round(entry["samples"] * self.interval, 3),
+                        "self": ranked(entry["self"]),
+                        "total": ranked(entry["total"])}
+                for phase, entry in sorted(phases.items(), key=lambda item: item[1]["samples"], reverse=True)}
+
+    def write(self):
+        with open(self.folded_path, "w", encoding="utf-8") as f:
+            for (phase_stack, frames), count in sorted(self.stacks.items()):
+                f.write(f"{';'.join(label.replace(';', ':') for label in phase_stack + frames)} {count}\n")
+        report = {"interval_seconds": self.interval, "samples": self.samples, "phases": self.phase_report()}
+        with open(self.phases_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        logger.info(f"Profile written: {self.folded_path} ({self.samples} samples), {self.phases_path}")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+# ============================================================
+# EVENT LOG - BUFFERED JSON LINES
+# ============================================================
+
+EVENT_REPORT_KINDS = (("error", "errors"), ("warning", "warnings"), ("timeout", "timeouts"))
+
+
+class EventLog:
+    """Append-only JSON-lines log of run events, written by a background thread.
+
+    emit() only appends to a deque (no lock, no formatting); the writer
+    thread formats timestamps, serializes and flushes every
+    EVENT_FLUSH_INTERVAL seconds or EVENT_FLUSH_EVENTS events, so memory is
+    bounded by what is buffered between writes. The file is created on the
+    first event. If it still holds an unfinished earlier run (no "finished"
+    event), that run's error report is recovered from it first. An event
+    after close() reopens the log and appends to it (the menu reuses one
+    Watchdog for several builds).
+    """
+
+    def __init__(self, path, report_path):
+        self.path = Path(path)
+        self.report_path = Path(report_path)
+        self.counts = {}
+        self._pending = deque()
+        self._wake = threading.Event()
+        self._drained = threading.Event()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+
+    def emit(self, kind, **fields):
+        """Queue an event (thread-safe, non-blocking unless EVENT_BUFFER_MAX events are buffered)."""
+        if self._thread is None or self._closed:
+            self._start()
+        self._pending.append((time.time(), kind, fields))
+        if len(self._pending) >= EVENT_FLUSH_EVENTS:
+            self._wake.set()
+            while len(self._pending) >= EVENT_BUFFER_MAX and self._thread.is_alive():
+                self._drained.wait(EVENT_FLUSH_INTERVAL)
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is not None and not self._closed:
+                return
+            if self._thread is None:
+                recover_error_report(self.path, self.report_path)
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "w" if self._thread is None else "a", encoding="utf-8")
+            self._closed = False
+            self._thread = threading.Thread(target=self._run, name="event-log", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def _write_lines(self, lines):
+        if lines:
+            self._file.writelines(lines)
+            self._file.flush()
+            lines.clear()
+
+    def _write_pending(self):
+        lines = []
+        while self._pending:
+            timestamp, kind, fields = self._pending.popleft()
+            if timestamp is None:   # flush() marker: everything before it is written now
+                self._write_lines(lines)
+                kind.set()
+                continue
+            self.counts[kind] = self.counts.get(kind, 0) + 1
+            event = {"event": kind, "timestamp": datetime.fromtimestamp(timestamp, timezone.utc).isoformat()}
+            event.update(fields)
+            lines.append(json.dumps(event, ensure_ascii=False, default=str) + "\n")
+        self._write_lines(lines)
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(EVENT_FLUSH_INTERVAL)
+            self._wake.clear()
+            self._drained.clear()
+            self._write_pending()
+            self._drained.set()
+
+    def flush(self):
+        """Wait until every event emitted so far is on disk."""
+        if self._thread is None or self._closed:
+            return
+        written = threading.Event()
+        self._pending.append((None, written, None))
+        self._wake.set()
+        while not written.wait(EVENT_FLUSH_INTERVAL) and self._thread.is_alive():
+            pass
+
+    def count(self, kind):
+        """Events of `kind` emitted so far (written ones, plus the buffered ones after flush())."""
+        return self.counts.get(kind, 0)
+
+    def close(self):
+        """Write the remaining events and stop the writer."""
+        if self._thread is None or self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        self._write_pending()
+        self._file.close()
+        atexit.unregister(self.close)
+
+
+def iter_events(path, kinds=None):
+    """Yield the events of an event log, optionally only those whose type is in `kinds`."""
+    try:
+        f = open(path, "r", encoding="utf-8")
+    except FileNotFoundError:
+        return
+    with f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue   # last line cut off by a crash
+            if kinds is None or event.get("event") in kinds:
+                yield event
+
+
+def write_error_report(events_path, report_path, generated_at=None):
+    """Derive error_report.json from an event log, streaming; returns the counts per event type."""
+    counts = {kind: 0 for kind, _ in EVENT_REPORT_KINDS}
+    for event in iter_events(events_path, counts):
+        counts[event["event"]] += 1
+    with open(report_path, "w", encoding="utf-8") as f:
+        f.write("{\n")
+        f.write(f'  "generated_at": {json.dumps(generated_at or datetime.now(timezone.utc).isoformat())},\n')
+        for kind, key in EVENT_REPORT_KINDS:
+            f.write(f'  "total_{key}": {counts[kind]},\n')
+        for n, (kind, key) in enumerate(EVENT_REPORT_KINDS):
+            f.write(f'  "{key}": [')
+            separator = "\n"
+            for event in iter_events(events_path, (kind,)):
+                event.pop("event")
+                f.write(separator + "    " + json.dumps(event, ensure_ascii=False))
+                separator = ",\n"
+            f.write("\n  ]" if separator != "\n" else "]")
+            f.write(",\n" if n < len(EVENT_REPORT_KINDS) - 1 else "\n")
+        f.write("}\n")
+    return counts
+
+
+def recover_error_report(events_path, report_path):
+    """Write the error report of an interrupted run whose event log has no "finished" event."""
+    last = None
+    for last in iter_events(events_path):
+        pass
+    if last is None or last.get("event") == "finished":
+        return False
+    write_error_report(events_path, report_path)
+    logger.warning(f"Previous run was interrupted - error report recovered from {events_path}")
+    return True
 
 
 # ============================================================
@@ -362,57 +1269,47 @@ class Watchdog:
     """Monitors scraping progress and tracks errors for reporting."""
 
     def __init__(self):
+        self.builder = current_builder()
         self.start_time = datetime.now(timezone.utc)
-        self.errors = []
-        self.warnings = []
-        self.timeouts = []
+        self.events = EventLog(self.builder.event_log_out, self.builder.error_out)
         self.metrics = {
             "stations_total": 0,
             "stations_success": 0,
             "stations_failed": 0,
             "stations_skipped": 0,
             "stations_timeout": 0,
+            "stations_unchanged": 0,
+            "stations_removed": 0,
+            "stations_dead": 0,
             "streams_found": 0,
+            "streams_probed": 0,
+            "streams_redirected": 0,
             "pls_created": 0,
             "logos_converted": 0,
             "logos_skipped": 0,
             "logos_failed": 0,
             "logos_timeout": 0,
+            "logos_cached": 0,
             "svg_skipped": 0
         }
+        self.timings = PhaseTimings()
+        self.builder.timings = self.timings
         self._lock = threading.Lock()
 
     def log_error(self, station, phase, message, exception=None):
         """Log an error for a station (thread-safe)."""
-        with self._lock:
-            self.errors.append({
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-                "station": station,
-                "phase": phase,
-                "message": message,
-                "exception": str(exception) if exception else None
-            })
+        self.events.emit("error", station=station, phase=phase, message=message,
+                         exception=str(exception) if exception else None)
 
     def log_warning(self, station, message):
         """Log a warning for a station (thread-safe)."""
-        with self._lock:
-            self.warnings.append({
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-                "station": station,
-                "message": message
-            })
+        self.events.emit("warning", station=station, message=message)
 
     def log_timeout(self, station, phase, duration):
         """Log a timeout - NOT retried (thread-safe)."""
-        with self._lock:
-            self.timeouts.append({
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-                "station": station,
-                "phase": phase,
-                "duration_seconds": duration,
-                "action": "skipped (no retry)"
-            })
-            self.metrics["stations_timeout"] += 1
+        self.events.emit("timeout", station=station, phase=phase, duration_seconds=duration,
+                         action="skipped (no retry)")
+        self.increment("stations_timeout")
 
     def increment(self, metric, value=1):
         """Thread-safe metric increment."""
@@ -420,10 +1317,18 @@ class Watchdog:
             if metric in self.metrics:
                 self.metrics[metric] += value
 
+    def snapshot(self):
+        """Copy of the counters plus error/warning/timeout totals (events written so far)."""
+        with self._lock:
+            metrics = dict(self.metrics)
+        return metrics, {key: self.events.count(kind) for kind, key in EVENT_REPORT_KINDS}
+
     def finish(self):
-        """Generate summary and error reports."""
+        """Generate summary and error reports, and close the event log."""
         end_time = datetime.now(timezone.utc)
         runtime = (end_time - self.start_time).total_seconds()
+        self.events.flush()
+        errors, warnings, timeouts = (self.events.count(kind) for kind, _ in EVENT_REPORT_KINDS)
 
         summary = {
             "version": "v29",
@@ -432,35 +1337,29 @@ class Watchdog:
             "ended_at": end_time.isoformat(),
             "runtime_seconds": runtime,
             "runtime_formatted": f"{int(runtime // 60)}m {int(runtime % 60)}s",
-            "svg_support": SVG_ENABLED,
+            "svg_support": SVG_ENABLED if _svg_checked else None,
             "timeout_setting": f"{STATION_TIMEOUT}s per station (no retry)",
             "metrics": self.metrics,
-            "total_errors": len(self.errors),
-            "total_warnings": len(self.warnings),
-            "total_timeouts": len(self.timeouts)
+            "http": http_connection_stats(self.builder.session),
+            "performance": self.timings.summary(runtime),
+            "total_errors": errors,
+            "total_warnings": warnings,
+            "total_timeouts": timeouts
         }
 
-        with open(SUMMARY_OUT, "w", encoding="utf-8") as f:
+        with open(self.builder.summary_out, "w", encoding="utf-8") as f:
             json.dump(summary, f, indent=2, ensure_ascii=False)
 
-        error_report = {
-            "generated_at": end_time.isoformat(),
-            "total_errors": len(self.errors),
-            "total_warnings": len(self.warnings),
-            "total_timeouts": len(self.timeouts),
-            "errors": self.errors,
-            "warnings": self.warnings,
-            "timeouts": self.timeouts
-        }
-        with open(ERROR_OUT, "w", encoding="utf-8") as f:
-            json.dump(error_report, f, indent=2, ensure_ascii=False)
+        self.events.emit("finished", runtime_seconds=runtime)
+        self.events.close()
+        write_error_report(self.events.path, self.builder.error_out, end_time.isoformat())
 
         m = self.metrics
         print("\n" + "=" * 65)
         print("  SCRAPING SUMMARY")
         print("=" * 65)
         print(f"  Runtime:           {summary['runtime_formatted']}")
-        print(f"  SVG Support:       {'Enabled (pyvips)' if SVG_ENABLED else 'Disabled'}")
+        print(f"  SVG Support:       {svg_status().capitalize()}")
         print(f"  Timeout:           {STATION_TIMEOUT}s per station (no retry)")
         print("-" * 65)
         print(f"  Stations Total:    {m['stations_total']}")
@@ -468,31 +1367,344 @@ class Watchdog:
         print(f"  Stations Failed:   {m['stations_failed']}")
         print(f"  Stations Timeout:  {m['stations_timeout']} (skipped, no retry)")
         print(f"  Stations Skipped:  {m['stations_skipped']}")
+        if m['stations_unchanged'] or m['stations_removed']:
+            print(f"  Unchanged:         {m['stations_unchanged']} (incremental, not reprocessed)")
+            print(f"  Removed:           {m['stations_removed']} (no longer listed)")
+        if m['streams_probed']:
+            print(f"  Streams Probed:    {m['streams_probed']} ({m['stations_dead']} dead stations dropped, "
+                  f"{m['streams_redirected']} redirected)")
         print("-" * 65)
         print(f"  PLS Files Created: {m['pls_created']}")
         print(f"  Logos Converted:   {m['logos_converted']}")
         print(f"  Logos Skipped:     {m['logos_skipped']}")
         print(f"  Logos Failed:      {m['logos_failed']}")
+        print(f"  Logos From Cache:  {m['logos_cached']}")
+        http = summary["http"]
+        print(f"  HTTP Requests:     {http['requests']} ({http['connections_reused']} on reused connections)")
+        performance = summary["performance"]
+        print(f"  Throughput:        {performance['stations_per_second']} stations/s, "
+              f"{performance['bytes_transferred']['total'] / 1e6:.1f} MB downloaded")
+        for phase, stats in performance["phases"].items():
+            print(f"    {phase:<17}{stats['count']:>7} × p50 {stats['p50_ms']:.0f} ms, p95 {stats['p95_ms']:.0f} ms, "
+                  f"p99 {stats['p99_ms']:.0f} ms")
         if m['svg_skipped'] > 0:
             print(f"  SVG Skipped:       {m['svg_skipped']} (pyvips not available)")
         print("-" * 65)
-        print(f"  Errors:            {len(self.errors)}")
-        print(f"  Warnings:          {len(self.warnings)}")
-        print(f"  Timeouts:          {len(self.timeouts)}")
+        print(f"  Errors:            {errors}")
+        print(f"  Warnings:          {warnings}")
+        print(f"  Timeouts:          {timeouts}")
         print("=" * 65)
 
-        if self.errors:
-            logger.warning(f"Completed with {len(self.errors)} errors - see {ERROR_OUT}")
-        if not self.errors and not self.timeouts:
+        if errors:
+            logger.warning(f"Completed with {errors} errors - see {self.builder.error_out}")
+        if not errors and not timeouts:
             logger.info("Completed successfully with no errors")
 
 
+# ============================================================
+# METRICS EXPORT - PROMETHEUS TEXT FORMAT
+# ============================================================
+
+class MetricsExporter:
+    """Live Watchdog metrics in the Prometheus text format, while a build runs.
+
+    Serves GET /metrics on `port` and/or rewrites `textfile` every
+    `interval` seconds (for node_exporter's textfile collector), both from
+    background threads. Exposes the Watchdog counters, per-phase latency
+    summaries, in-flight operations, queue depths, throughput and the time
+    of the last finished station. Without port and textfile it does nothing.
+    """
+
+    PREFIX = "moode_radio_"
+
+    def __init__(self, watchdog, port=None, textfile=None, interval=METRICS_TEXTFILE_INTERVAL,
+                 address=METRICS_ADDRESS):
+        self.watchdog = watchdog
+        self.port = port
+        self.textfile = Path(textfile) if textfile else None
+        self.interval = interval
+        self.address = address
+        self._server = None
+        self._stop = threading.Event()
+        self._threads = []
+
+    def render(self):
+        """Current metrics as Prometheus exposition text."""
+        watchdog = self.watchdog
+        timings = watchdog.timings
+        p = self.PREFIX
+        counters, totals = watchdog.snapshot()
+        live = timings.snapshot()
+        phases, in_flight, queues = live["phases"], live["in_flight"], live["queues"]
+        queues["stations"] = max(0, counters["stations_total"] - live["stations"])
+
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {p}{name} {help_text}")
+            lines.append(f"# TYPE {p}{name} {kind}")
+            for suffix, labels, value in samples:
+                label_text = ",".join(f'{key}="{value}"' for key, value in labels.items())
+                lines.append(f"{p}{name}{suffix}{{{label_text}}} {value}" if label_text
+                             else f"{p}{name}{suffix} {value}")
+
+        for key, value in counters.items():
+            name = key if key.endswith("_total") else f"{key}_total"
+            metric(name, "counter", f"Watchdog counter {key}.", [("", {}, value)])
+        for key, value in totals.items():
+            metric(f"{key}_total", "counter", f"Logged {key}.", [("", {}, value)])
+        metric("phase_seconds", "summary", "Duration of pipeline operations per phase.", [
+            sample
+            for phase, (p50, p95, p99, total, count) in phases.items()
+            for sample in (("", {"phase": phase, "quantile": "0.5"}, p50),
+                           ("", {"phase": phase, "quantile": "0.95"}, p95),
+                           ("", {"phase": phase, "quantile": "0.99"}, p99),
+                           ("_sum", {"phase": phase}, total),
+                           ("_count", {"phase": phase}, count))
+        ])
+        metric("downloaded_bytes_total", "counter", "Bytes downloaded per phase.",
+               [("", {"phase": phase}, value) for phase, value in live["bytes"].items()])
+        metric("in_flight", "gauge", "Operations currently running per phase.",
+               [("", {"phase": phase}, value) for phase, value in in_flight.items()])
+        metric("queue_depth", "gauge", "Work waiting per queue.",
+               [("", {"queue": queue}, value) for queue, value in queues.items()])
+        metric("stations_per_second", "gauge", "Stations finished per second, recent window.",
+               [("", {}, round(timings.recent_rate(), 3))])
+        metric("start_time_seconds", "gauge", "Unix time the run started.",
+               [("", {}, watchdog.start_time.timestamp())])
+        if live["last_progress"] is not None:
+            metric("last_progress_time_seconds", "gauge", "Unix time the last station finished.",
+                   [("", {}, live["last_progress"])])
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self):
+        """Atomically replace the textfile with the current metrics."""
+        partial = self.textfile.with_name(f".{self.textfile.name}.partial")
+        partial.write_text(self.render(), encoding="utf-8")
+        os.replace(partial, self.textfile)
+
+    def _textfile_loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.write_textfile()
+            except OSError as e:
+                logger.warning(f"Metrics textfile not written: {e}")
+
+    def start(self):
+        """Start the endpoint and/or the textfile writer; returns self."""
+        if self.port is not None:
+            from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+            exporter = self
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split("?")[0] not in ("/", "/metrics"):
+                        self.send_error(404)
+                        return
+                    body = exporter.render().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, *args):
+                    pass
+
+            self._server = ThreadingHTTPServer((self.address, self.port), Handler)
+            self._server.daemon_threads = True
+            self._threads.append(threading.Thread(target=self._server.serve_forever,
+                                                  name="metrics-http", daemon=True))
+            logger.info(f"Metrics endpoint: http://{self.address}:{self._server.server_address[1]}/metrics")
+        if self.textfile is not None:
+            self._threads.append(threading.Thread(target=self._textfile_loop, name="metrics-textfile",
+                                                  daemon=True))
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        """Stop the background threads; the textfile keeps the final metrics."""
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        for thread in self._threads:
+            thread.join()
+        if self.textfile is not None:
+            try:
+                self.write_textfile()
+            except OSError as e:
+                logger.warning(f"Metrics textfile not written: {e}")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+# ============================================================
+# LOGO CACHE - CONTENT ADDRESSED
+# ============================================================
+
+class LogoCache:
+    """On-disk logo cache: favicon URL → content hash → rendered JPGs.
+
+    URL entries keep the ETag/Last-Modified validators and are revalidated
+    with a conditional request once older than `fresh_seconds`. Rendered
+    blobs are shared by every URL with identical bytes and evicted
+    least-recently-used when the cache grows beyond `max_bytes`. Blobs hold
+    one JPG per LOGO_RENDITIONS entry; a cache rendered with other
+    renditions is dropped on load.
+    """
+
+    def __init__(self, root, max_bytes=LOGO_CACHE_MAX_BYTES, fresh_seconds=LOGO_CACHE_FRESH_SECONDS):
+        self.root = Path(root)
+        self.blob_dir = self.root / "blobs"
+        self.index_path = self.root / "index.json"
+        self.max_bytes = max_bytes
+        self.fresh_seconds = fresh_seconds
+        self._lock = threading.Lock()
+        self._url_locks = {}
+        self.urls = {}
+        self.blobs = {}
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return
+        if index.get("renditions") != logo_renditions_key():
+            logger.info("Logo cache: renditions changed, dropping cached renders")
+            for path in self.blob_dir.glob("*.jpg"):
+                path.unlink(missing_ok=True)
+            return
+        self.urls = index.get("urls", {})
+        self.blobs = index.get("blobs", {})
+
+    def _blob_paths(self, digest):
+        return [self.blob_dir / f"{digest}{'' if kind == 'logo' else '_' + kind}.jpg"
+                for kind, _, _ in LOGO_RENDITIONS]
+
+    def url_lock(self, url):
+        """Lock serializing fetches of one favicon URL."""
+        with self._lock:
+            return self._url_locks.setdefault(url, threading.Lock())
+
+    def has_blob(self, digest):
+        with self._lock:
+            return digest in self.blobs
+
+    def fresh_digest(self, url):
+        """Digest of a URL checked within the freshness window, else None."""
+        with self._lock:
+            entry = self.urls.get(url)
+            if entry and entry["hash"] in self.blobs \
+                    and time.time() - entry.get("checked_at", 0) < self.fresh_seconds:
+                return entry["hash"]
+        return None
+
+    def validators(self, url):
+        """If-None-Match / If-Modified-Since headers for a cached URL."""
+        with self._lock:
+            entry = self.urls.get(url)
+            if not entry or entry["hash"] not in self.blobs:
+                return {}
+            headers = {}
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+            return headers
+
+    def revalidated(self, url, response_headers):
+        """Record a 304 answer for a URL; returns its digest."""
+        with self._lock:
+            entry = self.urls.get(url)
+            if not entry:
+                return None
+            entry["checked_at"] = time.time()
+            entry["etag"] = response_headers.get("ETag") or entry.get("etag")
+            return entry["hash"]
+
+    def remember(self, url, digest, response_headers):
+        """Map a URL to a content digest along with its validators."""
+        with self._lock:
+            self.urls[url] = {
+                "hash": digest,
+                "etag": response_headers.get("ETag"),
+                "last_modified": response_headers.get("Last-Modified"),
+                "checked_at": time.time()
+            }
+
+    def store(self, url, digest, safe_name, response_headers):
+        """Copy a freshly rendered station logo into the cache."""
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        size = 0
+        for src, dst in zip(logo_output_paths(safe_name), self._blob_paths(digest)):
+            replace_file(dst, src=src)
+            size += dst.stat().st_size
+        with self._lock:
+            self.blobs[digest] = {"size": size, "last_used": time.time()}
+        self.remember(url, digest, response_headers)
+
+    def materialize(self, digest, safe_name):
+        """Write cached renders to a station's logo files; returns a logo result or None."""
+        checkpoint()
+        try:
+            for src, dst, arcname in zip(self._blob_paths(digest), logo_output_paths(safe_name),
+                                         logo_archive_names(safe_name)):
+                if not same_file_content(src, dst):
+                    replace_file(dst, src=src)
+                stream_to_zip(arcname, path=dst)
+        except FileNotFoundError:
+            with self._lock:
+                self.blobs.pop(digest, None)
+            return None
+        with self._lock:
+            if digest in self.blobs:
+                self.blobs[digest]["last_used"] = time.time()
+        return "cached", safe_name
+
+    def save(self):
+        """Evict least-recently-used blobs down to max_bytes and persist the index."""
+        with self._lock:
+            self._evict()
+            index = {"version": 1, "renditions": logo_renditions_key(),
+                     "urls": dict(self.urls), "blobs": dict(self.blobs)}
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        tmp_path.replace(self.index_path)
+
+    def _evict(self):
+        total = sum(blob["size"] for blob in self.blobs.values())
+        if total <= self.max_bytes:
+            return
+        for digest, blob in sorted(self.blobs.items(), key=lambda item: item[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            for path in self._blob_paths(digest):
+                path.unlink(missing_ok=True)
+            total -= blob["size"]
+            del self.blobs[digest]
+        self.urls = {url: entry for url, entry in self.urls.items() if entry["hash"] in self.blobs}
+
+
+def get_logo_cache():
+    """Return the active build's logo cache, or None when caching is disabled."""
+    return current_builder().logo_cache()
+
+
 # ============================================================
 # HELPERS
 # ============================================================
 
 def open_browser(url):
     """Open a URL in the default web browser."""
+    import webbrowser
     try:
         webbrowser.open(url)
         return True
@@ -501,6 +1713,39 @@ def open_browser(url):
         return False
 
 
+def same_file_content(a, b):
+    """True if both files exist with identical bytes."""
+    try:
+        return a.stat().st_size == b.stat().st_size and a.read_bytes() == b.read_bytes()
+    except FileNotFoundError:
+        return False
+
+
+def replace_file(path, data=None, src=None):
+    """Atomically replace `path` with `data`, or with a hardlink/copy of `src`.
+
+    Writing through a temp file never modifies an inode that another path
+    may share, so hardlinked outputs stay independent when rewritten.
+    """
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+    if src is None:
+        tmp_path.write_bytes(data)
+    else:
+        try:
+            os.link(src, tmp_path)
+        except OSError:
+            shutil.copyfile(src, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def write_logo_files(paths, buffers):
+    """Write rendered JPEGs; identical renditions are hardlinked to the first write."""
+    written = {}
+    for path, data in zip(paths, buffers):
+        replace_file(path, data, src=written.get(data))
+        written.setdefault(data, path)
+
+
 def sanitize_filename(name: str) -> str:
     """Sanitize filename for moOde compatibility."""
     if not name:
@@ -516,7 +1761,7 @@ def sanitize_filename(name: str) -> str:
 
 def convert_svg_to_png(svg_data, width, height):
     """Convert SVG data to PNG using pyvips."""
-    if not SVG_ENABLED or pyvips is None:
+    if not svg_enabled() or pyvips is None:
         return None
     
     try:
@@ -539,19 +1784,28 @@ def convert_svg_to_png(svg_data, width, height):
         return None
 
 
-def save_jpg(content, path, size=None, is_svg=False):
-    """Convert image content to JPG and save."""
+def decode_logo(content, is_svg=False, size=None):
+    """Decode image content once into an RGB image on white; returns (img, status).
+
+    `size` is the largest rendition: SVGs are rasterized to fit it and JPEGs
+    are decoded at a reduced scale where that still leaves enough pixels.
+    """
     # Handle SVG conversion via pyvips
     if is_svg:
-        if not SVG_ENABLED:
+        if not svg_enabled():
             return None, "svg_skip"
         png_data = convert_svg_to_png(content, size[0] if size else 335, size[1] if size else 335)
         if png_data is None:
             return None, "svg_failed"
         content = png_data
-    
+
+    Image = import_required("PIL.Image")   # imported on first use, like pyvips
+
     img = Image.open(BytesIO(content))
-    
+    if size:
+        # Same reducing gap as Image.thumbnail(): decode at >= 2x the target
+        img.draft(None, (size[0] * 2, size[1] * 2))
+
     if img.mode in ("RGBA", "P", "LA"):
         background = Image.new("RGB", img.size, (255, 255, 255))
         if img.mode == "P":
@@ -567,31 +1821,18 @@ def save_jpg(content, path, size=None, is_svg=False):
         img = background
     elif img.mode != "RGB":
         img = img.convert("RGB")
-
-    if size:
-        img.thumbnail(size, Image.Resampling.LANCZOS)
-        canvas = Image.new("RGB", size, (255, 255, 255))
-        offset = ((size[0] - img.width) // 2, (size[1] - img.height) // 2)
-        canvas.paste(img, offset)
-        img = canvas
-
-    img.save(path, format="JPEG", quality=92, optimize=True)
     return img, "ok"
 
 
-def create_thumbnails(img, safe_name):
-    """Create thumbnails matching moOde structure."""
-    thumb_path = THUMB_DIR / f"{safe_name}.jpg"
-    thumb = img.copy()
-    thumb.thumbnail(THUMB_SIZE, Image.Resampling.LANCZOS)
-    canvas = Image.new("RGB", THUMB_SIZE, (255, 255, 255))
-    offset = ((THUMB_SIZE[0] - thumb.width) // 2, (THUMB_SIZE[1] - thumb.height) // 2)
-    canvas.paste(thumb, offset)
-    canvas.save(thumb_path, format="JPEG", quality=85, optimize=True)
+def fit_canvas(img, size):
+    """Scale an image down to fit `size` in place; returns it centered on a white canvas."""
+    Image = import_required("PIL.Image")
 
-    thumb_sm_path = THUMB_DIR / f"{safe_name}_sm.jpg"
-    canvas.save(thumb_sm_path, format="JPEG", quality=85, optimize=True)
-    return thumb_path, thumb_sm_path
+    img.thumbnail(size, Image.Resampling.LANCZOS)
+    canvas = Image.new("RGB", size, (255, 255, 255))
+    offset = ((size[0] - img.width) // 2, (size[1] - img.height) // 2)
+    canvas.paste(img, offset)
+    return canvas
 
 
 def is_svg_content(url, content_type, content):
@@ -608,44 +1849,137 @@ def is_svg_content(url, content_type, content):
     return False
 
 
-def download_logo_internal(url, safe_name):
-    """Internal logo download function."""
-    jpg_path = LOGO_DIR / f"{safe_name}.jpg"
-    if jpg_path.exists():
-        return "exists", safe_name
+def read_body(response, chunk_size=65536):
+    """Read a streamed response body, checking the current deadline between chunks."""
+    chunks = []
+    for chunk in response.iter_content(chunk_size):
+        checkpoint()
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def fetch_logo_bytes(url, session=None, headers=None):
+    """Fetch raw logo bytes; returns (content, content_type, response_headers).
+
+    content is None when a conditional request was answered with 304.
+    """
+    session = session or get_http_session()
+    with timed_phase("logo_download", urlparse(url).netloc.lower()) as sample, \
+            session.get(url, headers=headers, timeout=http_timeout(), stream=True) as r:
+        if r.status_code == 304:
+            return None, "", r.headers
+        r.raise_for_status()
+        content = read_body(r)
+        sample["bytes"] = len(content)
+        return content, r.headers.get('content-type', '').lower(), r.headers
+
+
+def render_logo(url, content, content_type, safe_name):
+    """Render downloaded logo bytes into the moOde logo and thumbnails."""
+    is_svg = is_svg_content(url, content_type, content)
+    if is_svg and current_builder().renderer is None and not svg_enabled():
+        return "svg_skip", None
+
+    status, buffers = run_render(content, is_svg)
+    if status != "ok":
+        return status, None
+
+    checkpoint()
+    ordered = [buffers[kind] for kind, _, _ in LOGO_RENDITIONS]
+    with timed_phase("logo_write"):
+        write_logo_files(logo_output_paths(safe_name), ordered)
+    for arcname, data in zip(logo_archive_names(safe_name), ordered):
+        stream_to_zip(arcname, data)
+    return "converted", safe_name
 
-    r = requests.get(url, headers=HEADERS, timeout=REQUEST_TIMEOUT)
-    r.raise_for_status()
-    
-    content_type = r.headers.get('content-type', '').lower()
-    is_svg = is_svg_content(url, content_type, r.content)
-    
-    if is_svg:
-        if not SVG_ENABLED:
-            return "svg_skip", None
-        img, status = save_jpg(r.content, jpg_path, size=LOGO_SIZE, is_svg=True)
-        if status != "ok":
-            return status, None
-    else:
-        img, status = save_jpg(r.content, jpg_path, size=LOGO_SIZE, is_svg=False)
-        if status != "ok":
-            return status, None
-    
-    create_thumbnails(img, safe_name)
-    return "converted", safe_name
 
+def logo_rendition_files(safe_name):
+    """(in thumbs/, file name) of a station's logo files, one per LOGO_RENDITIONS entry."""
+    files = []
+    for kind, _, _ in LOGO_RENDITIONS:
+        if kind == "logo":
+            files.append((False, f"{safe_name}.jpg"))
+        elif kind.startswith("thumb"):
+            files.append((True, f"{safe_name}{kind[len('thumb'):]}.jpg"))
+        else:
+            files.append((True, f"{safe_name}_{kind}.jpg"))
+    return files
 
-def download_and_convert_logo(url, station_name, watchdog):
-    """Download logo with timeout - NO RETRY on timeout."""
-    if not url:
-        watchdog.increment("logos_skipped")
-        return None
 
-    safe_name = sanitize_filename(station_name)
-    success, result = run_with_timeout(
-        download_logo_internal, args=(url, safe_name), timeout=LOGO_TIMEOUT
-    )
+def logo_output_paths(safe_name):
+    """Paths of a station's logo files in LOGO_RENDITIONS order; the logo itself comes first."""
+    builder = current_builder()
+    return tuple((builder.thumb_dir if thumb else builder.logo_dir) / name
+                 for thumb, name in logo_rendition_files(safe_name))
+
+
+def logo_archive_names(safe_name):
+    """ZIP entry names of a station's logo files, in logo_output_paths() order."""
+    return tuple(f"radio-logos/{'thumbs/' if thumb else ''}{name}" for thumb, name in logo_rendition_files(safe_name))
+
+
+def logo_renditions_key():
+    """LOGO_RENDITIONS as stored in the logo cache index."""
+    return [[kind, list(size), quality] for kind, size, quality in LOGO_RENDITIONS]
+
+
+def logo_request_headers(url):
+    """Conditional request headers for a favicon URL (empty without cache)."""
+    cache = get_logo_cache()
+    return cache.validators(url) if cache else {}
+
+
+def cached_logo(url, safe_name):
+    """Serve a logo without network access if possible; returns a logo result or None."""
+    cache = get_logo_cache()
+    if cache is None:
+        return ("exists", safe_name) if logo_output_paths(safe_name)[0].exists() else None
+    digest = cache.fresh_digest(url)
+    return cache.materialize(digest, safe_name) if digest else None
+
 
+def store_fetched_logo(url, safe_name, content, content_type, response_headers, session=None):
+    """Turn a fetch result into station logo files, going through the logo cache."""
+    cache = get_logo_cache()
+    if cache is None:
+        return render_logo(url, content, content_type, safe_name)
+
+    if content is None:
+        digest = cache.revalidated(url, response_headers)
+        result = cache.materialize(digest, safe_name) if digest else None
+        if result:
+            return result
+        # Blob vanished between request and answer: fetch unconditionally
+        content, content_type, response_headers = fetch_logo_bytes(url, session)
+
+    digest = hashlib.sha256(content).hexdigest()
+    if cache.has_blob(digest):
+        cache.remember(url, digest, response_headers)
+        result = cache.materialize(digest, safe_name)
+        if result:
+            return result
+
+    result = render_logo(url, content, content_type, safe_name)
+    if result[0] == "converted":
+        cache.store(url, digest, safe_name, response_headers)
+    return result
+
+
+def download_logo_internal(url, safe_name):
+    """Internal logo download function."""
+    cache = get_logo_cache()
+    with cache.url_lock(url) if cache else nullcontext():
+        cached = cached_logo(url, safe_name)
+        if cached:
+            return cached
+
+        host_throttle.wait(url)
+        content, content_type, response_headers = fetch_logo_bytes(url, headers=logo_request_headers(url))
+        return store_fetched_logo(url, safe_name, content, content_type, response_headers)
+
+
+def record_logo_result(station_name, success, result, watchdog):
+    """Update watchdog counters for a logo outcome; returns the logo name or None."""
     if not success:
         if "TIMEOUT" in str(result):
             watchdog.increment("logos_timeout")
@@ -661,6 +1995,10 @@ def download_and_convert_logo(url, station_name, watchdog):
     if status == "exists":
         watchdog.increment("logos_converted")
         return name
+    elif status == "cached":
+        watchdog.increment("logos_converted")
+        watchdog.increment("logos_cached")
+        return name
     elif status == "svg_skip":
         watchdog.increment("svg_skipped")
         watchdog.increment("logos_skipped")
@@ -675,6 +2013,222 @@ def download_and_convert_logo(url, station_name, watchdog):
     return None
 
 
+def download_and_convert_logo(url, station_name, watchdog, safe_name=None):
+    """Download logo with timeout - NO RETRY on timeout."""
+    if not url:
+        watchdog.increment("logos_skipped")
+        return None
+
+    safe_name = safe_name or sanitize_filename(station_name)
+    success, result = run_with_deadline(
+        download_logo_internal, args=(url, safe_name), timeout=LOGO_TIMEOUT, phase="logo_download"
+    )
+    return record_logo_result(station_name, success, result, watchdog)
+
+
+# ============================================================
+# RENDER STAGE - PROCESS POOL
+# ============================================================
+
+def render_logo_buffers(content, is_svg, renditions=None, timings=None):
+    """Decode once and encode every rendition; returns (status, {kind: JPEG bytes}).
+
+    Sizes are scaled largest first, each from the previous scaled image (not
+    its padded canvas), and renditions with the same size and quality are
+    encoded once and share one bytes object. Runs inside render worker
+    processes, so it takes and returns plain data. A `timings` dict receives
+    the seconds spent in decode, resize and encode.
+    """
+    renditions = renditions or LOGO_RENDITIONS
+    timings = {} if timings is None else timings
+    ordered = sorted(renditions, key=lambda r: r[1][0] * r[1][1], reverse=True)
+    start = time.perf_counter()
+    img, status = decode_logo(content, is_svg=is_svg, size=ordered[0][1])
+    timings["decode"] = time.perf_counter() - start
+    if status != "ok":
+        return status, None
+
+    canvases = {}
+    encoded = {}
+    buffers = {}
+    timings["resize"] = timings["encode"] = 0.0
+    for kind, size, quality in ordered:
+        size = tuple(size)
+        if size not in canvases:
+            start = time.perf_counter()
+            canvases[size] = fit_canvas(img, size)
+            timings["resize"] += time.perf_counter() - start
+        if (size, quality) not in encoded:
+            start = time.perf_counter()
+            out = BytesIO()
+            canvases[size].save(out, format="JPEG", quality=quality, optimize=True)
+            encoded[(size, quality)] = out.getvalue()
+            timings["encode"] += time.perf_counter() - start
+        buffers[kind] = encoded[(size, quality)]
+    return "ok", buffers
+
+
+def render_logo_timed(content, is_svg, renditions):
+    """render_logo_buffers() for the process pool; returns (status, buffers, timings)."""
+    timings = {}
+    status, buffers = render_logo_buffers(content, is_svg, renditions, timings)
+    return status, buffers, timings
+
+
+_render_pool = None
+_render_pool_lock = threading.Lock()
+
+
+def get_render_pool():
+    """Return the shared render process pool, or None when the active build renders in-process.
+
+    The pool is sized by the render_processes setting of the build that starts it.
+    """
+    global _render_pool
+    processes = current_builder().setting("render_processes")
+    if processes == 0:
+        return None
+    with _render_pool_lock:
+        if _render_pool is None:
+            # Workers import this module again; that has no side effects and
+            # each worker detects SVG support when its first SVG arrives
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            _render_pool = ProcessPoolExecutor(
+                max_workers=processes or os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _render_pool
+
+
+def shutdown_render_pool():
+    """Stop the render worker processes (they are restarted on demand)."""
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is not None:
+            _render_pool.shutdown(wait=True, cancel_futures=True)
+            _render_pool = None
+
+
+def run_render(content, is_svg):
+    """Render on the process pool within the current deadline; falls back to in-process.
+
+    A builder with its own image backend renders through that instead.
+    """
+    with timed_phase("logo_render"):
+        renderer = current_builder().renderer
+        if renderer is not None:
+            return renderer(content, is_svg, LOGO_RENDITIONS)
+        status, buffers, timings = render_in_pool(content, is_svg)
+        for step, seconds in timings.items():
+            record_phase(f"logo_{step}", seconds)
+        return status, buffers
+
+
+def render_in_pool(content, is_svg):
+    """render_logo_timed() on the render pool, or in-process without one.
+
+    A broken pool is dropped (the next build starts a new one) and the
+    active build renders in-process from then on.
+    """
+    global _render_pool
+    pool = get_render_pool()
+    if pool is None:
+        return render_logo_timed(content, is_svg, LOGO_RENDITIONS)
+    from concurrent.futures.process import BrokenProcessPool
+
+    deadline = current_deadline()
+    try:
+        future = pool.submit(render_logo_timed, content, is_svg, LOGO_RENDITIONS)
+        return future.result(timeout=max(0.0, deadline.remaining()) if deadline else None)
+    except FuturesTimeout:
+        future.cancel()
+        raise DeadlineExceeded("logo render deadline exceeded")
+    except BrokenProcessPool as e:
+        logger.warning(f"Render process pool failed ({e}) → rendering in-process")
+        current_builder().config["render_processes"] = 0
+        with _render_pool_lock:
+            if _render_pool is pool:
+                _render_pool = None
+        pool.shutdown(wait=False)
+        return render_logo_timed(content, is_svg, LOGO_RENDITIONS)
+
+
+# ============================================================
+# ASYNC LOGO ENGINE
+# ============================================================
+
+class AsyncLogoEngine:
+    """Asyncio logo downloader on the shared pooled HTTP session.
+
+    Downloads run on a bounded executor (at most `max_in_flight` threads)
+    through a keep-alive session, capped per host and overall. Each download
+    gets a LOGO_TIMEOUT deadline once it holds a slot, enforced inside the
+    executor thread, so a timed-out fetch never keeps running. Bytes are
+    handed to store_fetched_logo, i.e. the logo cache and the regular
+    render stage. Jobs sharing a favicon URL are serialized so the second
+    one is served from the cache.
+    """
+
+    def __init__(self, max_in_flight=LOGO_MAX_IN_FLIGHT, per_host=LOGO_PER_HOST, session=None):
+        self.max_in_flight = max_in_flight
+        self.per_host = per_host
+        self.session = session or get_http_session()
+
+    def fetch_all(self, jobs):
+        """Download and render {safe_name: url}; returns {safe_name: (success, result)}."""
+        if not jobs:
+            return {}
+        import asyncio   # imported on first use, it is only needed for logo downloads
+        return asyncio.run(self._fetch_all(jobs))
+
+    async def _fetch_all(self, jobs):
+        import asyncio
+        loop = asyncio.get_running_loop()
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+        host_limits = {}
+        url_locks = {}
+
+        with builder_pool(self.max_in_flight, "logo") as pool:
+            def in_deadline(deadline, func, *args):
+                return run_with_deadline(func, args, timeout=LOGO_TIMEOUT, deadline=deadline)
+
+            async def fetch_one(safe_name, url):
+                host = urlparse(url).netloc.lower()
+                host_limit = host_limits.setdefault(host, asyncio.Semaphore(self.per_host))
+                async with url_locks.setdefault(url, asyncio.Lock()):
+                    try:
+                        cached = await loop.run_in_executor(pool, cached_logo, url, safe_name)
+                    except Exception as e:
+                        return False, str(e)
+                    if cached:
+                        return True, cached
+                    async with host_limit:
+                        await asyncio.sleep(host_throttle.reserve(url))
+                        async with in_flight:
+                            deadline = Deadline(LOGO_TIMEOUT, "logo_download")
+                            success, fetched = await loop.run_in_executor(
+                                pool, in_deadline, deadline,
+                                fetch_logo_bytes, url, self.session, logo_request_headers(url)
+                            )
+                    if not success:
+                        return False, fetched
+                    return await loop.run_in_executor(
+                        pool, in_deadline, deadline, store_fetched_logo, url, safe_name, *fetched, self.session
+                    )
+
+            async def run_job(safe_name, url):
+                try:
+                    return await fetch_one(safe_name, url)
+                finally:
+                    adjust_queue("logo_jobs", -1)
+
+            names = list(jobs)
+            adjust_queue("logo_jobs", len(names))
+            results = await asyncio.gather(*(run_job(name, jobs[name]) for name in names))
+        return dict(zip(names, results))
+
+
 def detect_format(url, codec=None):
     """Detect audio format from URL or codec string."""
     if codec:
@@ -697,10 +2251,10 @@ def detect_format(url, codec=None):
     return "MP3"
 
 
-def create_pls_file(station_name, stream_url, watchdog):
+def create_pls_file(station_name, stream_url, watchdog, safe_name=None):
     """Create .pls file matching moOde format."""
-    safe_name = sanitize_filename(station_name)
-    pls_path = RADIO_DIR / f"{safe_name}.pls"
+    safe_name = safe_name or sanitize_filename(station_name)
+    pls_path = current_builder().radio_dir / f"{safe_name}.pls"
     contents = f"""[playlist]
 File1={stream_url}
 Title1={station_name}
@@ -709,8 +2263,10 @@ NumberOfEntries=1
 Version=2
 """
     try:
-        with open(pls_path, 'w', encoding='utf-8', newline='\n') as f:
-            f.write(contents)
+        with timed_phase("pls_write"):
+            with open(pls_path, 'w', encoding='utf-8', newline='\n') as f:
+                f.write(contents)
+        stream_to_zip(f"RADIO/{safe_name}.pls", contents.encode("utf-8"))
         watchdog.increment("pls_created")
         return safe_name
     except Exception as e:
@@ -719,51 +2275,810 @@ Version=2
 
 
 # ============================================================
-# RADIO BROWSER API
+# STREAM PROBE - LIVENESS & ICY HEADERS
 # ============================================================
 
-def fetch_stations_from_api(params, watchdog):
-    """Fetch stations from the Radio Browser API with server fallback."""
-    for server in API_SERVERS:
+def parse_icy_bitrate(value):
+    """Bitrate from an icy-br header ("128" or "128,128"), as a string."""
+    value = (value or "").split(",")[0].strip()
+    return value if value.isdigit() and int(value) > 0 else ""
+
+
+def probe_stream(url, session=None):
+    """Open a stream just long enough to read its response headers; returns a probe result.
+
+    Redirects are followed up to STREAM_PROBE_MAX_REDIRECTS, the body is
+    never read. SHOUTcast v1 servers answering "ICY 200 OK" count as alive;
+    an HTML page does not.
+    """
+    requests = import_required("requests")
+    session = session or get_http_session()
+    result = {"ok": False, "url": url, "final_url": url, "status": None, "redirects": 0,
+              "latency_ms": None, "bitrate": "", "codec": "", "error": None}
+    start = time.monotonic()
+    with timed_phase("stream_probe", urlparse(url).netloc.lower()):
         try:
-            url = server + API_ENDPOINT
-            logger.info(f"Trying API server: {server}")
-            response = requests.get(url, params=params, headers=HEADERS, timeout=REQUEST_TIMEOUT)
-            response.raise_for_status()
-            data = response.json()
-            logger.info(f"API returned {len(data)} stations from {server}")
-            return data
+            for _ in range(STREAM_PROBE_MAX_REDIRECTS + 1):
+                with session.get(result["final_url"], headers={"Icy-MetaData": "1"}, stream=True,
+                                 allow_redirects=False, timeout=http_timeout(STREAM_PROBE_TIMEOUT)) as r:
+                    if r.is_redirect:
+                        result["final_url"] = urljoin(result["final_url"], r.headers["location"])
+                        result["redirects"] += 1
+                        continue
+                    content_type = r.headers.get("content-type", "").split(";")[0].strip().lower()
+                    result["status"] = r.status_code
+                    result["bitrate"] = parse_icy_bitrate(r.headers.get("icy-br"))
+                    result["codec"] = STREAM_CONTENT_TYPES.get(content_type, "")
+                    if r.status_code >= 400:
+                        result["error"] = f"HTTP {r.status_code}"
+                    elif content_type == "text/html":
+                        result["error"] = "HTML page, not a stream"
+                    else:
+                        result["ok"] = True
+                    break
+            else:
+                result["error"] = f"more than {STREAM_PROBE_MAX_REDIRECTS} redirects"
         except requests.RequestException as e:
-            logger.warning(f"API server {server} failed: {e}")
+            if "ICY 200" in str(e):
+                result.update(ok=True, status=200)
+            else:
+                result["error"] = type(e).__name__
+    result["latency_ms"] = round((time.monotonic() - start) * 1000, 1)
+    return result
+
+
+def probe_streams(api_stations, skip=(), max_in_flight=STREAM_PROBE_CONCURRENCY):
+    """Probe the streams of a page of API stations concurrently; returns {index: probe result}.
+
+    Each station gets a STREAM_PROBE_TIMEOUT deadline for all its candidate
+    URLs: url_resolved first, then url. The first live one is its result.
+    Stations without a stream and indices in `skip` are not probed.
+    """
+    host_limits = {}
+    host_limits_lock = threading.Lock()
+
+    def probe_station(candidates):
+        result = None
+        for url in candidates:
+            host = urlparse(url).netloc.lower()
+            with host_limits_lock:
+                limit = host_limits.setdefault(host, threading.Semaphore(STREAM_PROBE_PER_HOST))
+            with limit:
+                checkpoint()
+                result = probe_stream(url)
+            if result["ok"]:
+                break
+        return result
+
+    def run_probe(candidates):
+        try:
+            success, result = run_with_deadline(probe_station, args=(candidates,),
+                                                timeout=STREAM_PROBE_TIMEOUT, phase="stream_probe")
+        finally:
+            adjust_queue("stream_probes", -1)
+        if success:
+            return result
+        return {"ok": False, "url": candidates[0], "final_url": candidates[0], "status": None,
+                "redirects": 0, "latency_ms": STREAM_PROBE_TIMEOUT * 1000, "bitrate": "", "codec": "",
+                "error": str(result)}
+
+    jobs = {}
+    for i, station in enumerate(api_stations):
+        candidates = list(dict.fromkeys(u for u in (station.get("url_resolved"), station.get("url")) if u))
+        if candidates and i not in skip:
+            jobs[i] = candidates
+    if not jobs:
+        return {}
+    adjust_queue("stream_probes", len(jobs))
+    with builder_pool(min(max_in_flight, len(jobs)), "probe") as pool:
+        futures = {i: pool.submit(run_probe, candidates) for i, candidates in jobs.items()}
+        return {i: future.result() for i, future in futures.items()}
+
+
+def record_probe_results(api_stations, names, probes, watchdog):
+    """Update watchdog counters for a page of probe results; returns the indices of dead streams."""
+    dead = set()
+    for i, probe in probes.items():
+        watchdog.increment("streams_probed")
+        if probe["redirects"]:
+            watchdog.increment("streams_redirected")
+        if not probe["ok"]:
+            dead.add(i)
+            watchdog.log_warning(names[i], f"stream dead: {probe['error']} ({probe['url']})")
+    if probes:
+        logger.info(f"Stream probe: {len(probes) - len(dead)} of {len(probes)} streams alive")
+    return dead
+
+
+# ============================================================
+# API MIRRORS - DISCOVERY, RANKING & HEDGING
+# ============================================================
+
+def discover_api_servers():
+    """Candidate API mirrors: DNS SRV records when available, else API_SERVERS."""
+    if MIRROR_DISCOVERY != "srv":
+        return list(API_SERVERS)
+    try:
+        import dns.resolver
+    except ImportError:
+        return list(API_SERVERS)
+    try:
+        answers = dns.resolver.resolve(MIRROR_SRV_RECORD, "SRV", lifetime=MIRROR_PROBE_TIMEOUT)
+    except Exception as e:
+        logger.warning(f"SRV lookup for {MIRROR_SRV_RECORD} failed: {e}")
+        return list(API_SERVERS)
+    servers = [f"https://{str(answer.target).rstrip('.')}"
+               for answer in sorted(answers, key=lambda a: (a.priority, -a.weight))]
+    return servers or list(API_SERVERS)
+
+
+def probe_api_server(server):
+    """Measure the response time of one mirror; returns seconds or None if unreachable."""
+    requests = import_required("requests")
+    start = time.monotonic()
+    try:
+        response = get_http_session().get(server + "/json/stats", timeout=MIRROR_PROBE_TIMEOUT)
+        response.raise_for_status()
+    except requests.RequestException:
+        return None
+    return time.monotonic() - start
+
+
+def rank_api_servers(servers):
+    """Probe all mirrors concurrently; returns [(server, latency)] fastest first."""
+    with builder_pool(len(servers), "mirror-probe") as pool:
+        latencies = list(pool.map(probe_api_server, servers))
+    ranking = sorted(zip(servers, latencies), key=lambda item: (item[1] is None, item[1] or 0))
+    for server, latency in ranking:
+        logger.info(f"API mirror {server}: {f'{latency * 1000:.0f} ms' if latency is not None else 'unreachable'}")
+    return ranking
+
+
+_ranked_servers = None
+_ranked_servers_lock = threading.Lock()
+
+
+def get_ranked_servers():
+    """API mirrors ordered by measured latency, cached in memory and on disk for MIRROR_RANKING_TTL."""
+    global _ranked_servers
+    with _ranked_servers_lock:
+        now = time.time()
+        if _ranked_servers and now - _ranked_servers["ranked_at"] < MIRROR_RANKING_TTL:
+            return list(_ranked_servers["servers"])
+
+        try:
+            with open(current_builder().mirror_cache_out, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            fresh = now - cached["ranked_at"] < MIRROR_RANKING_TTL
+            same_candidates = MIRROR_DISCOVERY == "srv" or set(cached["servers"]) == set(API_SERVERS)
+            if fresh and same_candidates and cached["servers"]:
+                _ranked_servers = cached
+                return list(cached["servers"])
+        except (OSError, ValueError, KeyError):
+            pass
+
+        ranking = rank_api_servers(discover_api_servers())
+        _ranked_servers = {
+            "ranked_at": now,
+            "servers": [server for server, _ in ranking],
+            "latency_ms": {server: round(latency * 1000, 1) if latency is not None else None
+                           for server, latency in ranking}
+        }
+        try:
+            with open(current_builder().mirror_cache_out, "w", encoding="utf-8") as f:
+                json.dump(_ranked_servers, f, indent=2)
+        except OSError as e:
+            logger.warning(f"Could not save mirror ranking: {e}")
+        return list(_ranked_servers["servers"])
+
+
+def demote_api_server(server):
+    """Move a failing mirror to the end of the in-memory ranking."""
+    with _ranked_servers_lock:
+        if _ranked_servers and server in _ranked_servers["servers"]:
+            _ranked_servers["servers"].remove(server)
+            _ranked_servers["servers"].append(server)
+
+
+def get_api_json(server, params, endpoint=API_ENDPOINT, deadline=None, abort=None):
+    """GET an endpoint (default: the station search) of one mirror and decode the JSON.
+
+    The request runs under `deadline` (the caller's, for requests sent from a
+    worker thread) and stops between body chunks once `abort` is set.
+    """
+    with deadline_scope(REQUEST_TIMEOUT, "api_fetch", deadline) if deadline else nullcontext(), \
+            timed_phase("api_fetch", urlparse(server).netloc) as sample:
+        with get_http_session().get(server + endpoint, params=params, timeout=http_timeout(),
+                                    stream=True) as response:
+            chunks = []
+            for chunk in response.iter_content(16384):   # small chunks: an abort takes effect soon
+                if abort is not None and abort.is_set():
+                    raise ConnectionAbortedError(f"{server}: answer no longer needed")
+                checkpoint()
+                chunks.append(chunk)
+        content = b"".join(chunks)
+        sample["bytes"] = len(content)
+    response.raise_for_status()
+    return json.loads(content)
+
+
+# ============================================================
+# RADIO BROWSER API
+# ============================================================
+
+def fetch_stations_from_api(params, watchdog, required=False):
+    """Fetch one page of a station search, from the API or the local catalogue mirror.
+
+    A failed search returns [] (no results), or raises ConnectionError when
+    the page is `required`, i.e. an empty answer would truncate the query.
+    """
+    import sqlite3
+    builder = current_builder()
+    try:
+        if builder.setting("catalogue_source") == "mirror":
+            return builder.catalogue().search(params)
+        return fetch_api_json(params)
+    except (ConnectionError, sqlite3.Error, ValueError) as e:
+        logger.error(f"Station search failed: {e}")
+        watchdog.log_error("API", "fetch", str(e))
+        if required:
+            raise ConnectionError(f"station search failed at offset {params.get('offset', 0)}: {e}") from e
+        return []
+
+
+def fetch_api_json(params, endpoint=API_ENDPOINT):
+    """GET an API endpoint with ranked, hedged server fallback; returns the decoded JSON.
+
+    The fastest mirror is asked first; if it has not answered within
+    MIRROR_HEDGE_AFTER seconds the same request also goes to the next mirror
+    and the first successful answer wins; the other request is aborted.
+    Failed mirrors fall back in order. Requests run under the caller's
+    deadline. Raises ConnectionError when every mirror failed.
+    """
+    requests = import_required("requests")
+    remaining = get_ranked_servers()
+    pending = {}
+    pool = builder_pool(2, "api")
+    deadline = current_deadline()
+    abort = threading.Event()
+
+    def launch():
+        server = remaining.pop(0)
+        logger.info(f"Trying API server: {server}")
+        pending[pool.submit(get_api_json, server, params, endpoint, deadline, abort)] = server
+
+    try:
+        launch()
+        while pending:
+            hedge = remaining and len(pending) == 1
+            done, _ = wait(pending, timeout=MIRROR_HEDGE_AFTER if hedge else None,
+                           return_when=FIRST_COMPLETED)
+            if not done:
+                logger.info(f"API server {next(iter(pending.values()))} slow → hedging")
+                launch()
+                continue
+            for future in done:
+                server = pending.pop(future)
+                try:
+                    data = future.result()
+                    logger.info(f"API returned {len(data)} entries from {server}")
+                    return data
+                except (requests.RequestException, ValueError) as e:
+                    logger.warning(f"API server {server} failed: {e}")
+                    demote_api_server(server)
+            if not pending and remaining:
+                launch()
+    finally:
+        abort.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    raise ConnectionError("All Radio Browser API servers failed")
+
+
+def iter_station_pages(params, watchdog, page_size=API_PAGE_SIZE, max_stations=None):
+    """Yield pages of API stations using offset/limit paging.
+
+    The next page is fetched in the background while the caller processes the
+    current one, so at most two pages are held in memory. `max_stations=None`
+    walks the complete result set. A failed first page yields nothing; a
+    failure on any later page raises ConnectionError, so a partial result
+    is never taken for the complete one. The list can shift between pages
+    while it is walked; a station that shows up again is dropped by its
+    stationuuid, so it never gets a second name or files.
+    """
+    def fetch_page(offset):
+        limit = page_size if max_stations is None else min(page_size, max_stations - offset)
+        return limit, fetch_stations_from_api({**params, "offset": offset, "limit": limit}, watchdog,
+                                              required=offset > 0)
+
+    seen = set()
+    with builder_pool(1, "api-page") as pool:
+        offset = 0
+        pending = pool.submit(fetch_page, offset)
+        while pending is not None:
+            limit, page = pending.result()
+            offset += len(page)
+            has_more = len(page) == limit and (max_stations is None or offset < max_stations)
+            pending = pool.submit(fetch_page, offset) if has_more else None
+            fresh = []
+            for station in page:
+                uuid = station.get("stationuuid")
+                if uuid and uuid in seen:
+                    continue
+                seen.add(uuid)
+                fresh.append(station)
+            if len(fresh) < len(page):
+                logger.info(f"Paging: {len(page) - len(fresh)} stations at offset {offset - len(page)} "
+                            f"already listed, skipped")
+            if fresh:
+                yield fresh
+
+
+def iter_stations_from_api(params, watchdog, page_size=API_PAGE_SIZE, max_stations=None):
+    """Yield API stations one by one across all pages."""
+    for page in iter_station_pages(params, watchdog, page_size, max_stations):
+        yield from page
+
+
+# ============================================================
+# CATALOGUE MIRROR - LOCAL SQLITE
+# ============================================================
+
+class StationCatalogue:
+    """Local SQLite mirror of the Radio Browser station list.
+
+    Answers the station searches of a build without network access. The
+    mirror is filled by a full sync, then kept current with the changes
+    since its last change (CATALOGUE_DELTA_AFTER); a full resync every
+    CATALOGUE_FULL_AFTER also drops deleted stations. With
+    CATALOGUE_FIXTURE the mirror is loaded from that JSON dump instead of
+    the API (see dump()).
+    """
+
+    ORDER_COLUMNS = {"name": "name COLLATE NOCASE", "clickcount": "clickcount", "votes": "votes",
+                     "bitrate": "bitrate", "lastchangetime": "lastchangetime", "random": "random()"}
+
+    def __init__(self, path=None):
+        import sqlite3
+        self.path = Path(path or current_builder().catalogue_out)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS stations (
+                stationuuid TEXT PRIMARY KEY,
+                changeuuid TEXT,
+                name TEXT,
+                countrycode TEXT,
+                language TEXT,
+                tags TEXT,
+                codec TEXT,
+                bitrate INTEGER,
+                clickcount INTEGER,
+                votes INTEGER,
+                lastcheckok INTEGER,
+                lastchangetime TEXT,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS stations_country ON stations (countrycode);
+            CREATE INDEX IF NOT EXISTS stations_clicks ON stations (clickcount);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+
+    def _meta(self, key, default=None):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, key, value):
+        self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def _upsert(self, station):
+        def number(key):
+            try:
+                return int(station.get(key) or 0)
+            except (TypeError, ValueError):
+                return 0
+        self.db.execute(
+            "INSERT OR REPLACE INTO stations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (station["stationuuid"], station.get("changeuuid", ""), station.get("name", ""),
+             (station.get("countrycode") or "").upper(), (station.get("language") or "").lower(),
+             (station.get("tags") or "").lower(), (station.get("codec") or "").upper(), number("bitrate"),
+             number("clickcount"), number("votes"), int(station.get("lastcheckok", 1) or 0),
+             station.get("lastchangetime_iso8601") or station.get("lastchangetime", ""),
+             json.dumps(station, ensure_ascii=False))
+        )
+
+    def _mark_synced(self, full):
+        now = time.time()
+        self._set_meta("synced_at", now)
+        if full:
+            self._set_meta("full_synced_at", now)
+        row = self.db.execute("SELECT changeuuid FROM stations ORDER BY lastchangetime DESC LIMIT 1").fetchone()
+        if full and row:
+            self._set_meta("last_changeuuid", row[0])
+        self.db.commit()
+
+    def count(self):
+        with self._lock:
+            return self.db.execute("SELECT COUNT(*) FROM stations").fetchone()[0]
+
+    def sync(self, force_full=False):
+        """Bring the mirror up to date if it is due; returns "full", "delta" or None."""
+        with self._lock:
+            now = time.time()
+            if CATALOGUE_FIXTURE:
+                stamp = str(Path(CATALOGUE_FIXTURE).stat().st_mtime_ns)
+                if force_full or stamp != self._meta("fixture_stamp"):
+                    self._sync_full(self._load_fixture())
+                    self._set_meta("fixture_stamp", stamp)
+                    self.db.commit()
+                    return "full"
+                return None
+            full_due = now - float(self._meta("full_synced_at", 0)) > CATALOGUE_FULL_AFTER
+            if force_full or full_due or not self._meta("last_changeuuid"):
+                self._sync_full(self._fetch_pages(CATALOGUE_ENDPOINT, {"hidebroken": "false", "order": "name"}))
+                return "full"
+            if now - float(self._meta("synced_at", 0)) > CATALOGUE_DELTA_AFTER:
+                self._sync_delta()
+                return "delta"
+            return None
+
+    def _fetch_pages(self, endpoint, params):
+        offset = 0
+        while True:
+            checkpoint()
+            page = fetch_api_json({**params, "offset": offset, "limit": CATALOGUE_PAGE_SIZE}, endpoint)
+            yield page
+            offset += len(page)
+            if len(page) < CATALOGUE_PAGE_SIZE:
+                return
+
+    def _load_fixture(self):
+        with open(CATALOGUE_FIXTURE, "r", encoding="utf-8") as f:
+            yield json.load(f)
+
+    def _sync_full(self, pages):
+        """Replace the mirror with `pages`; the old content stays if fetching fails."""
+        start = time.monotonic()
+        try:
+            self.db.execute("DELETE FROM stations")
+            for page in pages:
+                for station in page:
+                    if station.get("stationuuid"):
+                        self._upsert(station)
+            self._mark_synced(full=True)
+        except BaseException:
+            self.db.rollback()
+            raise
+        logger.info(f"Catalogue mirror: full sync, {self.count()} stations in {time.monotonic() - start:.1f}s")
+
+    def _sync_delta(self):
+        """Apply the changes since the last known change uuid."""
+        changed = 0
+        last = self._meta("last_changeuuid")
+        try:
+            while True:
+                page = fetch_api_json({"lastchangeuuid": last, "limit": CATALOGUE_PAGE_SIZE},
+                                      CATALOGUE_CHANGED_ENDPOINT)
+                for change in page:
+                    if not change.get("stationuuid"):
+                        continue
+                    row = self.db.execute("SELECT data FROM stations WHERE stationuuid = ?",
+                                          (change["stationuuid"],)).fetchone()
+                    # Change entries lack counters such as clickcount: keep the stored ones
+                    self._upsert({**json.loads(row[0]), **change} if row else change)
+                    changed += 1
+                if page:
+                    last = page[-1].get("changeuuid") or last
+                    self._set_meta("last_changeuuid", last)
+                if len(page) < CATALOGUE_PAGE_SIZE:
+                    break
+            self._mark_synced(full=False)
+        except BaseException:
+            self.db.rollback()
+            raise
+        logger.info(f"Catalogue mirror: {changed} changes applied")
+
+    def search(self, params):
+        """Stations matching /json/stations/search parameters, as the API returns them.
+
+        Supports countrycode, name, tag, language (partial, case-insensitive
+        like the API), codec, bitrateMin/bitrateMax, hidebroken, order,
+        reverse, offset and limit. Syncs the mirror first if that is due.
+        """
+        self.sync()
+        where, args = [], []
+        if params.get("countrycode"):
+            where.append("countrycode = ?")
+            args.append(str(params["countrycode"]).upper())
+        for key in ("name", "tag", "language"):
+            if params.get(key):
+                column = "tags" if key == "tag" else key
+                where.append(f"instr(lower({column}), ?) > 0")
+                args.append(str(params[key]).lower())
+        if params.get("codec"):
+            where.append("codec = ?")
+            args.append(str(params["codec"]).upper())
+        if params.get("bitrateMin"):
+            where.append("bitrate >= ?")
+            args.append(int(params["bitrateMin"]))
+        if params.get("bitrateMax"):
+            where.append("bitrate <= ?")
+            args.append(int(params["bitrateMax"]))
+        if str(params.get("hidebroken", "false")).lower() == "true":
+            where.append("lastcheckok = 1")
+
+        order = self.ORDER_COLUMNS.get(params.get("order"), "name COLLATE NOCASE")
+        direction = "DESC" if str(params.get("reverse", "false")).lower() == "true" else "ASC"
+        sql = (f"SELECT data FROM stations {'WHERE ' + ' AND '.join(where) if where else ''} "
+               f"ORDER BY {order} {direction}, stationuuid LIMIT ? OFFSET ?")
+        args += [int(params.get("limit", -1)), int(params.get("offset", 0))]
+        with self._lock:
+            return [json.loads(data) for (data,) in self.db.execute(sql, args)]
+
+    def dump(self, path):
+        """Write the mirror as a /json/stations style JSON array (a CATALOGUE_FIXTURE)."""
+        with self._lock, open(path, "w", encoding="utf-8") as f:
+            f.write("[")
+            for i, (data,) in enumerate(self.db.execute("SELECT data FROM stations ORDER BY stationuuid")):
+                f.write(",\n" if i else "\n")
+                f.write(data)
+            f.write("\n]\n")
+
+
+# ============================================================
+# BUILD STATE - INCREMENTAL REBUILDS
+# ============================================================
+
+def load_build_state():
+    """Load per-query station state of previous runs."""
+    try:
+        with open(current_builder().build_state_out, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"version": 1, "queries": {}}
+
+
+def save_build_state(state):
+    """Persist build state atomically."""
+    path = current_builder().build_state_out
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False)
+    tmp_path.replace(path)
+
+
+def build_state_key(choice, user_input):
+    """State key of a query, e.g. 'country:nl'."""
+    return f"{choice}:{user_input or ''}".lower()
+
+
+def has_build_state(choice, user_input):
+    """True if a previous run of this query left state for an incremental rebuild."""
+    return build_state_key(choice, user_input) in load_build_state()["queries"]
+
+
+def find_unchanged_stations(api_stations, previous, file_names=None):
+    """Map index → stored processed result for stations unchanged since the last run.
+
+    A station counts as unchanged if its changeuuid and lastchangetime match,
+    it keeps its file name (see station_file_names) and the files written
+    for it are still on disk. A station whose logo failed last time is
+    retried rather than reused.
+    """
+    radio_dir = current_builder().radio_dir
+    reused = {}
+    for i, station in enumerate(api_stations):
+        prev = previous.get(station.get("stationuuid") or "")
+        if not prev:
+            continue
+        if prev["changeuuid"] != station.get("changeuuid", "") \
+                or prev["lastchangetime"] != station.get("lastchangetime", ""):
+            continue
+        if file_names and prev["safe_name"] != file_names[i]:
             continue
-    logger.error("All API servers failed!")
-    watchdog.log_error("API", "fetch", "All Radio Browser API servers failed")
-    return []
+        if not (radio_dir / f"{prev['safe_name']}.pls").exists():
+            continue
+        if prev["logo_name"] and not logo_output_paths(prev["logo_name"])[0].exists():
+            continue
+        if not prev["logo_name"] and station.get("favicon"):
+            continue
+        reused[i] = {key: prev.get(key, "") for key in ("stream_url", "logo_name", "safe_name", "bitrate", "codec")}
+    return reused
+
 
+def stale_station_names(previous, current, listed):
+    """File names of stations that are no longer `listed` or were renamed, and the unlisted count.
 
-def process_api_station(station, station_name, watchdog):
-    """Process a single API station."""
+    Listed stations missing from `current` (not built this run) keep their files.
+    """
+    in_use = {entry["safe_name"] for entry in current.values()}
+    names = set()
+    removed = 0
+    for uuid, entry in previous.items():
+        if uuid in listed and (uuid not in current or current[uuid]["safe_name"] == entry["safe_name"]):
+            continue
+        if uuid not in listed:
+            removed += 1
+        if entry["safe_name"] not in in_use:
+            names.add(entry["safe_name"])
+    return names, removed
+
+
+def remove_station_files(names):
+    """Delete the .pls and logo files of these station file names."""
+    radio_dir = current_builder().radio_dir
+    for name in sorted(names):
+        for path in (radio_dir / f"{name}.pls",) + logo_output_paths(name):
+            path.unlink(missing_ok=True)
+        logger.info(f"Removed files of stale station: {name}")
+
+
+def process_api_station(station, station_name, watchdog, logo_results=None, safe_name=None, probe=None):
+    """Process a single API station.
+
+    If `logo_results` is given, logos were already fetched by the async engine
+    and only the outcome is recorded here. `safe_name` is the station's file
+    name (default: the sanitized station name). With a stream `probe` result
+    the probed URL is used and a dead stream skips the station
+    (STREAM_PROBE_DROP_DEAD).
+    """
     stream_url = station.get("url", "") or station.get("url_resolved", "")
     if not stream_url:
         return None, "no_stream"
+    if probe is not None and probe["ok"]:
+        stream_url = probe["url"]
+    elif probe is not None and STREAM_PROBE_DROP_DEAD:
+        return None, "dead_stream"
+    checkpoint()
 
     logo_url = station.get("favicon", "")
-    logo_name = download_and_convert_logo(logo_url, station_name, watchdog) if logo_url else None
-    safe_name = sanitize_filename(station_name)
-    create_pls_file(station_name, stream_url, watchdog)
+    safe_name = safe_name or sanitize_filename(station_name)
+    if not logo_url:
+        logo_name = None
+    elif logo_results is not None:
+        logo_name = record_logo_result(station_name, *logo_results[safe_name], watchdog)
+    else:
+        logo_name = download_and_convert_logo(logo_url, station_name, watchdog, safe_name)
+    checkpoint()
+    create_pls_file(station_name, stream_url, watchdog, safe_name)
 
     return {
         "stream_url": stream_url,
         "logo_name": logo_name,
-        "safe_name": safe_name
+        "safe_name": safe_name,
+        "bitrate": probe["bitrate"] if probe else "",
+        "codec": probe["codec"] if probe else ""
     }, "ok"
 
 
-def scrape_via_api(choice, user_input, watchdog):
-    """Scrape stations via Radio Browser API."""
+def station_display_names(api_stations, start=1):
+    """Station names as used for logging and file names (numbered fallback from `start`)."""
+    return [station.get("name", "").strip() or f"Station {idx}"
+            for idx, station in enumerate(api_stations, start)]
+
+
+def station_file_names(api_stations, names, used_names):
+    """Unique file names (sanitized, numbered on collision) of the stations with a stream.
+
+    `used_names` maps the names taken so far (earlier pages, earlier jobs,
+    indexed stations) to their owner, (stationuuid, normalized stream URL),
+    and is updated. A name is only reused by its own station, so a
+    station's .pls and logo files always match its name in station_data.json.
+    Stations without a stream get None.
+    """
+    file_names = []
+    for station, station_name in zip(api_stations, names):
+        if not (station.get("url") or station.get("url_resolved")):
+            file_names.append(None)
+            continue
+        uuid = station.get("stationuuid") or None
+        url_keys = {normalize_stream_url(station.get(key)) for key in ("url", "url_resolved") if station.get(key)}
+
+        def taken(name):
+            owner = used_names.get(name)
+            return owner is not None and not (uuid and owner[0] == uuid) and owner[1] not in url_keys
+
+        safe_name = original_safe_name = sanitize_filename(station_name)
+        counter = 1
+        while taken(safe_name):
+            safe_name = f"{original_safe_name} {counter}"
+            counter += 1
+        used_names[safe_name] = (uuid, normalize_stream_url(station.get("url") or station.get("url_resolved")))
+        file_names.append(safe_name)
+    return file_names
+
+
+def collect_logo_jobs(api_stations, file_names, reused=None):
+    """Map station file name → favicon URL for stations that will get a logo.
+
+    Stations whose index is in `reused` are left out.
+    """
+    jobs = {}
+    for i, (station, safe_name) in enumerate(zip(api_stations, file_names)):
+        if (reused and i in reused) or safe_name is None:
+            continue
+        logo_url = station.get("favicon", "")
+        if logo_url:
+            jobs[safe_name] = logo_url
+    return jobs
+
+
+def iter_processed_stations(api_stations, watchdog, workers=STATION_WORKERS, logo_results=None,
+                            reused=None, start=1, file_names=None, probes=None):
+    """Process API stations, yielding (idx, station, name, success, result) in input order.
+
+    Every station runs under a STATION_TIMEOUT deadline in the thread that
+    processes it. With workers > 1 stations run on a bounded TaskScheduler
+    pool. Stations sharing a file name are chained into one task so their
+    .pls and logo files are written in the same order as a sequential run.
+    Stations found in `reused` (list index → processed result) are yielded
+    without any work. `idx` counts from `start`. `probes` maps list index →
+    stream probe result.
+    """
+    names = station_display_names(api_stations, start)
+    file_names = file_names or [sanitize_filename(name) for name in names]
+    reused = reused or {}
+
+    def run_one(i):
+        if i in reused:
+            return True, (reused[i], "ok")
+        with timed_phase("station_process"):
+            return run_with_deadline(
+                process_api_station,
+                args=(api_stations[i], names[i], watchdog, logo_results, file_names[i], (probes or {}).get(i)),
+                timeout=STATION_TIMEOUT, phase="station_process"
+            )
+
+    if workers <= 1:
+        for i, station in enumerate(api_stations):
+            yield (start + i, station, names[i]) + run_one(i)
+        return
+
+    groups = {}
+    for i, name in enumerate(names):
+        if i not in reused:
+            groups.setdefault(file_names[i] or sanitize_filename(name), []).append(i)
+
+    with TaskScheduler(max_workers=workers, name="station") as scheduler:
+        slots = {}
+        for indices in groups.values():
+            future = scheduler.submit(lambda chain: [run_one(i) for i in chain], indices)
+            for pos, i in enumerate(indices):
+                slots[i] = (future, pos)
+
+        for i, station in enumerate(api_stations):
+            if i in reused:
+                yield (start + i, station, names[i]) + run_one(i)
+                continue
+            future, pos = slots[i]
+            yield (start + i, station, names[i]) + future.result()[pos]
+
+
+def iter_station_records(choice, user_input, watchdog, workers=None, logo_engine=None,
+                         incremental=False, max_stations=None, page_size=None, stale_names=None,
+                         used_names=None):
+    """Build stations via the Radio Browser API, yielding a StationRecord per station.
+
+    Stations are fetched in offset/limit pages and each page is processed as
+    soon as it arrives; `max_stations=None` builds the complete result set.
+    With `incremental`, stations whose changeuuid/lastchangetime match the
+    previous run of the same query are reused without touching their files,
+    and files of stations that are no longer listed are removed, or only
+    collected into the `stale_names` set if one is given (see
+    StationIndex.commit). `used_names` holds the file names taken before
+    this query (see station_file_names). Build state and the logo cache
+    index are saved once the last record was yielded.
+    `workers`, `logo_engine` and `page_size` default to the active builder's
+    settings.
+    """
+    builder = current_builder()
+    workers = workers or builder.setting("station_workers")
+    logo_engine = logo_engine or builder.setting("logo_engine")
+    page_size = page_size or builder.setting("page_size")
+    ensure_output_dirs()
     params = {
         "hidebroken": "true",
-        "limit": 500,
         "order": "clickcount",
         "reverse": "true"
     }
@@ -777,170 +3092,888 @@ def scrape_via_api(choice, user_input, watchdog):
     elif choice == "name":
         params["name"] = user_input
 
-    api_stations = fetch_stations_from_api(params, watchdog)
-    watchdog.metrics["stations_total"] = len(api_stations)
+    station_id = 500
+    used_names = {} if used_names is None else used_names
+    total = 0
+    start_time = time.time()
 
-    if not api_stations:
+    build_state = load_build_state()
+    state_key = build_state_key(choice, user_input)
+    previous = build_state["queries"].get(state_key, {}).get("stations", {})
+    current = {}
+    listed = set()
+
+    def keep_previous(station):
+        # A station that failed this time keeps the state (and files) of its last good build
+        uuid = station.get("stationuuid")
+        if uuid in previous:
+            current[uuid] = previous[uuid]
+
+    for api_stations in iter_station_pages(params, watchdog, page_size, max_stations):
+        page_start = total + 1
+        total += len(api_stations)
+        listed.update(station.get("stationuuid") for station in api_stations)
+        watchdog.increment("stations_total", len(api_stations))
+        expected = max(total, max_stations or 0)
+
+        file_names = station_file_names(api_stations, station_display_names(api_stations, page_start),
+                                        used_names)
+        reused = find_unchanged_stations(api_stations, previous, file_names) if incremental else {}
+        if incremental:
+            logger.info(f"Incremental rebuild: {len(reused)} of {len(api_stations)} stations unchanged")
+
+        probes = None
+        skip_logos = set(reused)
+        if builder.setting("stream_probe"):
+            probes = probe_streams(api_stations, skip=reused)
+            dead = record_probe_results(api_stations, station_display_names(api_stations, page_start),
+                                        probes, watchdog)
+            if STREAM_PROBE_DROP_DEAD:
+                skip_logos |= dead
+
+        logo_results = None
+        if logo_engine == "async":
+            jobs = collect_logo_jobs(api_stations, file_names, skip_logos)
+            logger.info(f"Fetching {len(jobs)} logos (async engine, {LOGO_MAX_IN_FLIGHT} in flight)...")
+            logo_results = AsyncLogoEngine().fetch_all(jobs)
+
+        processed_stations = iter_processed_stations(
+            api_stations, watchdog, workers, logo_results, reused, page_start, file_names, probes
+        )
+        for idx, station, station_name, success, result in processed_stations:
+            watchdog.timings.station_done()
+            rate = watchdog.timings.recent_rate() or idx / max(time.time() - start_time, 1e-9)
+            remaining = (expected - idx) / rate
+            eta_min, eta_sec = int(remaining // 60), int(remaining % 60)
+
+            logger.info(f"[{idx}/{expected}] {station_name} (ETA: {eta_min}m {eta_sec}s)")
+
+            if not success:
+                if "TIMEOUT" in str(result):
+                    watchdog.log_timeout(station_name, "station_process", STATION_TIMEOUT)
+                    logger.warning(f"{station_name}: TIMEOUT ({STATION_TIMEOUT}s) → skipped")
+                else:
+                    watchdog.increment("stations_failed")
+                    watchdog.log_error(station_name, "api_process", str(result))
+                keep_previous(station)
+                continue
+
+            processed, status = result
+            if status == "no_stream":
+                watchdog.increment("stations_skipped")
+                continue
+            if status == "dead_stream":
+                watchdog.increment("stations_dead")
+                continue
+            if processed is None:
+                watchdog.increment("stations_failed")
+                keep_previous(station)
+                continue
+            if idx - page_start in reused:
+                watchdog.increment("stations_unchanged")
+            if station.get("stationuuid"):
+                current[station["stationuuid"]] = {
+                    "changeuuid": station.get("changeuuid", ""),
+                    "lastchangetime": station.get("lastchangetime", ""),
+                    **processed
+                }
+
+            safe_name = processed["safe_name"]
+
+            station_record = StationRecord(
+                uuid=station.get("stationuuid", ""),
+                id=station_id,
+                station=processed["stream_url"],
+                name=safe_name,
+                type="r",
+                logo="local" if processed["logo_name"] else "",
+                genre=(station.get("tags", "") or "")[:255],
+                broadcaster=(station.get("name", "") or "")[:100],
+                language=(station.get("language", "") or "")[:50],
+                country=(station.get("country", "") or "")[:50],
+                region=(station.get("state", "") or "")[:50],
+                bitrate=processed.get("bitrate") or (str(station.get("bitrate", "")) if station.get("bitrate") else ""),
+                format=processed.get("codec") or detect_format(processed["stream_url"], station.get("codec")),
+                geo_fenced="No",
+                home_page=(station.get("homepage", "") or "")[:255],
+                monitor=""
+            )
+
+            watchdog.increment("streams_found")
+            watchdog.increment("stations_success")
+            station_id += 1
+            yield station_record
+
+    if total == 0:
         logger.warning("No stations returned from API")
-        return {"fields": FIELDS, "stations": []}, []
+        return
 
-    json_data = {"fields": FIELDS, "stations": []}
-    csv_rows = []
-    station_id = 500
-    used_names = set()
-    total = len(api_stations)
-    start_time = time.time()
+    cache = get_logo_cache()
+    if cache:
+        cache.save()
 
-    for idx, station in enumerate(api_stations, 1):
-        station_name = station.get("name", "").strip() or f"Station {idx}"
+    if incremental:
+        names, removed = stale_station_names(previous, current, listed)
+        watchdog.increment("stations_removed", removed)
+        if stale_names is None:
+            remove_station_files(names)
+        else:
+            stale_names.update(names)
+    build_state["queries"][state_key] = {
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+        "stations": current
+    }
+    save_build_state(build_state)
 
-        elapsed = time.time() - start_time
-        avg_per_station = elapsed / idx if idx > 0 else 0
-        remaining = (total - idx) * avg_per_station
-        eta_min, eta_sec = int(remaining // 60), int(remaining % 60)
 
-        logger.info(f"[{idx}/{total}] {station_name} (ETA: {eta_min}m {eta_sec}s)")
+def scrape_via_api(choice, user_input, watchdog, station_index, workers=None, logo_engine=None,
+                   incremental=False, max_stations=None, page_size=None):
+    """Scrape stations via Radio Browser API into a StationIndex run; returns the stations written.
 
-        success, result = run_with_timeout(
-            process_api_station, args=(station, station_name, watchdog), timeout=STATION_TIMEOUT
-        )
+    Duplicates of stations written earlier in the same run are not counted.
+    File names are unique across the index (station_index.used_names), and
+    files of stale stations are left for station_index.commit() to remove.
+    See iter_station_records() for the other arguments.
+    """
+    written = 0
+    for record in iter_station_records(choice, user_input, watchdog, workers, logo_engine,
+                                       incremental, max_stations, page_size, station_index.stale_names,
+                                       station_index.used_names):
+        written += station_index.write(record)
+    return written
 
-        if not success:
-            if "TIMEOUT" in str(result):
-                watchdog.log_timeout(station_name, "station_process", STATION_TIMEOUT)
-                logger.warning(f"{station_name}: TIMEOUT ({STATION_TIMEOUT}s) → skipped")
-            else:
-                watchdog.increment("stations_failed")
-                watchdog.log_error(station_name, "api_process", str(result))
-            continue
 
-        processed, status = result
-        if status == "no_stream":
-            watchdog.increment("stations_skipped")
-            continue
-        if processed is None:
-            watchdog.increment("stations_failed")
-            continue
+# ============================================================
+# STATION DATA OUTPUT
+# ============================================================
 
-        safe_name = processed["safe_name"]
-        original_safe_name = safe_name
-        counter = 1
-        while safe_name in used_names:
-            safe_name = f"{original_safe_name} {counter}"
-            counter += 1
-        used_names.add(safe_name)
-
-        station_record = {
-            "id": station_id,
-            "station": processed["stream_url"],
-            "name": safe_name,
-            "type": "r",
-            "logo": "local" if processed["logo_name"] else "",
-            "genre": (station.get("tags", "") or "")[:255],
-            "broadcaster": (station.get("name", "") or "")[:100],
-            "language": (station.get("language", "") or "")[:50],
-            "country": (station.get("country", "") or "")[:50],
-            "region": (station.get("state", "") or "")[:50],
-            "bitrate": str(station.get("bitrate", "")) if station.get("bitrate") else "",
-            "format": detect_format(processed["stream_url"], station.get("codec")),
-            "geo_fenced": "No",
-            "home_page": (station.get("homepage", "") or "")[:255],
-            "monitor": ""
-        }
+class StationRecord:
+    """One station_data.json station (a cfg_radio row, see FIELDS) without dict overhead.
+
+    `uuid` is the Radio Browser stationuuid; it is not part of the export.
+    """
+
+    __slots__ = tuple(FIELDS) + ("uuid",)
 
-        json_data["stations"].append(station_record)
-        csv_rows.append({
-            "id": station_id,
-            "station": safe_name,
-            "stream_url": processed["stream_url"],
-            "logo": "local" if processed["logo_name"] else ""
-        })
+    def __init__(self, uuid="", **values):
+        self.uuid = uuid
+        for field in FIELDS:
+            setattr(self, field, values.get(field, ""))
 
-        watchdog.increment("streams_found")
-        watchdog.increment("stations_success")
-        station_id += 1
-        time.sleep(REQUEST_DELAY)
+    def as_dict(self):
+        return {field: getattr(self, field) for field in FIELDS}
 
-    return json_data, csv_rows
+    def csv_row(self):
+        """radiostreams.csv row: id, station, stream_url, logo."""
+        return [self.id, self.name, self.station, self.logo]
+
+
+CSV_HEADER = ["id", "station", "stream_url", "logo"]
+
+
+class StationDataWriter:
+    """Streams station_data.json and radiostreams.csv one station at a time.
+
+    JSON is written one station per line next to the targets and moved into
+    place by close(), so no station list is ever held in memory.
+    """
+
+    def __init__(self, json_path=None, csv_path=None):
+        builder = current_builder()
+        self.json_path = Path(json_path or builder.json_out)
+        self.csv_path = Path(csv_path or builder.csv_out)
+        tag = f"{os.getpid()}-{id(self):x}"
+        self.json_tmp = self.json_path.with_name(f".{self.json_path.name}.{tag}.partial")
+        self.csv_tmp = self.csv_path.with_name(f".{self.csv_path.name}.{tag}.partial")
+        self.count = 0
+        self._lock = threading.Lock()
+        self.json_path.parent.mkdir(parents=True, exist_ok=True)
+        self._json = open(self.json_tmp, "w", encoding="utf-8")
+        self._csv_file = open(self.csv_tmp, "w", newline="", encoding="utf-8")
+        self._csv = csv.writer(self._csv_file)
+        self._json.write(f'{{"fields": {json.dumps(FIELDS)}, "stations": [')
+        self._csv.writerow(CSV_HEADER)
+
+    def write(self, record):
+        """Append a station."""
+        with self._lock:
+            self._json.write(",\n" if self.count else "\n")
+            self._json.write(json.dumps(record.as_dict(), ensure_ascii=False))
+            self._csv.writerow(record.csv_row())
+            self.count += 1
+
+    def _finish(self):
+        if not self._json.closed:
+            self._json.write("\n]}\n")
+            self._json.close()
+            self._csv_file.close()
+
+    def close(self):
+        """Finish writing and replace station_data.json and radiostreams.csv; returns the count."""
+        with self._lock:
+            self._finish()
+            os.replace(self.json_tmp, self.json_path)
+            os.replace(self.csv_tmp, self.csv_path)
+        logger.info(f"Saved {self.count} stations to {self.json_path.name} and {self.csv_path.name}")
+        return self.count
+
+    def discard(self):
+        """Drop everything written so far."""
+        with self._lock:
+            self._json.close()
+            self._csv_file.close()
+            self.json_tmp.unlink(missing_ok=True)
+            self.csv_tmp.unlink(missing_ok=True)
+
+
+def iter_station_data(path=None):
+    """Yield the StationRecords of a station_data.json (default: the active build's).
+
+    Files written by StationDataWriter are read line by line; other layouts
+    are parsed as a whole.
+    """
+    with open(path or current_builder().json_out, "r", encoding="utf-8") as f:
+        header = f.readline()
+        if header.startswith('{"fields": ') and header.rstrip().endswith('"stations": ['):
+            for line in f:
+                line = line.rstrip().rstrip(",")
+                if line == "]}":
+                    return
+                yield StationRecord(**json.loads(line))
+            return
+        f.seek(0)
+        stations = json.load(f).get("stations", [])
+    for station in stations:
+        yield StationRecord(**station)
+
+
+def normalize_stream_url(url):
+    """Stream URL key for duplicate detection: scheme, host case, default port and trailing slash ignored."""
+    url = (url or "").strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url.lower()
+    host = (parts.hostname or "").lower()
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+    key = host + (parts.path.rstrip("/") or "")
+    return f"{key}?{parts.query}" if parts.query else key
 
 
 # ============================================================
-# MOODE ZIP CREATION
+# STATION INDEX - SQLITE
 # ============================================================
 
-def create_moode_zip(json_data):
-    """Create moOde-compatible backup ZIP."""
-    logger.info("Creating moOde-compatible backup ZIP...")
-    try:
-        with zipfile.ZipFile(ZIP_OUT, 'w', zipfile.ZIP_DEFLATED, compresslevel=9) as zipf:
-            if JSON_OUT.exists():
-                zipf.write(JSON_OUT, "station_data.json")
-
-            pls_count = 0
-            if RADIO_DIR.exists():
-                for pls_file in sorted(RADIO_DIR.iterdir()):
-                    if pls_file.is_file() and pls_file.suffix.lower() == '.pls':
-                        zipf.write(pls_file, f"RADIO/{pls_file.name}")
-                        pls_count += 1
-
-            logo_count = 0
-            if LOGO_DIR.exists():
-                for logo_file in sorted(LOGO_DIR.iterdir()):
-                    if logo_file.is_file() and logo_file.suffix.lower() in ['.jpg', '.jpeg']:
-                        zipf.write(logo_file, f"radio-logos/{logo_file.name}")
-                        logo_count += 1
-
-            thumb_count = 0
-            if THUMB_DIR.exists():
-                for thumb_file in sorted(THUMB_DIR.iterdir()):
-                    if thumb_file.is_file() and thumb_file.suffix.lower() in ['.jpg', '.jpeg']:
-                        zipf.write(thumb_file, f"radio-logos/thumbs/{thumb_file.name}")
-                        thumb_count += 1
-
-        logger.info(f"ZIP saved: {pls_count} PLS, {logo_count} logos, {thumb_count} thumbs")
+class StationIndex:
+    """Persistent index of the stations in station_data.json, for merges.
+
+    Stations are keyed by stationuuid and by normalized stream URL. A run
+    (begin() ... commit()) upserts the stations it builds: a known station
+    keeps its id and gets the new record, an unknown one gets the next
+    never-used id, and a second station of the same run matching one of
+    the first is dropped as a duplicate. commit(replace=True) removes the
+    stations the run did not see (Overwrite), commit(replace=False) keeps
+    them (Merge), so a merge costs work per changed station only. Files of
+    stale stations (`stale_names`) are removed at commit, unless a
+    committed station still uses them. `used_names` maps the file names of
+    the indexed stations and of this run's stations to their owner, so no
+    two stations share a file name (see station_file_names).
+    station_data.json is re-imported when it was changed outside the index.
+    """
+
+    def __init__(self, path=None):
+        import sqlite3
+        self.path = Path(path or current_builder().station_index_out)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS stations (
+                id INTEGER PRIMARY KEY,
+                uuid TEXT UNIQUE,
+                url_key TEXT NOT NULL UNIQUE,
+                seen_run INTEGER NOT NULL DEFAULT 0,
+                record TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+        self.run = 0
+        self.next_id = 500
+        self.added = self.updated = self.duplicates = 0
+        self.stale_names = set()
+        self.used_names = {}
+
+    def _meta(self, key, default=None):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, key, value):
+        self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    @staticmethod
+    def _stamp(json_path):
+        try:
+            stat = json_path.stat()
+        except FileNotFoundError:
+            return ""
+        return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+    def begin(self, json_path=None):
+        """Start a run; imports station_data.json first if the index does not match it."""
+        json_path = Path(json_path or current_builder().json_out)
+        stamp = self._stamp(json_path)
+        if stamp != self._meta("json_stamp", ""):
+            self._import(json_path)
+            self._set_meta("json_stamp", stamp)
+        self.run = int(self._meta("run", 0)) + 1
+        self._set_meta("run", self.run)
+        self.next_id = int(self._meta("next_id", 500))
+        self.added = self.updated = self.duplicates = 0
+        self.stale_names = set()
+        self.used_names = {}
+        for uuid, url_key, record in self.db.execute("SELECT uuid, url_key, record FROM stations"):
+            self.used_names[json.loads(record)["name"]] = (uuid, url_key)
+
+    def _import(self, json_path):
+        self.db.execute("DELETE FROM stations")
+        if json_path.exists():
+            for record in iter_station_data(json_path):
+                self.db.execute(
+                    "INSERT OR IGNORE INTO stations (id, url_key, record) VALUES (?, ?, ?)",
+                    (int(record.id or 0) or None, normalize_stream_url(record.station),
+                     json.dumps(record.as_dict(), ensure_ascii=False))
+                )
+            logger.info(f"Station index: imported {json_path.name}")
+        (max_id,) = self.db.execute("SELECT MAX(id) FROM stations").fetchone()
+        self._set_meta("next_id", max(int(self._meta("next_id", 500)), (max_id or 0) + 1))
+
+    def _find(self, column, value):
+        if not value:
+            return None
+        return self.db.execute(f"SELECT id, seen_run FROM stations WHERE {column} = ?", (value,)).fetchone()
+
+    def write(self, record):
+        """Upsert a station built by this run; sets its id. Returns False for a duplicate."""
+        url_key = normalize_stream_url(record.station)
+        uuid = record.uuid or None
+        row = self._find("uuid", uuid) or self._find("url_key", url_key)
+        if row and row[1] == self.run:
+            self.duplicates += 1
+            return False
+        other = self._find("url_key", url_key)
+        if row and other and other[0] != row[0]:
+            if other[1] == self.run:
+                self.duplicates += 1
+                return False
+            self.db.execute("DELETE FROM stations WHERE id = ?", (other[0],))
+
+        if row:
+            record.id = row[0]
+            self.updated += 1
+        else:
+            record.id = self.next_id
+            self.next_id += 1
+            self.added += 1
+        self.db.execute(
+            "INSERT OR REPLACE INTO stations (id, uuid, url_key, seen_run, record) VALUES (?, ?, ?, ?, ?)",
+            (record.id, uuid, url_key, self.run, json.dumps(record.as_dict(), ensure_ascii=False))
+        )
         return True
-    except Exception as e:
-        logger.error(f"Failed to create ZIP: {e}")
-        return False
 
+    def commit(self, replace=False):
+        """Finish the run; `replace` drops the stations it did not see. Returns the removed count.
+
+        Stale station files are removed only now, so a later query of the
+        same run cannot delete files an earlier one still uses.
+        """
+        removed = 0
+        if replace:
+            removed = self.db.execute("DELETE FROM stations WHERE seen_run != ?", (self.run,)).rowcount
+        self._set_meta("next_id", self.next_id)
+        self.db.commit()
+        if self.stale_names:
+            remove_station_files(self.stale_names - {record.name for record in self.records()})
+            self.stale_names = set()
+        return removed
+
+    def rollback(self):
+        """Forget everything the current run changed."""
+        self.db.rollback()
+        self.stale_names = set()
+
+    def records(self):
+        """Yield every indexed station as a StationRecord, in id order."""
+        for (record,) in self.db.execute("SELECT record FROM stations ORDER BY id"):
+            yield StationRecord(**json.loads(record))
+
+    def export(self, json_path=None, csv_path=None):
+        """Write station_data.json and radiostreams.csv from the index; returns the station count."""
+        writer = StationDataWriter(json_path, csv_path)
+        try:
+            for record in self.records():
+                writer.write(record)
+        except Exception:
+            writer.discard()
+            raise
+        count = writer.close()
+        self._set_meta("json_stamp", self._stamp(writer.json_path))
+        self.db.commit()
+        return count
 
-def verify_moode_zip():
-    """Verify the moOde ZIP file structure."""
-    if not ZIP_OUT.exists():
-        return False
+    def close(self):
+        self.db.close()
 
-    print(f"\n{'=' * 65}")
-    print("  moOde ZIP VERIFICATION (v29 - pyvips)")
-    print("=" * 65)
 
-    try:
-        with zipfile.ZipFile(ZIP_OUT, 'r') as zipf:
-            if zipf.testzip():
-                print("  ✗ ZIP file corrupted!")
-                return False
-            print("  ✓ ZIP integrity: OK")
+# ============================================================
+# MOODE ZIP CREATION
+# ============================================================
+
+def moode_zip_layout():
+    """(directory, ZIP prefix, suffixes) of the station files in a moOde backup."""
+    builder = current_builder()
+    return ((builder.radio_dir, "RADIO/", (".pls",)),
+            (builder.logo_dir, "radio-logos/", MoodeZipWriter.STORED_SUFFIXES),
+            (builder.thumb_dir, "radio-logos/thumbs/", MoodeZipWriter.STORED_SUFFIXES))
 
-            all_files = zipf.namelist()
-            pls_files = [f for f in all_files if f.startswith("RADIO/") and f.endswith('.pls')]
-            logo_files = [f for f in all_files if f.startswith("radio-logos/") and "/thumbs/" not in f]
-            thumb_files = [f for f in all_files if "thumbs/" in f]
 
-            print(f"\n  Contents:")
-            print(f"    PLS files:    {len(pls_files)}")
-            print(f"    Logos:        {len(logo_files)}")
-            print(f"    Thumbnails:   {len(thumb_files)}")
+def is_moode_station_entry(arcname):
+    """True for .pls and logo entries that follow the moOde backup layout."""
+    for _, prefix, suffixes in moode_zip_layout():
+        name = arcname[len(prefix):]
+        if arcname.startswith(prefix) and name and "/" not in name and name.lower().endswith(suffixes):
+            return True
+    return False
 
-            total_size = sum(info.file_size for info in zipf.infolist())
-            compressed_size = sum(info.compress_size for info in zipf.infolist())
-            print(f"\n  Size: {compressed_size / 1024:.1f} KB (from {total_size / 1024:.1f} KB)")
 
-        print("=" * 65)
+def scan_moode_files():
+    """Map ZIP entry name → os.DirEntry of the station files on disk."""
+    files = {}
+    for directory, prefix, suffixes in moode_zip_layout():
+        try:
+            entries = os.scandir(directory)
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.name.lower().endswith(suffixes) and entry.is_file():
+                    files[prefix + entry.name] = entry
+    return files
+
+
+def moode_zip_counts(names):
+    """PLS, logo and thumbnail entry counts of a list of ZIP names."""
+    return {
+        "pls": sum(1 for n in names if n.startswith("RADIO/")),
+        "logos": sum(1 for n in names if n.startswith("radio-logos/") and "/thumbs/" not in n),
+        "thumbs": sum(1 for n in names if n.startswith("radio-logos/thumbs/"))
+    }
+
+
+# Local file header of a ZIP entry (APPNOTE 4.3.7): signature, version
+# needed, flags, method, time, date, CRC, sizes, name and extra lengths
+ZIP_LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+ZIP_LOCAL_SIGNATURE = b"PK\x03\x04"
+
+# ZipFile attributes an in-place update writes through; not public API, so
+# their absence sends create_moode_zip() to a full rewrite
+ZIP_APPEND_ATTRS = ("fp", "start_dir", "filelist", "NameToInfo", "_didModify")
+
+
+def zip_supports_raw_append(zf):
+    """True if `zf` exposes the internals copy_zip_entry_raw() appends through."""
+    return all(hasattr(zf, attr) for attr in ZIP_APPEND_ATTRS)
+
+
+def copy_zip_entry_raw(src, info, dst):
+    """Append an entry of `src` to `dst` as stored, without recompressing it.
+
+    The local header is parsed and rebuilt here; `dst` must pass
+    zip_supports_raw_append(). ZIP64 entries are refused with ValueError.
+    """
+    if not zip_supports_raw_append(dst):
+        raise ValueError("zipfile internals for raw entry copies not available")
+    if max(info.compress_size, info.file_size, info.header_offset, dst.start_dir) >= 0xFFFFFFFF:
+        raise ValueError(f"{info.filename}: ZIP64 entries cannot be copied raw")
+    src.fp.seek(info.header_offset)
+    header = ZIP_LOCAL_HEADER.unpack(src.fp.read(ZIP_LOCAL_HEADER.size))
+    signature, version, flags, method, mtime, mdate, _, _, _, name_len, extra_len = header
+    if signature != ZIP_LOCAL_SIGNATURE:
+        raise ValueError(f"{info.filename}: bad local file header")
+    name_extra = src.fp.read(name_len + extra_len)
+    raw = src.fp.read(info.compress_size)
+
+    entry = copy.copy(info)
+    entry.flag_bits = flags & ~0x08   # CRC and sizes go into the local header, no data descriptor
+    entry.header_offset = dst.start_dir
+    dst.fp.seek(dst.start_dir)
+    dst.fp.write(ZIP_LOCAL_HEADER.pack(ZIP_LOCAL_SIGNATURE, version, entry.flag_bits, method, mtime, mdate,
+                                       info.CRC, info.compress_size, info.file_size, name_len, extra_len))
+    dst.fp.write(name_extra)
+    dst.fp.write(raw)
+    dst.start_dir = dst.fp.tell()
+    dst.filelist.append(entry)
+    dst.NameToInfo[entry.filename] = entry
+    dst._didModify = True
+
+
+def zip_dead_bytes(zf):
+    """Bytes before the central directory not referenced by any entry."""
+    live = sum(ZIP_LOCAL_HEADER.size + len(info.filename.encode("utf-8")) + len(info.extra)
+               + info.compress_size for info in zf.filelist)
+    return max(0, zf.start_dir - live)
+
+
+def compact_zip(path):
+    """Rewrite a ZIP without unreferenced space, copying every entry raw.
+
+    Entries are recompressed instead where zip_supports_raw_append() fails.
+    """
+    import zipfile
+    compact_path = path.with_name(path.name + ".compact")
+    with zipfile.ZipFile(path, "r") as src, zipfile.ZipFile(compact_path, "w") as dst:
+        raw = zip_supports_raw_append(dst)
+        for info in src.infolist():
+            if raw:
+                copy_zip_entry_raw(src, info, dst)
+            else:
+                dst.writestr(info, src.read(info), compresslevel=ZIP_TEXT_COMPRESSLEVEL)
+    os.replace(compact_path, path)
+
+
+class MoodeZipWriter:
+    """Streaming moOde backup ZIP, filled while stations are processed.
+
+    Station files are appended from memory as soon as they are written:
+    JPEGs are stored (they are compressed already), text is deflated. The
+    archive is built as `<name>.partial`. finalize() turns it into the
+    backup, adding station_data.json plus the files on disk that were not
+    streamed (earlier runs, merges, unchanged stations) and compacting away
+    entries that were rewritten during the run; finalize_update()
+    instead merges the streamed entries into the existing backup in place.
+    """
+
+    STORED_SUFFIXES = (".jpg", ".jpeg")
+
+    def __init__(self, path=None):
+        import zipfile
+        self.path = Path(path or current_builder().zip_out)
+        self.partial_path = self.path.with_name(self.path.name + ".partial")
+        self._lock = threading.Lock()
+        self._zip = zipfile.ZipFile(self.partial_path, "w", zipfile.ZIP_DEFLATED,
+                                    compresslevel=ZIP_TEXT_COMPRESSLEVEL)
+        self._crcs = {}
+        self._superseded = 0
+
+    def _compress_type(self, arcname):
+        import zipfile
+        if arcname.lower().endswith(self.STORED_SUFFIXES):
+            return zipfile.ZIP_STORED
+        return zipfile.ZIP_DEFLATED
+
+    def add(self, arcname, data=None, path=None):
+        """Append an entry from bytes or a file; a rewritten name replaces the earlier entry."""
+        import zipfile
+        if data is None:
+            data = Path(path).read_bytes()
+        crc = zlib.crc32(data)
+        with self._lock:
+            if arcname in self._crcs:
+                if self._crcs[arcname] == crc:
+                    return
+                # Drop the superseded entry from the central directory; its
+                # bytes stay behind until finalize() compacts the archive
+                superseded = self._zip.NameToInfo[arcname]
+                self._zip.filelist.remove(superseded)
+                self._superseded += 1
+            info = zipfile.ZipInfo(arcname, time.localtime(time.time())[:6])
+            info.compress_type = self._compress_type(arcname)
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")   # "Duplicate name" for superseded entries
+                self._zip.writestr(info, data, compresslevel=ZIP_TEXT_COMPRESSLEVEL)
+            self._crcs[arcname] = crc
+
+    def _add_missing_files(self, zf, present, files):
+        """Add scanned files whose names are not in `present`; returns the count."""
+        added = 0
+        for arcname in sorted(files):
+            if arcname not in present:
+                zf.write(files[arcname].path, arcname, compress_type=self._compress_type(arcname))
+                added += 1
+        return added
+
+    def finalize(self, json_path=None):
+        """Complete the archive and move it into place; returns entry counts."""
+        json_path = json_path or current_builder().json_out
+        with self._lock:
+            if json_path.exists():
+                self._zip.write(json_path, "station_data.json")
+            from_disk = self._add_missing_files(self._zip, self._crcs, scan_moode_files())
+            names = self._zip.namelist()
+            self._zip.close()
+            if self._superseded:
+                compact_zip(self.partial_path)
+            os.replace(self.partial_path, self.path)
+
+        logger.info(f"ZIP: {len(self._crcs)} entries streamed, {from_disk} added from disk, "
+                    f"{self._superseded} superseded")
+        return moode_zip_counts(names)
+
+    def finalize_update(self, json_path=None):
+        """Merge this run into the existing backup in place; returns entry counts.
+
+        Entries whose CRC and size are unchanged stay where they are,
+        changed streamed entries are appended raw from the partial archive,
+        entries of files no longer on disk are dropped and station_data.json
+        is replaced. Superseded entries become unreferenced space, which is
+        compacted away once it exceeds ZIP_COMPACT_RATIO of the archive.
+        """
+        import zipfile
+        json_path = json_path or current_builder().json_out
+        with self._lock:
+            self._zip.close()
+        archive_mtime = self.path.stat().st_mtime
+        files = scan_moode_files()
+        kept = written = 0
+
+        with zipfile.ZipFile(self.partial_path, "r") as streamed, \
+                zipfile.ZipFile(self.path, "a", zipfile.ZIP_DEFLATED,
+                                compresslevel=ZIP_TEXT_COMPRESSLEVEL) as archive:
+            if not zip_supports_raw_append(archive):
+                raise ValueError("zipfile internals for in-place updates not available")
+            pending = {info.filename: info for info in streamed.infolist()}
+            previous_names = set(archive.namelist())
+            live = []
+            for info in archive.infolist():
+                new = pending.get(info.filename)
+                source = files.get(info.filename)
+                if new is not None:
+                    unchanged = (new.CRC, new.file_size) == (info.CRC, info.file_size)
+                elif source is None:
+                    unchanged = False   # station_data.json, removed stations
+                else:
+                    stat = source.stat()
+                    unchanged = stat.st_size == info.file_size and (
+                        stat.st_mtime <= archive_mtime or zlib.crc32(Path(source.path).read_bytes()) == info.CRC)
+                if unchanged:
+                    live.append(info)
+                    pending.pop(info.filename, None)
+                    kept += 1
+
+            archive.filelist = live
+            archive.NameToInfo = {info.filename: info for info in live}
+            archive._didModify = True
+            for info in pending.values():
+                copy_zip_entry_raw(streamed, info, archive)
+                written += 1
+            written += self._add_missing_files(archive, archive.NameToInfo, files)
+            if json_path.exists():
+                archive.write(json_path, "station_data.json")
+            names = archive.namelist()
+            dead = zip_dead_bytes(archive)
+            size = archive.start_dir
+
+        self.partial_path.unlink(missing_ok=True)
+        if size and dead / size > ZIP_COMPACT_RATIO:
+            compact_zip(self.path)
+            logger.info(f"ZIP compacted ({dead / 1024:.0f} KB unreferenced)")
+        logger.info(f"ZIP updated: {kept} entries unchanged, {written} written, "
+                    f"{len(previous_names - set(names))} removed")
+        return moode_zip_counts(names)
+
+    def discard(self):
+        """Drop the partial archive."""
+        with self._lock:
+            self._zip.close()
+            self.partial_path.unlink(missing_ok=True)
+
+
+_zip_stream_lock = threading.Lock()
+
+
+def begin_zip_stream(path=None):
+    """Start streaming the active build's station files into a new partial backup ZIP."""
+    discard_zip_stream()
+    builder = current_builder()
+    with _zip_stream_lock:
+        builder.zip_stream = MoodeZipWriter(path or builder.zip_out)
+        return builder.zip_stream
+
+
+def stream_to_zip(arcname, data=None, path=None):
+    """Append a station file to the streaming ZIP, if one is active."""
+    stream = current_builder().zip_stream
+    if stream is not None:
+        with timed_phase("zip_add"):
+            stream.add(arcname, data, path)
+
+
+def take_zip_stream():
+    """Detach and return the active streaming ZIP (None if there is none)."""
+    builder = current_builder()
+    with _zip_stream_lock:
+        stream, builder.zip_stream = builder.zip_stream, None
+        return stream
+
+
+def discard_zip_stream():
+    """Drop an unfinished streaming ZIP."""
+    stream = take_zip_stream()
+    if stream is not None:
+        stream.discard()
+
+
+@timed_phase("zip_finalize")
+def create_moode_zip():
+    """Create moOde-compatible backup ZIP.
+
+    Uses the streaming ZIP of the current run if there is one. An existing
+    backup is updated in place (ZIP_UPDATE), otherwise the archive is built
+    from the streamed entries and the files on disk.
+    """
+    import zipfile
+    logger.info("Creating moOde-compatible backup ZIP...")
+    builder = current_builder()
+    writer = take_zip_stream()
+    try:
+        counts = None
+        if builder.setting("zip_update") and zipfile.is_zipfile(builder.zip_out):
+            try:
+                counts = (writer or MoodeZipWriter(builder.zip_out)).finalize_update()
+            except (zipfile.BadZipFile, OSError, ValueError, struct.error) as e:
+                logger.warning(f"ZIP update failed ({e}) → rebuilding from disk")
+            writer = None
+        if counts is None:
+            writer = writer or MoodeZipWriter(builder.zip_out)
+            counts = writer.finalize()
+        logger.info(f"ZIP saved: {counts['pls']} PLS, {counts['logos']} logos, {counts['thumbs']} thumbs")
         return True
     except Exception as e:
-        print(f"  ✗ Error: {e}")
+        logger.error(f"Failed to create ZIP: {e}")
+        if writer is not None:
+            writer.discard()
         return False
 
 
+def check_zip_crcs(path, infos):
+    """Read a chunk of entries through their own archive handle; returns names with bad data."""
+    import zipfile
+    failed = []
+    with zipfile.ZipFile(path, "r") as zf:
+        for info in infos:
+            try:
+                with zf.open(info) as f:
+                    while f.read(1024 * 1024):
+                        pass
+            except (zipfile.BadZipFile, zlib.error, EOFError, OSError):
+                failed.append(info.filename)
+    return failed
+
+
+@timed_phase("zip_verify")
+def verify_moode_zip(path=None, mode=None, workers=None):
+    """Verify a moOde backup ZIP; returns a report dict (see print_zip_report).
+
+    "quick" checks the central directory, the moOde layout and that every
+    station in station_data.json with logo "local" has its logo and
+    thumbnails. "full" also verifies the CRC of every entry, in parallel
+    chunks of the entry list.
+    """
+    import zipfile
+    path = Path(path or current_builder().zip_out)
+    mode = mode or current_builder().setting("zip_verify_mode")
+    report = {
+        "path": str(path),
+        "mode": mode,
+        "ok": False,
+        "errors": [],
+        "warnings": [],
+        "counts": {"entries": 0, "pls": 0, "logos": 0, "thumbs": 0, "stations": 0},
+        "size": {"compressed": 0, "uncompressed": 0},
+        "crc_checked": 0,
+        "crc_failed": []
+    }
+    if not path.exists():
+        report["errors"].append("ZIP file not found")
+        return report
+
+    try:
+        with zipfile.ZipFile(path, "r") as zipf:
+            infos = zipf.infolist()
+            names = {info.filename for info in infos}
+            station_data = zipf.read("station_data.json") if "station_data.json" in names else None
+    except (zipfile.BadZipFile, OSError) as e:
+        report["errors"].append(f"Central directory unreadable: {e}")
+        return report
+
+    report["counts"].update(moode_zip_counts(names), entries=len(infos))
+    report["size"]["compressed"] = sum(info.compress_size for info in infos)
+    report["size"]["uncompressed"] = sum(info.file_size for info in infos)
+    if len(names) != len(infos):
+        report["errors"].append(f"{len(infos) - len(names)} duplicate entry names")
+    unexpected = sorted(n for n in names if n != "station_data.json" and not is_moode_station_entry(n))
+    if unexpected:
+        report["warnings"].append(f"{len(unexpected)} entries outside the moOde layout, e.g. {unexpected[0]}")
+
+    if station_data is None:
+        report["errors"].append("station_data.json missing")
+    else:
+        try:
+            stations = json.loads(station_data).get("stations", [])
+        except ValueError as e:
+            stations = []
+            report["errors"].append(f"station_data.json invalid: {e}")
+        report["counts"]["stations"] = len(stations)
+        missing_logos = [s.get("name", "") for s in stations if s.get("logo") == "local"
+                         and not all(n in names for n in logo_archive_names(s.get("name", "")))]
+        missing_pls = [s.get("name", "") for s in stations if f"RADIO/{s.get('name', '')}.pls" not in names]
+        if missing_logos:
+            report["errors"].append(f"{len(missing_logos)} stations with logo \"local\" lack a logo or "
+                                    f"thumbnail, e.g. {missing_logos[0]}")
+        if missing_pls:
+            report["warnings"].append(f"{len(missing_pls)} stations without a .pls file, e.g. {missing_pls[0]}")
+
+    if mode == "full":
+        workers = max(1, workers or ZIP_VERIFY_WORKERS or os.cpu_count() or 1)
+        chunks = [infos[i::workers] for i in range(workers)]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            failed = [name for result in pool.map(check_zip_crcs, [path] * workers, chunks) for name in result]
+        report["crc_checked"] = len(infos)
+        report["crc_failed"] = sorted(failed)
+        if failed:
+            report["errors"].append(f"{len(failed)} entries failed the CRC check, e.g. {report['crc_failed'][0]}")
+
+    report["ok"] = not report["errors"]
+    return report
+
+
+def print_zip_report(report):
+    """Print a verify_moode_zip() report."""
+    print(f"\n{'=' * 65}")
+    print(f"  moOde ZIP VERIFICATION ({report['mode']})")
+    print("=" * 65)
+    if report["crc_checked"]:
+        status = "OK" if not report["crc_failed"] else f"{len(report['crc_failed'])} corrupted"
+        print(f"  {'✗' if report['crc_failed'] else '✓'} ZIP integrity: {status} "
+              f"({report['crc_checked']} entries CRC-checked)")
+
+    counts = report["counts"]
+    print(f"\n  Contents:")
+    print(f"    Stations:     {counts['stations']}")
+    print(f"    PLS files:    {counts['pls']}")
+    print(f"    Logos:        {counts['logos']}")
+    print(f"    Thumbnails:   {counts['thumbs']}")
+
+    size = report["size"]
+    print(f"\n  Size: {size['compressed'] / 1024:.1f} KB (from {size['uncompressed'] / 1024:.1f} KB)")
+    for warning in report["warnings"]:
+        print(f"  ⚠ {warning}")
+    for error in report["errors"]:
+        print(f"  ✗ {error}")
+    print(f"  {'✓ Verification passed' if report['ok'] else '✗ Verification failed'}")
+    print("=" * 65)
+
+
 # ============================================================
 # MENU DISPLAY FUNCTIONS
 # ============================================================
@@ -951,13 +3984,15 @@ def show_main_menu():
     print("         RADIO STREAM SCRAPER v29")
     print("         moOde Audio Compatible (uses PyVips)")
     print("=" * 65)
-    print(f"\n  SVG Support:       {'ENABLED ✓ (pyvips)' if SVG_ENABLED else 'DISABLED ✗'}")
+    print(f"\n  SVG Support:       {'ENABLED ✓ (pyvips)' if svg_enabled() else 'DISABLED ✗'}")
     print(f"  Station Timeout:   {STATION_TIMEOUT}s (skip after timeout, no retry)")
+    print(f"  Station Workers:   {STATION_WORKERS}")
+    print(f"  Station Source:    {'local catalogue mirror' if current_builder().setting('catalogue_source') == 'mirror' else 'Radio Browser API'}")
 
     print("\n" + "-" * 65)
     print("  DATA SOURCES (Radio Browser API)")
     print("-" * 65)
-    print("  [1] All stations (top 500 by popularity)")
+    print(f"  [1] All stations (top {TOP_STATIONS_LIMIT} by popularity)")
     print("  [2] By country code")
     print("  [3] By tag/genre")
     print("  [4] By language")
@@ -976,6 +4011,14 @@ def show_main_menu():
     print("=" * 65)
 
 
+def ask_incremental(choice, user_input):
+    """Offer an incremental rebuild if this query was built before."""
+    if not has_build_state(choice, user_input):
+        return False
+    return prompt_yes_no("\n  Previous build of this query found. Only reprocess changed stations?",
+                         default_yes=True)
+
+
 def show_country_codes():
     """Display country codes reference."""
     print("\n" + "=" * 65)
@@ -1093,18 +4136,18 @@ def show_radio_browser_info():
 # MAIN
 # ============================================================
 
-def main():
-    watchdog = Watchdog()
+def main(watchdog=None):
+    watchdog = watchdog or Watchdog()
     logger.info("=" * 50)
     logger.info("Scraper started (v29 - pyvips)")
-    logger.info(f"SVG support: {'enabled (pyvips)' if SVG_ENABLED else 'disabled'}")
+    logger.info(f"SVG support: {svg_status()}")
     logger.info("=" * 50)
 
     while True:
         show_main_menu()
         choice = input("\n  Enter your choice (0-9): ").strip()
 
-        json_data = None
+        station_index = None
 
         try:
             # Help/reference options
@@ -1125,9 +4168,11 @@ def main():
                 print("\n  Exiting...")
                 return
 
-            elif choice == "1":
-                print("\n  Fetching top 500 stations by popularity...")
-                json_data, csv_rows = scrape_via_api("all", None, watchdog)
+            max_stations = None
+            if choice == "1":
+                print(f"\n  Fetching top {TOP_STATIONS_LIMIT} stations by popularity...")
+                query = ("all", None)
+                max_stations = TOP_STATIONS_LIMIT
 
             elif choice == "2":
                 print("\n" + "-" * 65)
@@ -1138,7 +4183,7 @@ def main():
                 if not country_code or len(country_code) != 2:
                     print("  ⚠ Invalid country code.")
                     continue
-                json_data, csv_rows = scrape_via_api("country", country_code, watchdog)
+                query = ("country", country_code)
 
             elif choice == "3":
                 print("\n" + "-" * 65)
@@ -1148,7 +4193,7 @@ def main():
                 tag = input("\n  Tag/genre (e.g., rock, jazz): ").strip().lower()
                 if not tag:
                     continue
-                json_data, csv_rows = scrape_via_api("tag", tag, watchdog)
+                query = ("tag", tag)
 
             elif choice == "4":
                 print("\n" + "-" * 65)
@@ -1158,63 +4203,55 @@ def main():
                 language = input("\n  Language (e.g., dutch, english): ").strip().lower()
                 if not language:
                     continue
-                json_data, csv_rows = scrape_via_api("language", language, watchdog)
+                query = ("language", language)
 
             elif choice == "5":
                 name = input("\n  Station name to search: ").strip()
                 if not name:
                     continue
-                json_data, csv_rows = scrape_via_api("name", name, watchdog)
+                query = ("name", name)
 
             else:
                 print("\n  Invalid choice.")
                 continue
 
+            incremental = ask_incremental(*query)
+            # Asked up front: the streaming ZIP is filled while stations are processed
+            create_zip = input("\n  Create ZIP? (y/n): ").strip().lower() == 'y'
+            if create_zip and current_builder().setting("zip_streaming"):
+                begin_zip_stream()
+            station_index = StationIndex()
+            station_index.begin()
+            found = scrape_via_api(*query, watchdog, station_index, incremental=incremental,
+                                   max_stations=max_stations)
+
             # Process results
-            if not json_data or not json_data.get("stations"):
+            if not found:
                 print("\n  ⚠ No stations found!")
                 watchdog.finish()
                 continue
 
-            print(f"\n  Found {len(json_data['stations'])} stations")
+            print(f"\n  Found {found} stations")
 
             # Handle existing data
-            if JSON_OUT.exists():
+            merge = False
+            if current_builder().json_out.exists():
                 print("\n  Existing data found. [1] Overwrite [2] Merge [3] Cancel")
                 save_choice = input("  Choice: ").strip()
                 if save_choice == "2":
-                    try:
-                        with open(JSON_OUT, "r", encoding="utf-8") as f:
-                            existing = json.load(f)
-                        existing_urls = {s.get("station") for s in existing.get("stations", [])}
-                        new_unique = [s for s in json_data["stations"] if s.get("station") not in existing_urls]
-                        max_id = max((s.get("id", 0) for s in existing.get("stations", [])), default=499)
-                        for i, s in enumerate(new_unique, 1):
-                            s["id"] = max_id + i
-                        json_data["stations"] = existing.get("stations", []) + new_unique
-                        print(f"  Added {len(new_unique)} new stations")
-                    except Exception as e:
-                        print(f"  ⚠ Error: {e}")
+                    merge = True
+                    print(f"  Added {station_index.added} new stations")
                 elif save_choice == "3":
                     continue
 
-            # Save files
-            with open(JSON_OUT, "w", encoding="utf-8") as f:
-                json.dump(json_data, f, indent=2, ensure_ascii=False)
+            station_index.commit(replace=not merge)
+            station_index.export()
             print(f"  ✓ JSON saved")
-
-            csv_rows = [{"id": s["id"], "station": s["name"], "stream_url": s["station"], "logo": s.get("logo", "")}
-                        for s in json_data["stations"]]
-            with open(CSV_OUT, "w", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=["id", "station", "stream_url", "logo"])
-                writer.writeheader()
-                writer.writerows(csv_rows)
             print(f"  ✓ CSV saved")
 
-            # ZIP option
-            if input("\n  Create ZIP? (y/n): ").strip().lower() == 'y':
-                if create_moode_zip(json_data):
-                    verify_moode_zip()
+            if create_zip:
+                if create_moode_zip():
+                    print_zip_report(verify_moode_zip())
 
             watchdog.finish()
 
@@ -1224,12 +4261,354 @@ def main():
         except KeyboardInterrupt:
             print("\n\n  Interrupted!")
             break
+        except ConnectionError as e:
+            # Incomplete station search: nothing is committed, the previous data stays as it was
+            print(f"\n  ⚠ Station search incomplete, nothing saved: {e}")
+            watchdog.finish()
+            continue
         except Exception as e:
             logger.error(f"Error: {e}")
             traceback.print_exc()
             watchdog.finish()
             break
+        finally:
+            discard_zip_stream()
+            if station_index is not None:
+                station_index.close()
+
+
+# ============================================================
+# BATCH MODE - HEADLESS JOBS
+# ============================================================
+
+JOB_CHOICES = ("all", "country", "tag", "language", "name")
+
+
+def normalize_job(job):
+    """Validate one job spec entry; returns (choice, user_input, max_stations).
+
+    An entry names one query, e.g. {"country": "NL"}, {"tag": "jazz"} or
+    {"all": true, "limit": 1000}; "limit" caps the station count.
+    """
+    queries = [key for key in JOB_CHOICES if key in job]
+    if len(queries) != 1:
+        raise ValueError(f"job needs exactly one of {', '.join(JOB_CHOICES)}: {job}")
+    choice = queries[0]
+    limit = job.get("limit", TOP_STATIONS_LIMIT if choice == "all" else None)
+    if choice == "all":
+        return choice, None, limit
+
+    value = str(job[choice]).strip()
+    if choice == "country":
+        value = value.upper()
+        if len(value) != 2:
+            raise ValueError(f"invalid country code: {job[choice]!r}")
+    elif choice in ("tag", "language"):
+        value = value.lower()
+    if not value:
+        raise ValueError(f"empty {choice} in job: {job}")
+    return choice, value, limit
+
+
+def run_jobs(spec, watchdog=None):
+    """Run a batch of queries without prompts; returns a process exit code.
+
+    `spec` = {"jobs": [...], "merge": "overwrite" | "merge", "zip": bool,
+    "incremental": bool, "verify": "quick" | "full"}. All jobs share the
+    HTTP session, mirror ranking, logo cache and render pool, and their
+    stations are streamed into one station_data.json (and one ZIP). With
+    "merge" the existing station_data.json is kept and extended.
+    """
+    jobs = [normalize_job(job) for job in spec.get("jobs", [])]
+    if not jobs:
+        logger.error("Job spec contains no jobs")
+        return 2
+    merge_policy = spec.get("merge", "overwrite")
+    if merge_policy not in ("overwrite", "merge"):
+        logger.error(f"Unknown merge policy: {merge_policy}")
+        return 2
+    build_zip = spec.get("zip", True)
+
+    watchdog = watchdog or Watchdog()
+    failed_jobs = 0
+    if build_zip and current_builder().setting("zip_streaming"):
+        begin_zip_stream()
+    station_index = StationIndex()
+    try:
+        station_index.begin()
+        for choice, user_input, limit in jobs:
+            label = f"{choice}:{user_input}" if user_input else choice
+            logger.info(f"Job {label} started")
+            try:
+                incremental = spec.get("incremental", True) and has_build_state(choice, user_input)
+                added = scrape_via_api(choice, user_input, watchdog, station_index,
+                                       incremental=incremental, max_stations=limit)
+            except Exception as e:
+                failed_jobs += 1
+                logger.error(f"Job {label} failed: {e}")
+                continue
+            logger.info(f"Job {label}: {added} stations added")
+
+        if not station_index.added + station_index.updated:
+            logger.warning("No stations found by any job")
+            return 1
+        replace = merge_policy == "overwrite"
+        if replace and failed_jobs:
+            # The failed jobs' stations were not all seen: keep them instead of dropping them
+            logger.warning("Not removing stations from station_data.json: not every job completed")
+            replace = False
+        removed = station_index.commit(replace=replace)
+        logger.info(f"Station index: {station_index.added} new, {station_index.updated} updated, "
+                    f"{removed} removed, {station_index.duplicates} duplicates skipped")
+        station_index.export()
+
+        if build_zip:
+            if not create_moode_zip():
+                return 1
+            report = verify_moode_zip(mode=spec.get("verify"))
+            print_zip_report(report)
+            if not report["ok"]:
+                failed_jobs += 1
+        return 1 if failed_jobs else 0
+    finally:
+        discard_zip_stream()
+        station_index.close()
+        watchdog.finish()
+
+
+def parse_args(argv=None):
+    """Command line: no arguments starts the interactive menu."""
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Build moOde radio backups from Radio Browser. "
+                    "Without arguments the interactive menu starts."
+    )
+    parser.add_argument("--job", type=Path, help="JSON job spec to run without prompts (see run_jobs)")
+    parser.add_argument("--country", action="append", default=[], help="country code (repeatable)")
+    parser.add_argument("--tag", action="append", default=[], help="tag/genre (repeatable)")
+    parser.add_argument("--language", action="append", default=[], help="language (repeatable)")
+    parser.add_argument("--name", action="append", default=[], help="station name search (repeatable)")
+    parser.add_argument("--all", action="store_true", help=f"top stations by popularity (--limit, default {TOP_STATIONS_LIMIT})")
+    parser.add_argument("--limit", type=int, help="maximum stations per query")
+    parser.add_argument("--merge", choices=("overwrite", "merge"), help="keep and extend existing station_data.json")
+    parser.add_argument("--zip", action=argparse.BooleanOptionalAction, default=None, help="create the backup ZIP")
+    parser.add_argument("--incremental", action=argparse.BooleanOptionalAction, default=None,
+                        help="reuse unchanged stations of earlier runs (default: on)")
+    parser.add_argument("--verify", choices=("quick", "full"), help="ZIP verification mode")
+    parser.add_argument("--source", choices=("api", "mirror"),
+                        help="search the live API or the local catalogue mirror (default: CATALOGUE_SOURCE)")
+    parser.add_argument("--sync-catalogue", action="store_true", help="fully resync the local catalogue mirror")
+    parser.add_argument("--dump-catalogue", type=Path, metavar="PATH",
+                        help="write the catalogue mirror as a JSON fixture (see CATALOGUE_FIXTURE)")
+    parser.add_argument("--probe-streams", action=argparse.BooleanOptionalAction, default=None,
+                        help="check every stream before writing its .pls (default: STREAM_PROBE)")
+    parser.add_argument("--metrics-port", type=int, default=METRICS_PORT,
+                        help="serve live Prometheus metrics on this port (default: METRICS_PORT)")
+    parser.add_argument("--metrics-textfile", type=Path, default=METRICS_TEXTFILE, metavar="PATH",
+                        help="keep Prometheus metrics in this file, for node_exporter (default: METRICS_TEXTFILE)")
+    parser.add_argument("--profile", action="store_true",
+                        help=f"sample stacks per phase into {PROFILE_OUT.name} and {PROFILE_PHASES_OUT.name}")
+    return parser.parse_args(argv)
+
+
+def job_spec_from_args(args):
+    """Job spec from --job and/or query arguments; None if no batch run was requested."""
+    spec = {}
+    if args.job:
+        with open(args.job, "r", encoding="utf-8") as f:
+            spec = json.load(f)
+    jobs = list(spec.get("jobs", []))
+    for choice in ("country", "tag", "language", "name"):
+        jobs += [{choice: value} for value in getattr(args, choice)]
+    if args.all:
+        jobs.append({"all": True})
+    if args.limit is not None:
+        jobs = [{**job, "limit": args.limit} for job in jobs]
+    if not jobs:
+        return None
+
+    spec["jobs"] = jobs
+    for key in ("merge", "zip", "incremental", "verify"):
+        if getattr(args, key) is not None:
+            spec[key] = getattr(args, key)
+    return spec
+
+
+def run_catalogue_tasks(args):
+    """--sync-catalogue and --dump-catalogue; returns an exit code."""
+    import sqlite3
+    catalogue = default_builder().catalogue()
+    try:
+        if args.sync_catalogue:
+            catalogue.sync(force_full=True)
+        if args.dump_catalogue:
+            catalogue.dump(args.dump_catalogue)
+            logger.info(f"Catalogue dump written: {args.dump_catalogue} ({catalogue.count()} stations)")
+    except (ConnectionError, OSError, sqlite3.Error, ValueError) as e:
+        logger.error(f"Catalogue mirror failed: {e}")
+        return 1
+    return 0
+
+
+def cli(argv=None):
+    """Program entry point; returns the exit code."""
+    ensure_required_packages()
+    args = parse_args(argv)
+    setup_logging()
+    try:
+        spec = job_spec_from_args(args)
+    except (OSError, ValueError) as e:
+        logger.error(f"Cannot read job spec: {e}")
+        return 2
+    if args.source:
+        default_builder().config["catalogue_source"] = args.source
+    if args.probe_streams is not None:
+        default_builder().config["stream_probe"] = args.probe_streams
+    if args.sync_catalogue or args.dump_catalogue:
+        status = run_catalogue_tasks(args)
+        if status or spec is None:
+            return status
+    watchdog = Watchdog()
+    with MetricsExporter(watchdog, args.metrics_port, args.metrics_textfile), \
+            StackProfiler() if args.profile else nullcontext():
+        if spec is None:
+            bootstrap(interactive=sys.stdin.isatty())
+            main(watchdog)
+            return 0
+        try:
+            return run_jobs(spec, watchdog)
+        except ValueError as e:
+            logger.error(f"Invalid job spec: {e}")
+            return 2
+
+
+# ============================================================
+# LIBRARY API - INDEPENDENT BUILDS
+# ============================================================
+
+class RadioBuilder:
+    """One moOde build tree with its own settings and HTTP/image backends.
+
+    `root` holds the moOde folders, station_data.json, the backup ZIP,
+    reports, build state and logo cache (None = next to this script, the
+    tree the menu and batch mode use). `config` overrides BUILD_SETTINGS,
+    e.g. {"station_workers": 4, "zip_verify_mode": "full"}. `session` is a
+    requests.Session-like HTTP backend (default: the shared pooled session);
+    `renderer(content, is_svg, renditions)` is an image backend returning
+    (status, {kind: JPEG bytes}) like render_logo_buffers() (default: the
+    shared render process pool).
+
+    Builders share nothing but the render pool, the per-host throttle and
+    the mirror ranking, so several can run in one process, also
+    concurrently from different threads.
+    """
+
+    def __init__(self, root=None, config=None, session=None, renderer=None):
+        unknown = sorted(set(config or {}) - set(BUILD_SETTINGS))
+        if unknown:
+            raise ValueError(f"unknown build settings: {', '.join(unknown)}")
+        self.root = BASE_DIR if root is None else Path(root).resolve()
+        self.config = dict(config or {})
+        self.session = session
+        self.renderer = renderer
+        self.zip_stream = None
+        self.timings = None
+        self._logo_cache = None
+        self._catalogue = None
+        self._lock = threading.Lock()
+
+        def path(default):
+            return default if root is None else self.root / default.relative_to(BASE_DIR)
+
+        self.radio_dir = path(RADIO_DIR)
+        self.logo_dir = path(LOGO_DIR)
+        self.thumb_dir = path(THUMB_DIR)
+        self.logo_cache_dir = path(LOGO_CACHE_DIR)
+        self.build_state_out = path(BUILD_STATE_OUT)
+        self.mirror_cache_out = path(MIRROR_CACHE_OUT)
+        self.station_index_out = path(STATION_INDEX_OUT)
+        self.catalogue_out = path(CATALOGUE_OUT)
+        self.json_out = path(JSON_OUT)
+        self.zip_out = path(ZIP_OUT)
+        self.csv_out = path(CSV_OUT)
+        self.summary_out = path(SUMMARY_OUT)
+        self.profile_out = path(PROFILE_OUT)
+        self.profile_phases_out = path(PROFILE_PHASES_OUT)
+        self.error_out = path(ERROR_OUT)
+        self.event_log_out = path(EVENT_LOG_OUT)
+
+    def setting(self, key):
+        """A build setting: the config override, else the CONFIG constant."""
+        if key in self.config:
+            return self.config[key]
+        return globals()[BUILD_SETTINGS[key]]
+
+    @contextmanager
+    def activate(self):
+        """Run the enclosed block (and the pools it starts) against this build."""
+        previous = getattr(_task_context, "builder", None)
+        _task_context.builder = self
+        try:
+            yield self
+        finally:
+            _task_context.builder = previous
+
+    def logo_cache(self):
+        """This build's logo cache (created on first use), or None when disabled."""
+        if not self.setting("logo_cache"):
+            return None
+        with self._lock:
+            if self._logo_cache is None:
+                self._logo_cache = LogoCache(self.logo_cache_dir)
+            return self._logo_cache
+
+    def catalogue(self):
+        """This build's catalogue mirror (opened on first use)."""
+        with self._lock:
+            if self._catalogue is None:
+                self._catalogue = StationCatalogue(self.catalogue_out)
+            return self._catalogue
+
+    def iter_stations(self, job, watchdog=None, incremental=False):
+        """Build one query, yielding StationRecords as stations finish.
+
+        `job` is a batch job entry such as {"country": "NL"} or
+        {"tag": "jazz", "limit": 100}. The builder is only active while the
+        iterator runs, so iterators of different builders can be interleaved.
+        Without a `watchdog` one is created and finished with the iterator.
+        """
+        choice, user_input, limit = normalize_job(job)
+        with self.activate():
+            own_watchdog = watchdog is None
+            watchdog = watchdog or Watchdog()
+            records = iter_station_records(choice, user_input, watchdog,
+                                           incremental=incremental, max_stations=limit)
+        try:
+            while True:
+                with self.activate():
+                    record = next(records, None)
+                if record is None:
+                    return
+                yield record
+        finally:
+            with self.activate():
+                records.close()
+                if own_watchdog:
+                    watchdog.finish()
+
+    def run(self, spec, watchdog=None):
+        """Run a batch job spec (see run_jobs) in this tree; returns the exit code."""
+        with self.activate():
+            return run_jobs(spec, watchdog)
+
+    def verify(self, mode=None):
+        """Verify this tree's backup ZIP; returns a verify_moode_zip() report."""
+        with self.activate():
+            return verify_moode_zip(mode=mode)
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        sys.exit(cli())
+    finally:
+        shutdown_render_pool()
@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+# ============================================================
+# Moode Radio Builder - benchmarks
+# Logo rendering: single-decode renditions vs. the previous path
+# End-to-end builds against a local fake Radio Browser and favicon hosts
+# ============================================================
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import struct
+import zlib
+import logging
+import argparse
+import platform
+import threading
+import contextlib
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from io import BytesIO
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import RadioBuilderV1 as rb
+from PIL import Image
+
+
+# ============================================================
+# SAMPLE LOGOS
+# ============================================================
+
+def make_sample(kind, size):
+    """Synthetic favicon: a gradient with some detail, encoded as `kind`."""
+    img = Image.linear_gradient("L").resize(size).convert("RGB")
+    img = Image.merge("RGB", (img.getchannel(0), img.rotate(90).getchannel(0),
+                              Image.effect_noise(size, 64)))
+    out = BytesIO()
+    if kind == "png":
+        img = img.convert("RGBA")
+        img.putalpha(Image.linear_gradient("L").resize(size))
+        img.save(out, format="PNG")
+    else:
+        img.save(out, format="JPEG", quality=90)
+    return out.getvalue()
+
+
+def load_samples(directory=None):
+    """Logo bytes from a directory of favicons, or a synthetic mix."""
+    if directory:
+        return [(p.name, p.read_bytes()) for p in sorted(Path(directory).iterdir())
+                if p.suffix.lower() in (".png", ".jpg", ".jpeg", ".gif", ".webp", ".ico")]
+    return [
+        ("small.png", make_sample("png", (64, 64))),
+        ("medium.png", make_sample("png", (512, 512))),
+        ("large.jpg", make_sample("jpg", (1600, 1200))),
+        ("wide.jpg", make_sample("jpg", (800, 200))),
+    ]
+
+
+# ============================================================
+# RENDER PATHS
+# ============================================================
+
+def decode_previous(content):
+    """save_jpg()'s decode: full-size Image.open() and conversion to RGB on white, no draft()."""
+    img = Image.open(BytesIO(content))
+    if img.mode in ("RGBA", "P", "LA"):
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        if img.mode == "P":
+            img = img.convert("RGBA")
+        if img.mode in ("RGBA", "LA"):
+            try:
+                alpha = img.split()[-1]
+                background.paste(img, mask=alpha)
+            except Exception:
+                background.paste(img)
+        else:
+            background.paste(img)
+        img = background
+    elif img.mode != "RGB":
+        img = img.convert("RGB")
+    return img
+
+
+def render_previous(content, paths):
+    """Rendering as done before single-decode renditions.
+
+    save_jpg() decoded the full image (decode_previous), wrote the 335x335
+    logo, create_thumbnails() re-thumbnailed that logo to 80x80 and encoded
+    and wrote the identical canvas twice.
+    """
+    img = decode_previous(content)
+    img.thumbnail((335, 335), Image.Resampling.LANCZOS)
+    canvas = Image.new("RGB", (335, 335), (255, 255, 255))
+    canvas.paste(img, ((335 - img.width) // 2, (335 - img.height) // 2))
+    logo = BytesIO()
+    canvas.save(logo, format="JPEG", quality=92, optimize=True)
+
+    thumb = canvas.copy()
+    thumb.thumbnail((80, 80), Image.Resampling.LANCZOS)
+    thumb_canvas = Image.new("RGB", (80, 80), (255, 255, 255))
+    thumb_canvas.paste(thumb, ((80 - thumb.width) // 2, (80 - thumb.height) // 2))
+    paths[0].write_bytes(logo.getvalue())
+    for path in paths[1:]:
+        out = BytesIO()
+        thumb_canvas.save(out, format="JPEG", quality=85, optimize=True)
+        path.write_bytes(out.getvalue())
+
+
+def render_current(content, paths):
+    """render_logo_buffers() plus write_logo_files(), as used by the builder."""
+    _, buffers = rb.render_logo_buffers(content, False, rb.LOGO_RENDITIONS)
+    rb.write_logo_files(paths, [buffers[kind] for kind, _, _ in rb.LOGO_RENDITIONS])
+
+
+def bench(render, content, paths, repeat):
+    """Best-of-`repeat` seconds to render and write one logo."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render(content, paths)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+# ============================================================
+# FAKE RADIO BROWSER & FAVICON HOSTS
+# ============================================================
+
+SVG_TEMPLATE = ('<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}">'
+                '<circle cx="{half}" cy="{half}" r="{half}" fill="#{color:06x}"/></svg>')
+
+
+def unique_variant(content, kind, i):
+    """Make logo bytes unique per station without re-encoding, so the content-addressed cache misses."""
+    tag = f"bench-{i}".encode()
+    if kind == "png":
+        chunk = struct.pack(">I", len(tag)) + b"tEXt" + tag + struct.pack(">I", zlib.crc32(b"tEXt" + tag))
+        return content[:-12] + chunk + content[-12:]   # before IEND
+    if kind == "jpg":
+        return content[:2] + b"\xff\xfe" + struct.pack(">H", len(tag) + 2) + tag + content[2:]   # COM after SOI
+    return content.replace(b"</svg>", f"<!-- {tag.decode()} --></svg>".encode())
+
+
+class QuietHTTPServer(ThreadingHTTPServer):
+    """Fake server that ignores clients hanging up (deadlines, shutdown)."""
+
+    def handle_error(self, request, client_address):
+        pass
+
+
+class FakeRadioBrowser:
+    """Local stand-in for a Radio Browser mirror plus `hosts` favicon servers.
+
+    The mirror answers /json/stats and /json/stations/search (offset/limit
+    paging over `stations` synthetic stations). Favicon i is decided by a
+    seeded RNG: an HTTP 500 (`error_rate`), a response held back for
+    `hang_seconds` (`timeout_rate`), an SVG (`svg_share`) or a PNG/JPEG of
+    one of `logo_sizes`. Every favicon answer waits `logo_latency` seconds
+    +-50%, every API page `api_latency` seconds.
+    """
+
+    def __init__(self, stations, hosts=50, api_latency=0.0, logo_latency=0.02, error_rate=0.02,
+                 timeout_rate=0.0, hang_seconds=5.0, svg_share=0.05, logo_sizes=(48, 128, 512), seed=1):
+        self.stations = stations
+        self.api_latency = api_latency
+        self.logo_latency = logo_latency
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.hang_seconds = hang_seconds
+        self.svg_share = svg_share
+        self.logo_sizes = logo_sizes
+        self.seed = seed
+        self.samples = {(kind, size): make_sample(kind, (size, size))
+                        for kind in ("png", "jpg") for size in logo_sizes}
+        self.requests = {"api": 0, "logo": 0}
+        self._lock = threading.Lock()
+        self._servers = [self._serve() for _ in range(1 + hosts)]
+        self.api_base = self._base(self._servers[0])
+        self.logo_bases = [self._base(server) for server in self._servers[1:]]
+
+    @staticmethod
+    def _base(server):
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    def _serve(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                fake.handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        server = QuietHTTPServer(("127.0.0.1", 0), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def station(self, i):
+        """Synthetic API station i (most popular first)."""
+        logo_base = self.logo_bases[i % len(self.logo_bases)]
+        return {
+            "stationuuid": f"bench-{i:06d}", "changeuuid": f"bench-change-{i:06d}",
+            "lastchangetime": "2024-01-01 00:00:00", "name": f"Bench Station {i}",
+            "url": f"http://stream.invalid/{i}.mp3", "url_resolved": "",
+            "favicon": f"{logo_base}/logo/{i}", "homepage": f"http://station.invalid/{i}",
+            "tags": "pop,rock", "language": "english", "country": "Netherlands", "countrycode": "NL",
+            "state": "", "bitrate": 128, "codec": "MP3", "clickcount": self.stations - i,
+        }
+
+    def favicon(self, i):
+        """(status, content type, body, delay) of favicon i."""
+        rng = random.Random(self.seed * 1000003 + i)
+        delay = self.logo_latency * rng.uniform(0.5, 1.5)
+        roll = rng.random()
+        if roll < self.error_rate:
+            return 500, "text/plain", b"error", delay
+        roll -= self.error_rate
+        if roll < self.timeout_rate:
+            return 200, "image/png", self.samples[("png", self.logo_sizes[0])], self.hang_seconds
+        roll -= self.timeout_rate
+        size = rng.choice(self.logo_sizes)
+        if roll < self.svg_share:
+            body = SVG_TEMPLATE.format(size=size, half=size // 2, color=rng.randrange(1 << 24)).encode()
+            return 200, "image/svg+xml", unique_variant(body, "svg", i), delay
+        kind = rng.choice(("png", "jpg"))
+        content_type = "image/png" if kind == "png" else "image/jpeg"
+        return 200, content_type, unique_variant(self.samples[(kind, size)], kind, i), delay
+
+    def handle(self, request):
+        url = urlparse(request.path)
+        if url.path == "/json/stats":
+            self._send(request, 200, "application/json", b"{}")
+        elif url.path == "/json/stations/search":
+            with self._lock:
+                self.requests["api"] += 1
+            query = parse_qs(url.query)
+            offset = int(query.get("offset", ["0"])[0])
+            limit = int(query.get("limit", [str(self.stations)])[0])
+            time.sleep(self.api_latency)
+            page = [self.station(i) for i in range(offset, min(self.stations, offset + limit))]
+            self._send(request, 200, "application/json", json.dumps(page).encode())
+        elif url.path.startswith("/logo/"):
+            with self._lock:
+                self.requests["logo"] += 1
+            status, content_type, body, delay = self.favicon(int(url.path.rsplit("/", 1)[1]))
+            time.sleep(delay)
+            self._send(request, status, content_type, body)
+        else:
+            self._send(request, 404, "text/plain", b"not found")
+
+    @staticmethod
+    def _send(request, status, content_type, body):
+        try:
+            request.send_response(status)
+            request.send_header("Content-Type", content_type)
+            request.send_header("Content-Length", str(len(body)))
+            request.end_headers()
+            request.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass   # the client gave up (logo deadline)
+
+    def close(self):
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+
+
+# ============================================================
+# END-TO-END SCENARIOS
+# ============================================================
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def bench_build(fake, stations, config, zip_backup=True):
+    """Build `stations` stations from `fake` into a fresh tree; returns a result dict.
+
+    Covers scrape_via_api (API paging, logo download and rendering, .pls
+    files) followed by create_moode_zip and a quick verify.
+    """
+    rb.MIRROR_DISCOVERY = "static"
+    rb.API_SERVERS = [fake.api_base]
+    rb._ranked_servers = None
+    root = Path(tempfile.mkdtemp(prefix="bench_build_"))
+    builder = rb.RadioBuilder(root=root, config=config)
+    result = {"scenario": "build", "stations": stations}
+    try:
+        with builder.activate(), contextlib.redirect_stdout(io.StringIO()):
+            watchdog = rb.Watchdog()
+            index = rb.StationIndex()
+            start = time.perf_counter()
+            if zip_backup and builder.setting("zip_streaming"):
+                rb.begin_zip_stream()
+            index.begin()
+            written = rb.scrape_via_api("all", None, watchdog, index, max_stations=stations)
+            index.commit(replace=True)
+            index.export()
+            index.close()
+            scraped = time.perf_counter() - start
+            if zip_backup:
+                result["zip_ok"] = rb.create_moode_zip() and rb.verify_moode_zip()["ok"]
+                result["zip_bytes"] = builder.zip_out.stat().st_size if builder.zip_out.exists() else 0
+            elapsed = time.perf_counter() - start
+        result.update({
+            "stations_written": written,
+            "scrape_seconds": round(scraped, 3),
+            "total_seconds": round(elapsed, 3),
+            "metrics": watchdog.metrics,
+            "performance": watchdog.timings.summary(elapsed),
+            "fake_requests": dict(fake.requests),
+            "peak_rss_mb": peak_rss_mb(),
+        })
+        return result
+    finally:
+        rb.discard_zip_stream()
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def run_builds(args):
+    """Build scenarios for every --stations size; returns result dicts."""
+    config = dict(parse_setting(item) for item in args.setting)
+    rb.host_throttle.delay = args.request_delay
+    rb.LOGO_TIMEOUT = args.logo_timeout
+    results = []
+    print(f"{'stations':>10}{'scrape s':>11}{'total s':>10}{'st/s':>9}{'ok':>8}{'failed':>8}{'MB down':>9}")
+    for stations in args.stations:
+        fake = FakeRadioBrowser(
+            stations, hosts=args.hosts, api_latency=args.api_latency, logo_latency=args.logo_latency,
+            error_rate=args.error_rate, timeout_rate=args.timeout_rate, hang_seconds=args.logo_timeout + 1,
+            svg_share=args.svg_share, logo_sizes=tuple(args.logo_sizes), seed=args.seed
+        )
+        try:
+            result = bench_build(fake, stations, config, zip_backup=not args.no_zip)
+        finally:
+            fake.close()
+        results.append(result)
+        metrics = result["metrics"]
+        downloaded = result["performance"]["bytes_transferred"]["total"] / 1e6
+        print(f"{stations:>10}{result['scrape_seconds']:>11.2f}{result['total_seconds']:>10.2f}"
+              f"{result['performance']['stations_per_second']:>9.1f}{metrics['logos_converted']:>8}"
+              f"{metrics['logos_failed'] + metrics['logos_timeout']:>8}{downloaded:>9.1f}")
+    rb.shutdown_render_pool()
+    return results
+
+
+def parse_setting(item):
+    """KEY=VALUE for --setting; VALUE is JSON when it parses, else a string."""
+    key, _, value = item.partition("=")
+    if key not in rb.BUILD_SETTINGS:
+        raise argparse.ArgumentTypeError(f"unknown build setting: {key}")
+    try:
+        return key, json.loads(value)
+    except ValueError:
+        return key, value
+
+
+def environment():
+    """Where the numbers were measured."""
+    import PIL
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "pillow": PIL.__version__,
+        "svg_support": rb.svg_enabled(),
+        "render_processes": rb.RENDER_PROCESSES,
+    }
+
+
+def run_render(args):
+    """Render scenario for every sample logo; returns result dicts."""
+    samples = load_samples(args.dir)
+    if not samples:
+        sys.exit("No sample logos found")
+
+    out_dir = Path(tempfile.mkdtemp(prefix="bench_render_"))
+    paths = [out_dir / "logo.jpg", out_dir / "thumb.jpg", out_dir / "thumb_sm.jpg"]
+
+    results = []
+    print(f"{'sample':<24}{'previous ms':>14}{'current ms':>14}{'speedup':>10}")
+    totals = [0.0, 0.0]
+    for name, content in samples:
+        previous = bench(render_previous, content, paths, args.repeat)
+        current = bench(render_current, content, paths, args.repeat)
+        totals[0] += previous
+        totals[1] += current
+        results.append({"scenario": "render", "sample": name, "bytes": len(content),
+                        "previous_ms": round(previous * 1000, 3), "current_ms": round(current * 1000, 3)})
+        print(f"{name[:23]:<24}{previous * 1000:>14.2f}{current * 1000:>14.2f}{previous / current:>9.2f}x")
+    print(f"{'total':<24}{totals[0] * 1000:>14.2f}{totals[1] * 1000:>14.2f}{totals[0] / totals[1]:>9.2f}x")
+    shutil.rmtree(out_dir, ignore_errors=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark logo rendering and end-to-end builds.")
+    parser.add_argument("--scenario", choices=("render", "build", "all"), default="all",
+                        help="render = logo rendering paths, build = scrape + ZIP against the fake servers")
+    parser.add_argument("--json", type=Path, metavar="PATH", help="also write the results as JSON")
+    render = parser.add_argument_group("render scenario")
+    render.add_argument("--dir", help="directory with favicon files (default: synthetic samples)")
+    render.add_argument("--repeat", type=int, default=5, help="runs per path, best is reported")
+    build = parser.add_argument_group("build scenario")
+    build.add_argument("--stations", type=int, nargs="+", default=[500, 5000, 50000],
+                       help="station counts to build (default: 500 5000 50000)")
+    build.add_argument("--hosts", type=int, default=50, help="favicon hosts (one local server each)")
+    build.add_argument("--api-latency", type=float, default=0.05, help="seconds per API page")
+    build.add_argument("--logo-latency", type=float, default=0.02, help="mean seconds per favicon (+-50%%)")
+    build.add_argument("--error-rate", type=float, default=0.02, help="share of favicons answering HTTP 500")
+    build.add_argument("--timeout-rate", type=float, default=0.0,
+                       help="share of favicons held back beyond --logo-timeout")
+    build.add_argument("--logo-timeout", type=float, default=rb.LOGO_TIMEOUT, help="LOGO_TIMEOUT for the build")
+    build.add_argument("--svg-share", type=float, default=0.05, help="share of SVG favicons")
+    build.add_argument("--logo-sizes", type=int, nargs="+", default=[48, 128, 512],
+                       help="square favicon sizes in pixels, picked at random")
+    build.add_argument("--request-delay", type=float, default=0.0,
+                       help=f"politeness delay per favicon host (the builder uses {rb.REQUEST_DELAY})")
+    build.add_argument("--seed", type=int, default=1, help="seed of the favicon mix")
+    build.add_argument("--setting", action="append", default=[], metavar="KEY=VALUE",
+                       help="RadioBuilder setting, e.g. logo_engine=thread (repeatable)")
+    build.add_argument("--no-zip", action="store_true", help="skip create_moode_zip")
+    args = parser.parse_args()
+
+    logging.getLogger("radio-scraper").setLevel(logging.ERROR)
+    results = []
+    if args.scenario in ("render", "all"):
+        results += run_render(args)
+    if args.scenario in ("build", "all"):
+        results += run_builds(args)
+    if args.json:
+        report = {"environment": environment(), "options": {key: value for key, value in vars(args).items()
+                                                             if key != "json"}, "results": results}
+        args.json.write_text(json.dumps(report, indent=2, default=str), encoding="utf-8")
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
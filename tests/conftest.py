@@ -0,0 +1,197 @@
+import io
+import sys
+import json
+import threading
+import contextlib
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import RadioBuilderV1 as rb
+from PIL import Image
+
+
+def make_png(i, size=48):
+    """Small distinct PNG favicon."""
+    out = io.BytesIO()
+    Image.new("RGB", (size, size), ((i * 37) % 256, (i * 91) % 256, (i * 13) % 256)).save(out, "PNG")
+    return out.getvalue()
+
+
+class QuietHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass   # clients hanging up on purpose
+
+
+class FakeRadioBrowser:
+    """Local Radio Browser mirror, favicon host and stream host in one server.
+
+    `stations` is the API listing (see station()), served by the station
+    search and the full /json/stations list; `fail_offsets` makes station
+    requests at those offsets answer HTTP 500, `favicon_status`
+    and `stream_kinds` override single favicons and streams. `search_delay`
+    holds station answers back, `search_dribble` sends their body in 16
+    pieces that many seconds apart. Connections, requests and the peak of
+    concurrent favicon requests are recorded.
+    """
+
+    def __init__(self, count=0):
+        self.stations = []
+        self.fail_offsets = set()
+        self.favicon_status = {}
+        self.stream_kinds = {}
+        self.connections = 0
+        self.requests = []
+        self.favicon_active = 0
+        self.favicon_peak = 0
+        self.favicon_delay = 0.0
+        self.search_delay = 0.0
+        self.search_dribble = 0.0
+        self._lock = threading.Lock()
+        self.server = self._serve()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.stations = [self.station(i) for i in range(count)]
+
+    def _serve(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with fake._lock:
+                    fake.connections += 1
+
+            def do_GET(self):
+                fake.handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        server = QuietHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def station(self, i, **overrides):
+        station = {
+            "stationuuid": f"uuid-{i}", "changeuuid": f"change-{i}", "lastchangetime": "2024-01-01 00:00:00",
+            "name": f"Station {i}", "url": f"{self.base}/stream/{i}", "url_resolved": "",
+            "favicon": f"{self.base}/logo/{i}.png", "homepage": "http://example.invalid",
+            "tags": "pop", "language": "dutch", "country": "Netherlands", "countrycode": "NL",
+            "state": "", "bitrate": 128, "codec": "MP3", "clickcount": 1000 - i,
+        }
+        station.update(overrides)
+        return station
+
+    def handle(self, request):
+        url = urlparse(request.path)
+        query = parse_qs(url.query)
+        with self._lock:
+            self.requests.append(url.path)
+        if url.path == "/json/stats":
+            return self._send(request, 200, b"{}")
+        if url.path in ("/json/stations/search", "/json/stations"):
+            offset = int(query.get("offset", ["0"])[0])
+            limit = int(query.get("limit", ["100000"])[0])
+            if offset in self.fail_offsets:
+                return self._send(request, 500, b"[]")
+            threading.Event().wait(self.search_delay)
+            stations = self.stations
+            if "tag" in query:
+                stations = [s for s in stations if query["tag"][0] in s["tags"].split(",")]
+            return self._send(request, 200, json.dumps(stations[offset:offset + limit]).encode(),
+                              dribble=self.search_dribble)
+        if url.path.startswith("/logo/"):
+            i = int(url.path.rsplit("/", 1)[1].split(".")[0])
+            with self._lock:
+                self.favicon_active += 1
+                self.favicon_peak = max(self.favicon_peak, self.favicon_active)
+            try:
+                threading.Event().wait(self.favicon_delay)
+                status = self.favicon_status.get(i, 200)
+                if status != 200:
+                    return self._send(request, status, b"error", "text/plain")
+                return self._send(request, 200, make_png(i), "image/png")
+            finally:
+                with self._lock:
+                    self.favicon_active -= 1
+        if url.path.startswith("/stream/"):
+            i = int(url.path.rsplit("/", 1)[1])
+            kind = self.stream_kinds.get(i, "ok")
+            if kind == "dead":
+                return self._send(request, 404, b"not found", "text/plain")
+            if kind == "html":
+                return self._send(request, 200, b"<html></html>", "text/html; charset=utf-8")
+            if kind == "redirect":
+                return self._send(request, 302, b"", "text/plain", {"Location": f"/stream/{i + 100000}"})
+            if kind == "icy":
+                request.wfile.write(b"ICY 200 OK\r\nicy-br:64\r\n\r\n")
+                request.close_connection = True
+                return
+            content_type = "audio/aacp" if i >= 100000 else "audio/mpeg"
+            return self._send(request, 200, b"\x00" * 512, content_type, {"icy-br": "128,128"})
+        self._send(request, 404, b"not found", "text/plain")
+
+    @staticmethod
+    def _send(request, status, body, content_type="application/json", headers=None, dribble=0.0):
+        request.send_response(status)
+        request.send_header("Content-Type", content_type)
+        request.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            request.send_header(key, value)
+        request.end_headers()
+        if not dribble:
+            request.wfile.write(body)
+            return
+        piece = len(body) // 16 + 1
+        for start in range(0, len(body), piece):
+            request.wfile.write(body[start:start + piece])
+            request.wfile.flush()
+            threading.Event().wait(dribble)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    """A FakeRadioBrowser that the builder uses as its only API mirror."""
+    server = FakeRadioBrowser()
+    monkeypatch.setattr(rb, "MIRROR_DISCOVERY", "static")
+    monkeypatch.setattr(rb, "API_SERVERS", [server.base])
+    monkeypatch.setattr(rb, "_ranked_servers", None)
+    monkeypatch.setattr(rb, "RENDER_PROCESSES", 0)
+    monkeypatch.setattr(rb.host_throttle, "delay", 0)
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def builder(tmp_path, fake):
+    """RadioBuilder on a temporary tree, active for the test."""
+    radio_builder = rb.RadioBuilder(root=tmp_path)
+    with radio_builder.activate(), contextlib.redirect_stdout(io.StringIO()):
+        yield radio_builder
+
+
+def build(choice, value, merge="overwrite", incremental=True, **kwargs):
+    """One menu-style build of the active builder: scrape, commit, export. Returns the Watchdog."""
+    watchdog = rb.Watchdog()
+    index = rb.StationIndex()
+    try:
+        index.begin()
+        rb.scrape_via_api(choice, value, watchdog, index, incremental=incremental, **kwargs)
+        index.commit(replace=merge == "overwrite")
+        index.export()
+    finally:
+        index.close()
+        watchdog.events.close()
+    return watchdog
@@ -0,0 +1,48 @@
+import time
+import threading
+
+import pytest
+
+import RadioBuilderV1 as rb
+from conftest import FakeRadioBrowser
+
+
+@pytest.fixture
+def slow(fake, monkeypatch):
+    """A second mirror, ranked first, whose answers are slow."""
+    server = FakeRadioBrowser()
+    monkeypatch.setattr(rb, "API_SERVERS", [server.base, fake.base])
+    monkeypatch.setattr(rb, "_ranked_servers", {"ranked_at": time.time(), "servers": [server.base, fake.base],
+                                                "latency_ms": {}})
+    monkeypatch.setattr(rb, "MIRROR_HEDGE_AFTER", 0.05)
+    yield server
+    server.close()
+
+
+def api_threads():
+    return [thread for thread in threading.enumerate() if thread.name.startswith("api")]
+
+
+def wait_for(condition, seconds):
+    end = time.monotonic() + seconds
+    while not condition() and time.monotonic() < end:
+        time.sleep(0.02)
+    return condition()
+
+
+def test_hedged_request_wins_and_the_slow_one_is_aborted(builder, fake, slow):
+    fake.stations = slow.stations = [fake.station(i) for i in range(300)]
+    slow.search_dribble = 0.25   # 4 s for the whole answer
+    start = time.monotonic()
+    assert len(rb.fetch_api_json({"offset": 0, "limit": 300})) == 300
+    assert time.monotonic() - start < 1.0
+    assert wait_for(lambda: not api_threads(), 1.5)
+
+
+def test_mirror_requests_respect_the_callers_deadline(builder, fake, slow):
+    fake.search_delay = slow.search_delay = 3.0
+    start = time.monotonic()
+    with rb.deadline_scope(0.3, "job"):
+        with pytest.raises((ConnectionError, rb.DeadlineExceeded)):
+            rb.fetch_api_json({"offset": 0, "limit": 10})
+    assert time.monotonic() - start < 1.5
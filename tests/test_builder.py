@@ -0,0 +1,59 @@
+import io
+import threading
+import contextlib
+from concurrent.futures.process import BrokenProcessPool
+
+import RadioBuilderV1 as rb
+from conftest import make_png
+
+
+def event_threads():
+    return sum(1 for thread in threading.enumerate() if thread.name == "event-log")
+
+
+def test_iter_stations_finishes_its_own_watchdog(builder, fake):
+    fake.stations = [fake.station(i) for i in range(3)]
+    fake.favicon_status = {1: 404}   # logs an error event
+    before = event_threads()
+    assert len(list(builder.iter_stations({"country": "NL"}))) == 3
+    assert event_threads() == before
+    assert builder.summary_out.exists()
+
+
+def test_cli_options_only_configure_the_default_build(monkeypatch, tmp_path):
+    default = rb.RadioBuilder(root=tmp_path)
+    monkeypatch.setattr(rb, "_default_builder", default)
+    monkeypatch.setattr(rb, "run_jobs", lambda spec, watchdog: 0)
+    monkeypatch.setattr(rb, "setup_logging", lambda: None)
+    assert rb.cli(["--country", "NL", "--source", "mirror", "--probe-streams"]) == 0
+    assert default.setting("catalogue_source") == "mirror" and default.setting("stream_probe") is True
+    assert (rb.CATALOGUE_SOURCE, rb.STREAM_PROBE) == ("api", False)
+    assert rb.RadioBuilder(root=tmp_path).setting("catalogue_source") == "api"
+
+
+def test_broken_render_pool_only_affects_its_build(builder, monkeypatch):
+    class BrokenPool:
+        def submit(self, *args):
+            raise BrokenProcessPool("worker died")
+
+        def shutdown(self, wait=True):
+            pass
+
+    monkeypatch.setattr(rb, "RENDER_PROCESSES", None)
+    monkeypatch.setattr(rb, "_render_pool", BrokenPool())
+    status, _, _ = rb.render_in_pool(make_png(1), False)
+    assert status == "ok"
+    assert builder.setting("render_processes") == 0
+    assert rb._render_pool is None
+    assert rb.RENDER_PROCESSES is None
+
+
+
+def test_station_data_writer_does_not_print(builder):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        writer = rb.StationDataWriter()
+        writer.write(rb.StationRecord(id=500, name="A", station="http://a.invalid/stream"))
+        assert writer.close() == 1
+    assert out.getvalue() == ""
+    assert [record.name for record in rb.iter_station_data(builder.json_out)] == ["A"]
@@ -0,0 +1,33 @@
+import json
+
+import RadioBuilderV1 as rb
+from conftest import build
+
+QUERY = {"countrycode": "nl", "order": "clickcount", "reverse": "true", "limit": 10}
+
+
+def test_dump_loads_back_as_fixture(builder, fake, tmp_path, monkeypatch):
+    fake.stations = [fake.station(i, countrycode="NL" if i % 2 else "DE") for i in range(40)]
+    catalogue = rb.StationCatalogue(tmp_path / "live.sqlite")
+    assert catalogue.sync() == "full"
+    fixture = tmp_path / "fixture.json"
+    catalogue.dump(fixture)
+    assert len(json.loads(fixture.read_text(encoding="utf-8"))) == 40
+
+    monkeypatch.setattr(rb, "CATALOGUE_FIXTURE", str(fixture))
+    fake.fail_offsets = {0}   # the fixture needs no API
+    offline = rb.StationCatalogue(tmp_path / "offline.sqlite")
+    assert offline.sync() == "full"
+    assert offline.sync() is None
+    assert offline.search(QUERY) == catalogue.search(QUERY)
+    assert [s["stationuuid"] for s in offline.search(QUERY)][:2] == ["uuid-1", "uuid-3"]
+
+
+def test_build_from_fixture_mirror(builder, fake, tmp_path, monkeypatch):
+    fixture = tmp_path / "fixture.json"
+    fixture.write_text(json.dumps([fake.station(i) for i in range(6)]), encoding="utf-8")
+    monkeypatch.setattr(rb, "CATALOGUE_FIXTURE", str(fixture))
+    builder.config["catalogue_source"] = "mirror"
+    build("country", "NL")
+    assert len(list(rb.iter_station_data(builder.json_out))) == 6
+    assert not any(path.startswith("/json/") for path in fake.requests)
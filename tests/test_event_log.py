@@ -0,0 +1,32 @@
+import threading
+
+import RadioBuilderV1 as rb
+
+
+def event_threads():
+    return sum(1 for thread in threading.enumerate() if thread.name == "event-log")
+
+
+def test_finish_closes_the_event_log(builder):
+    before = event_threads()
+    for _ in range(3):
+        watchdog = rb.Watchdog()
+        watchdog.log_error("Station", "logo", "boom")
+        watchdog.finish()
+    assert event_threads() == before
+    assert watchdog.events._file.closed
+
+
+def test_reused_watchdog_keeps_appending(builder):
+    before = event_threads()
+    watchdog = rb.Watchdog()
+    watchdog.log_error("Station 1", "logo", "first")
+    watchdog.finish()
+    watchdog.log_error("Station 2", "logo", "second")
+    watchdog.finish()
+
+    events = list(rb.iter_events(builder.event_log_out))
+    assert [event["event"] for event in events].count("finished") == 2
+    assert [event["station"] for event in rb.iter_events(builder.event_log_out, ("error",))] == \
+        ["Station 1", "Station 2"]
+    assert event_threads() == before
@@ -0,0 +1,34 @@
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def run_python(code):
+    return subprocess.run([sys.executable, "-c", f"import sys; sys.path.insert(0, {str(ROOT)!r})\n" + code],
+                          capture_output=True, text=True, timeout=60)
+
+
+def test_import_loads_no_heavy_modules():
+    result = run_python(
+        "import RadioBuilderV1\n"
+        "heavy = ('requests', 'urllib3', 'PIL', 'sqlite3', 'multiprocessing', 'subprocess', 'argparse')\n"
+        "print(sorted(m for m in heavy if m in sys.modules))"
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
+
+
+def test_missing_required_package_raises_import_error_without_installing():
+    result = run_python(
+        "sys.modules['requests'] = None\n"
+        "import RadioBuilderV1 as rb\n"
+        "try:\n"
+        "    rb.create_http_session()\n"
+        "except ImportError as e:\n"
+        "    print(e)\n"
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "Package 'requests' is required: pip install requests"
+    assert "BOOTSTRAP" not in result.stdout
@@ -0,0 +1,73 @@
+import RadioBuilderV1 as rb
+from conftest import build
+
+
+def station_files(builder, safe_name):
+    return [builder.radio_dir / f"{safe_name}.pls"] + list(rb.logo_output_paths(safe_name))
+
+
+def records(builder):
+    return {record.name: record for record in rb.iter_station_data(builder.json_out)}
+
+
+def test_unlisted_station_files_are_removed(builder, fake):
+    fake.stations = [fake.station(i) for i in range(5)]
+    build("country", "NL")
+
+    fake.stations = fake.stations[:4]
+    watchdog = build("country", "NL")
+    assert watchdog.metrics["stations_removed"] == 1
+    assert not any(path.exists() for path in station_files(builder, "Station 4"))
+    assert all(path.exists() for path in station_files(builder, "Station 3"))
+
+
+def test_failed_station_keeps_its_files(builder, fake, monkeypatch):
+    fake.stations = [fake.station(i) for i in range(5)]
+    build("country", "NL")
+
+    fake.stations[2] = fake.station(2, changeuuid="change-2b")
+    process = rb.process_api_station
+
+    def flaky(station, *args, **kwargs):
+        if station["stationuuid"] == "uuid-2":
+            raise OSError("transient")
+        return process(station, *args, **kwargs)
+
+    monkeypatch.setattr(rb, "process_api_station", flaky)
+    watchdog = build("country", "NL", merge="merge")
+    assert watchdog.metrics["stations_failed"] == 1
+    assert watchdog.metrics["stations_removed"] == 0
+    assert records(builder)["Station 2"].logo == "local"
+    assert all(path.exists() for path in station_files(builder, "Station 2"))
+
+    # Its previous state is kept, so the next run rebuilds it normally
+    monkeypatch.setattr(rb, "process_api_station", process)
+    watchdog = build("country", "NL")
+    assert watchdog.metrics["stations_success"] == 5
+    assert all(path.exists() for path in station_files(builder, "Station 2"))
+
+
+def test_station_with_failed_logo_is_retried(builder, fake):
+    fake.stations = [fake.station(i) for i in range(3)]
+    fake.favicon_status = {1: 500}
+    build("country", "NL")
+    assert records(builder)["Station 1"].logo == ""
+
+    fake.favicon_status = {}
+    watchdog = build("country", "NL")
+    assert watchdog.metrics["stations_unchanged"] == 2
+    assert records(builder)["Station 1"].logo == "local"
+    assert all(path.exists() for path in station_files(builder, "Station 1"))
+
+
+def test_batch_keeps_files_another_job_still_uses(builder, fake):
+    fake.stations = [fake.station(0, tags="pop,rock"), fake.station(1, tags="pop"), fake.station(2, tags="rock")]
+    jobs = {"jobs": [{"tag": "pop"}, {"tag": "rock"}], "zip": False}
+    assert builder.run(jobs) == 0
+
+    # Station 0 leaves the rock query but is still built by the pop query; station 2 is gone
+    fake.stations = [fake.station(0, tags="pop"), fake.station(1, tags="pop"), fake.station(3, tags="rock")]
+    assert builder.run(jobs) == 0
+    assert set(records(builder)) == {"Station 0", "Station 1", "Station 3"}
+    assert all(path.exists() for path in station_files(builder, "Station 0"))
+    assert not any(path.exists() for path in station_files(builder, "Station 2"))
@@ -0,0 +1,31 @@
+import RadioBuilderV1 as rb
+
+
+def favicon_jobs(fake, count):
+    rb.ensure_output_dirs()
+    return {f"Station {i}": fake.station(i)["favicon"] for i in range(count)}
+
+
+def test_fetch_all_downloads_and_renders_every_logo(builder, fake):
+    results = rb.AsyncLogoEngine(max_in_flight=16, per_host=4).fetch_all(favicon_jobs(fake, 120))
+    assert len(results) == 120
+    assert all(success for success, _ in results.values())
+    assert all(rb.logo_output_paths(f"Station {i}")[0].exists() for i in range(120))
+
+
+def test_fetch_all_reuses_connections_and_caps_each_host(builder, fake):
+    fake.favicon_delay = 0.005
+    rb.AsyncLogoEngine(max_in_flight=16, per_host=4).fetch_all(favicon_jobs(fake, 120))
+    assert fake.favicon_peak == 4
+    # Keep-alive: a handful of connections for 120 downloads, not one each
+    assert fake.connections <= 8
+
+
+def test_fetch_all_reports_failures_and_shares_urls(builder, fake):
+    fake.favicon_status = {3: 404}
+    jobs = favicon_jobs(fake, 5)
+    jobs["Station 0 copy"] = jobs["Station 0"]
+    results = rb.AsyncLogoEngine().fetch_all(jobs)
+    assert not results["Station 3"][0]
+    assert results["Station 0"][0] and results["Station 0 copy"][0]
+    assert fake.requests.count("/logo/0.png") == 1
@@ -0,0 +1,41 @@
+import zipfile
+
+from PIL import Image
+
+import RadioBuilderV1 as rb
+from conftest import build
+
+DEFAULT = list(rb.LOGO_RENDITIONS)
+
+
+def logo_size(builder, name):
+    with Image.open(builder.logo_dir / f"{name}.jpg") as img:
+        return img.size
+
+
+def test_outputs_follow_the_renditions(builder, fake, monkeypatch):
+    monkeypatch.setattr(rb, "LOGO_RENDITIONS", DEFAULT + [("thumb_lg", (160, 160), 85)])
+    assert rb.logo_output_paths("A")[-1] == builder.thumb_dir / "A_lg.jpg"
+    assert rb.logo_archive_names("A") == ("radio-logos/A.jpg", "radio-logos/thumbs/A.jpg",
+                                          "radio-logos/thumbs/A_sm.jpg", "radio-logos/thumbs/A_lg.jpg")
+
+    fake.stations = [fake.station(0)]
+    build("country", "NL")
+    with Image.open(builder.thumb_dir / "Station 0_lg.jpg") as img:
+        assert img.size == (160, 160)
+    assert rb.create_moode_zip()
+    with zipfile.ZipFile(builder.zip_out) as zf:
+        assert "radio-logos/thumbs/Station 0_lg.jpg" in zf.namelist()
+
+
+def test_changed_renditions_are_not_served_from_the_cache(builder, fake, monkeypatch):
+    fake.stations = [fake.station(0)]
+    build("country", "NL")
+    assert logo_size(builder, "Station 0") == (335, 335)
+
+    monkeypatch.setattr(rb, "LOGO_RENDITIONS", [("logo", (200, 200), 92)] + DEFAULT[1:])
+    rebuilt = rb.RadioBuilder(root=builder.root)
+    with rebuilt.activate():
+        build("country", "NL", incremental=False)
+    assert logo_size(builder, "Station 0") == (200, 200)
+    assert fake.requests.count("/logo/0.png") == 2
@@ -0,0 +1,70 @@
+import pytest
+
+import RadioBuilderV1 as rb
+from conftest import build
+
+
+def station_count(builder):
+    return sum(1 for _ in rb.iter_station_data(builder.json_out))
+
+
+def test_pages_are_walked_to_the_end(builder, fake):
+    fake.stations = [fake.station(i) for i in range(30)]
+    build("country", "NL", page_size=10)
+    assert station_count(builder) == 30
+    assert len(list(builder.radio_dir.glob("*.pls"))) == 30
+
+
+def test_failed_later_page_aborts_query_without_removing_anything(builder, fake):
+    fake.stations = [fake.station(i) for i in range(30)]
+    build("country", "NL", page_size=10)
+    state_before = builder.build_state_out.read_bytes()
+
+    fake.fail_offsets = {10}
+    with pytest.raises(ConnectionError):
+        build("country", "NL", page_size=10)
+
+    assert station_count(builder) == 30
+    assert len(list(builder.radio_dir.glob("*.pls"))) == 30
+    assert len(list(builder.logo_dir.glob("*.jpg"))) == 30
+    assert builder.build_state_out.read_bytes() == state_before
+
+
+def test_failed_first_page_is_an_empty_result(builder, fake):
+    fake.stations = [fake.station(i) for i in range(5)]
+    fake.fail_offsets = {0}
+    watchdog = rb.Watchdog()
+    assert list(rb.iter_station_records("country", "NL", watchdog)) == []
+
+
+def test_batch_with_failed_job_keeps_unseen_stations(builder, fake):
+    fake.stations = [fake.station(i) for i in range(30)]
+    build("country", "NL", page_size=10)
+
+    fake.fail_offsets = {10}
+    builder.config["page_size"] = 10
+    assert builder.run({"jobs": [{"country": "NL"}], "zip": False}) == 1
+    assert station_count(builder) == 30
+    assert len(list(builder.radio_dir.glob("*.pls"))) == 30
+
+
+def test_station_shifted_onto_the_next_page_is_built_once(builder, fake, monkeypatch):
+    fake.stations = [fake.station(i) for i in range(30)]
+    fetch = rb.fetch_stations_from_api
+
+    def fetch_and_shift(params, *args, **kwargs):
+        page = fetch(params, *args, **kwargs)
+        if params["offset"] == 0:
+            # A station climbs to the top while the first page is processed
+            fake.stations.insert(0, fake.station(99, clickcount=5000))
+        return page
+
+    monkeypatch.setattr(rb, "fetch_stations_from_api", fetch_and_shift)
+    watchdog = build("country", "NL", page_size=10)
+
+    assert watchdog.metrics["stations_total"] == 30
+    assert fake.requests.count("/logo/9.png") == 1
+    assert station_count(builder) == 30
+    assert sorted(path.stem for path in builder.radio_dir.glob("*.pls")) == sorted(
+        f"Station {i}" for i in range(30))
+    assert len(list(builder.logo_dir.glob("*.jpg"))) == 30
@@ -0,0 +1,31 @@
+import RadioBuilderV1 as rb
+
+
+def pls_streams(builder):
+    return {path.stem: path.read_text(encoding="utf-8").splitlines()[1][len("File1="):]
+            for path in builder.radio_dir.glob("*.pls")}
+
+
+def test_same_name_in_two_jobs_gets_two_files(builder, fake):
+    fake.stations = [fake.station(1, name="Radio 1", tags="nl"), fake.station(2, name="Radio 1", tags="be")]
+    jobs = {"jobs": [{"tag": "nl"}, {"tag": "be"}], "zip": False}
+    assert builder.run(jobs) == 0
+
+    records = {record.name: record.station for record in rb.iter_station_data(builder.json_out)}
+    assert records == {"Radio 1": f"{fake.base}/stream/1", "Radio 1 1": f"{fake.base}/stream/2"}
+    assert pls_streams(builder) == records
+
+    # A rebuild keeps every station on its own name
+    assert builder.run(jobs) == 0
+    assert {record.name: record.station for record in rb.iter_station_data(builder.json_out)} == records
+    assert pls_streams(builder) == records
+
+
+def test_merge_does_not_take_the_name_of_a_kept_station(builder, fake):
+    fake.stations = [fake.station(1, name="Radio 1", tags="nl"), fake.station(2, name="Radio 1", tags="be")]
+    assert builder.run({"jobs": [{"tag": "nl"}], "zip": False}) == 0
+    assert builder.run({"jobs": [{"tag": "be"}], "merge": "merge", "zip": False}) == 0
+
+    records = {record.name: record.station for record in rb.iter_station_data(builder.json_out)}
+    assert records == {"Radio 1": f"{fake.base}/stream/1", "Radio 1 1": f"{fake.base}/stream/2"}
+    assert pls_streams(builder) == records
@@ -0,0 +1,44 @@
+import RadioBuilderV1 as rb
+from conftest import build
+
+
+def probe(fake, i, kind):
+    fake.stream_kinds[i] = kind
+    return rb.probe_stream(f"{fake.base}/stream/{i}")
+
+
+def test_live_stream_reports_icy_bitrate_and_codec(builder, fake):
+    result = probe(fake, 1, "ok")
+    assert result["ok"] and result["status"] == 200
+    assert (result["bitrate"], result["codec"]) == ("128", "MP3")
+
+
+def test_redirect_is_followed(builder, fake):
+    result = probe(fake, 2, "redirect")
+    assert result["ok"] and result["redirects"] == 1
+    assert result["final_url"] == f"{fake.base}/stream/100002"
+    assert result["codec"] == "AAC+"
+
+
+def test_shoutcast_v1_answer_is_alive(builder, fake):
+    assert probe(fake, 3, "icy")["ok"]
+
+
+def test_dead_stream_and_html_page_are_not_alive(builder, fake):
+    dead = probe(fake, 4, "dead")
+    assert not dead["ok"] and dead["error"] == "HTTP 404"
+    html = probe(fake, 5, "html")
+    assert not html["ok"] and html["error"] == "HTML page, not a stream"
+
+
+def test_build_with_probe_drops_dead_stations(builder, fake):
+    fake.stations = [fake.station(i) for i in range(4)]
+    fake.stream_kinds = {1: "dead", 2: "redirect"}
+    builder.config["stream_probe"] = True
+    watchdog = build("country", "NL")
+    assert watchdog.metrics["stations_dead"] == 1
+    records = {record.name: record for record in rb.iter_station_data(builder.json_out)}
+    assert set(records) == {"Station 0", "Station 2", "Station 3"}
+    # The station keeps its own URL; the codec comes from the redirect target
+    assert records["Station 2"].station == f"{fake.base}/stream/2"
+    assert records["Station 2"].format == "AAC+"
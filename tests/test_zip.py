@@ -0,0 +1,99 @@
+import logging
+import zipfile
+
+import pytest
+
+import RadioBuilderV1 as rb
+
+JOBS = {"jobs": [{"country": "NL"}]}
+
+
+def moved_station(fake):
+    return fake.station(1, url=f"{fake.base}/stream/9", changeuuid="change-1b")
+
+
+def archive_contents(builder):
+    with zipfile.ZipFile(builder.zip_out) as zf:
+        assert zf.testzip() is None
+        return {name: zf.read(name) for name in zf.namelist()}
+
+
+def disk_contents(builder):
+    return {name: (builder.root / name).read_bytes() if name != "station_data.json"
+            else builder.json_out.read_bytes()
+            for name in rb.scan_moode_files() | {"station_data.json": None}}
+
+
+def build_and_change(builder, fake):
+    fake.stations = [fake.station(0), fake.station(1)]
+    assert builder.run(JOBS) == 0
+    fake.stations = [fake.station(0), moved_station(fake), fake.station(2)]
+    assert builder.run(JOBS) == 0
+
+
+def test_update_in_place_round_trip(builder, fake, caplog):
+    caplog.set_level(logging.INFO)
+    build_and_change(builder, fake)
+    assert "ZIP updated" in caplog.text
+
+    contents = archive_contents(builder)
+    assert contents == disk_contents(builder)
+    assert f"{fake.base}/stream/9".encode() in contents["RADIO/Station 1.pls"]
+    assert "radio-logos/Station 2.jpg" in contents
+
+
+def test_update_compacts_unreferenced_space(builder, fake, monkeypatch):
+    monkeypatch.setattr(rb, "ZIP_COMPACT_RATIO", 0)
+    build_and_change(builder, fake)
+
+    with zipfile.ZipFile(builder.zip_out) as zf:
+        assert rb.zip_dead_bytes(zf) == 0
+    assert archive_contents(builder) == disk_contents(builder)
+
+
+def test_missing_zipfile_internals_fall_back_to_a_rewrite(builder, fake, monkeypatch, caplog):
+    fake.stations = [fake.station(0), fake.station(1)]
+    assert builder.run(JOBS) == 0
+
+    monkeypatch.setattr(rb, "ZIP_APPEND_ATTRS", ("fp", "no_such_attribute"))
+    fake.stations = [fake.station(0), moved_station(fake)]
+    assert builder.run(JOBS) == 0
+    assert "rebuilding from disk" in caplog.text
+
+    contents = archive_contents(builder)
+    assert contents == disk_contents(builder)
+    assert f"{fake.base}/stream/9".encode() in contents["RADIO/Station 1.pls"]
+    assert not builder.zip_out.with_name(builder.zip_out.name + ".partial").exists()
+
+
+def test_finalize_drops_superseded_entries(builder):
+    writer = rb.MoodeZipWriter(builder.zip_out)
+    writer.add("RADIO/A.pls", b"old " * 1000)
+    writer.add("RADIO/A.pls", b"new")
+    writer.finalize()
+
+    with zipfile.ZipFile(builder.zip_out) as zf:
+        assert zf.testzip() is None
+        assert zf.namelist() == ["RADIO/A.pls"]
+        assert zf.read("RADIO/A.pls") == b"new"
+        assert rb.zip_dead_bytes(zf) == 0
+
+
+def test_menu_asks_for_the_zip_before_scraping(builder, fake, monkeypatch):
+    answers = iter(["2", "NL", "n", "0"])
+    prompts = []
+
+    def answer(prompt=""):
+        prompts.append(prompt)
+        return next(answers)
+
+    def scrape(*args, **kwargs):
+        assert "Create ZIP" in prompts[-1]
+        return 0
+
+    monkeypatch.setattr("builtins.input", answer)
+    monkeypatch.setattr(rb, "scrape_via_api", scrape)
+    monkeypatch.setattr(rb, "begin_zip_stream", lambda *args: pytest.fail("ZIP stream started after 'n'"))
+
+    rb.main()
+    assert len(prompts) == 4